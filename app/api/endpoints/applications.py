@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from ...core.deps import get_db, get_current_user
-from ...models.application import Application
-from ...models.job import Job
-from ...models.resume import Resume
-from ...models.candidate import Candidate
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
+from sqlalchemy.orm import Session, selectinload, undefer
+from typing import List, Optional
+from ...core.config import settings
+from ...core.pagination import page_size, paginate
+from ...db.session import get_db
+from ...db.upsert import insert_ignore_conflicts
+from ...db.versions import bump_version
+from ...models.models import Application, Job, Resume
 from ...schemas.application import ApplicationCreate, ApplicationUpdate, ApplicationResponse
+from ...services.match_data import job_match_data, resume_match_data
+from ...services.search_sync import record_bulk_changes
+from .auth import get_current_user
+from .jobs import job_matcher
 
 router = APIRouter()
 
@@ -44,18 +49,99 @@ async def create_application(
     )
     
     db.add(new_application)
+    bump_version(db, "applications")
     db.commit()
     db.refresh(new_application)
     
     return new_application
 
+@router.post("/bulk")
+def create_applications_bulk(
+    applications: List[ApplicationCreate] = Body(
+        ..., embed=True, min_length=1, max_length=settings.MAX_BULK_APPLICATIONS
+    ),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Create many applications in one transaction, e.g. a shortlist from a ranking.
+    
+    Jobs and resumes are validated with one query each and every match score
+    comes from a single batched scoring call. Pairs that already have an
+    application are skipped instead of failing the request, so a retried
+    shortlist is safe.
+    """
+    pairs = list(dict.fromkeys((application.job_id, application.resume_id) for application in applications))
+    job_ids = list(dict.fromkeys(job_id for job_id, _ in pairs))
+    resume_ids = list(dict.fromkeys(resume_id for _, resume_id in pairs))
+    
+    jobs = {
+        job.id: job
+        for job in db.query(Job).options(selectinload(Job.skills)).filter(Job.id.in_(job_ids))
+    }
+    resumes = {
+        resume.id: resume
+        for resume in db.query(Resume).options(undefer(Resume.raw_text)).filter(Resume.id.in_(resume_ids))
+    }
+    missing = []
+    missing_jobs = [job_id for job_id in job_ids if job_id not in jobs]
+    if missing_jobs:
+        missing.append(f"Jobs not found: {missing_jobs}")
+    missing_resumes = [resume_id for resume_id in resume_ids if resume_id not in resumes]
+    if missing_resumes:
+        missing.append(f"Resumes not found: {missing_resumes}")
+    if missing:
+        raise HTTPException(status_code=404, detail="; ".join(missing))
+    
+    # One (jobs, resumes) score matrix for all pairs, with the skills the ranking endpoints know
+    job_matcher.skill_index.sync(db)
+    scores = job_matcher.score_matrix(
+        [job_match_data(jobs[job_id]) for job_id in job_ids],
+        [resume_match_data(resumes[resume_id]) for resume_id in resume_ids]
+    )
+    job_rows = {job_id: row for row, job_id in enumerate(job_ids)}
+    resume_columns = {resume_id: column for column, resume_id in enumerate(resume_ids)}
+    rows = [
+        {
+            "job_id": job_id,
+            "resume_id": resume_id,
+            "candidate_id": resumes[resume_id].candidate_id,
+            "status": "pending",
+            "match_score": float(scores[job_rows[job_id], resume_columns[resume_id]])
+        }
+        for job_id, resume_id in pairs
+    ]
+    
+    created = insert_ignore_conflicts(
+        db, Application, rows, ("job_id", "resume_id"),
+        returning=("id", "job_id", "resume_id", "status", "match_score")
+    )
+    record_bulk_changes(db, "application", [row["id"] for row in created])
+    if created:
+        bump_version(db, "applications")
+    db.commit()
+    
+    created_pairs = {(row["job_id"], row["resume_id"]) for row in created}
+    return {
+        "created": created,
+        "skipped": [
+            {"job_id": job_id, "resume_id": resume_id}
+            for job_id, resume_id in pairs
+            if (job_id, resume_id) not in created_pairs
+        ]
+    }
+
 @router.get("/", response_model=List[ApplicationResponse])
 async def get_applications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    """Get all applications."""
-    applications = db.query(Application).all()
+    """Get applications, newest first. The next page's cursor is sent in `X-Next-Cursor`."""
+    applications, next_cursor = paginate(db.query(Application), Application, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return applications
 
 @router.get("/{application_id}", response_model=ApplicationResponse)
@@ -84,6 +170,7 @@ async def update_application(
     
     # Update application status
     application.status = application_update.status
+    bump_version(db, "applications")
     db.commit()
     db.refresh(application)
     
@@ -101,6 +188,7 @@ async def delete_application(
         raise HTTPException(status_code=404, detail="Application not found")
     
     db.delete(application)
+    bump_version(db, "applications")
     db.commit()
     
     return {"message": "Application deleted successfully"} 
\ No newline at end of file
@@ -1,12 +1,17 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.db.session import get_db
 from app.models.models import User
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 router = APIRouter()
@@ -15,12 +20,62 @@ router = APIRouter()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# bcrypt releases the GIL, so a small dedicated pool keeps it off the event loop
+# without starving the default threadpool used by sync endpoints
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
+# Authenticated principals by email, as plain column snapshots without the password hash
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+# A cached hash would keep accepting an old password on other workers until the TTL expires
+CACHED_COLUMNS = [column.key for column in User.__table__.columns if column.key != "hashed_password"]
+
+def invalidate_user(email: str) -> None:
+    """Drop a cached principal so the next request reloads it."""
+    user_cache.pop(email)
+
+@event.listens_for(User.is_active, "set")
+@event.listens_for(User.hashed_password, "set")
+def _invalidate_on_change(target, value, oldvalue, initiator):
+    # Only changes to stored users matter; this also skips cache-hit construction
+    if not inspect(target).transient and target.email:
+        invalidate_user(target.email)
+
+def _cached_user(db: Session, email: str) -> Optional[User]:
+    """Load a user, serving repeat lookups from the principal cache.
+    
+    Cache hits are merged into the session without a SELECT, so the returned
+    instance can still be modified and committed by the endpoint. The password
+    hash is not cached; read it from the database where it is needed.
+    """
+    snapshot = user_cache.get(email)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    
+    user = db.query(User).filter(User.email == email).first()
+    if user is not None:
+        user_cache.set(email, {key: getattr(user, key) for key in CACHED_COLUMNS})
+    return user
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -31,10 +86,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
+    """Resolve the bearer token; a plain def, so a cache miss queries from the threadpool."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -48,11 +104,16 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    user = _cached_user(db, email)
+    if user is None or not user.is_active:
         raise credentials_exception
     return user
 
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Administrator access required")
+    return current_user
+
 @router.post("/register")
 def register_user(
     email: str,
@@ -68,7 +129,7 @@ def register_user(
             detail="Email already registered"
         )
     
-    # Create new user
+    # Create new user; a sync route, so bcrypt already runs off the event loop
     user = User(
         email=email,
         hashed_password=get_password_hash(password),
@@ -87,8 +148,8 @@ async def login(
     db: Session = Depends(get_db)
 ):
     """Login user and return access token."""
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(db.query(User).filter(User.email == form_data.username).first)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -123,13 +184,18 @@ async def change_password(
     db: Session = Depends(get_db)
 ):
     """Change user password."""
-    if not verify_password(current_password, current_user.hashed_password):
+    # Checked against the stored hash, never a cached one
+    hashed_password = await run_in_threadpool(
+        db.query(User.hashed_password).filter(User.id == current_user.id).scalar
+    )
+    if not await verify_password_async(current_password, hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
     
-    current_user.hashed_password = get_password_hash(new_password)
-    db.commit()
+    current_user.hashed_password = await get_password_hash_async(new_password)
+    await run_in_threadpool(db.commit)
+    invalidate_user(current_user.email)
     
     return {"message": "Password changed successfully"} 
\ No newline at end of file
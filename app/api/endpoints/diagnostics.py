@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from typing import Optional
+from app.core import diagnostics
+from app.core.http_cache import response_cache
+from app.core.runtime import applied_plan
+from .auth import get_current_admin
+from .jobs import job_matcher
+from .resumes import nlp, resume_parser
+
+# Per-worker memory diagnostics; every route requires an administrator
+router = APIRouter(prefix="/diagnostics", dependencies=[Depends(get_current_admin)])
+
+KEY_TYPES = "^(lineno|filename|traceback)$"
+
+def _snapshot(snapshot_id: str) -> diagnostics.StoredSnapshot:
+    stored = diagnostics.snapshots.get(snapshot_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot {snapshot_id} not found in this worker")
+    return stored
+
+@router.get("/memory")
+def get_memory():
+    """RSS, native heap, loaded models and their sizes, spaCy vocabularies and torch allocator state."""
+    plan = applied_plan()
+    return {
+        "process": diagnostics.process_memory(),
+        "python": diagnostics.python_memory(),
+        "malloc": diagnostics.malloc_info(),
+        "torch": diagnostics.torch_allocator_stats(),
+        "threads": plan._asdict() if plan else None,
+        "models": {
+            "bert": diagnostics.torch_module_size(job_matcher.model),
+            "bert_tokenizer_vocab": len(job_matcher.tokenizer),
+            "job_matcher_spacy": diagnostics.spacy_stats(job_matcher.nlp),
+            "resume_parser_spacy": diagnostics.spacy_stats(resume_parser.nlp),
+            "resume_analysis_spacy": diagnostics.spacy_stats(nlp),
+        },
+        "caches": {
+            "response_cache_bytes": response_cache.size,
+            "skill_index": job_matcher.skill_index.stats(),
+        },
+    }
+
+@router.post("/malloc-trim")
+def trim_heap():
+    """Release free native heap pages and report how much RSS that gave back."""
+    result = diagnostics.malloc_trim()
+    if result is None:
+        raise HTTPException(status_code=501, detail="malloc_trim is only available with glibc")
+    return result
+
+@router.post("/tracemalloc/start")
+def start_tracemalloc(frames: int = Body(1, embed=True, ge=1, le=64)):
+    """Start tracing allocations, keeping `frames` frames per traceback.
+
+    Tracing slows allocation-heavy code down noticeably; stop it when done.
+    """
+    diagnostics.snapshots.start(frames)
+    return {"tracing": True, "frames": frames, "pid": diagnostics.process_memory()["pid"]}
+
+@router.post("/tracemalloc/stop")
+def stop_tracemalloc():
+    """Stop tracing and discard this worker's snapshots."""
+    diagnostics.snapshots.stop()
+    return {"tracing": False}
+
+@router.post("/tracemalloc/snapshots")
+def take_snapshot(
+    label: Optional[str] = Body(None, embed=True),
+    limit: int = Body(20, embed=True, ge=1, le=500),
+    key_type: str = Body("lineno", embed=True, pattern=KEY_TYPES),
+    include: Optional[str] = Body(None, embed=True, description="Only sites in files matching this pattern, e.g. */app/*")
+):
+    """Take a snapshot and return its largest allocation sites."""
+    try:
+        stored = diagnostics.snapshots.take(label)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return {
+        **diagnostics.describe_snapshot(stored),
+        "pid": diagnostics.process_memory()["pid"],
+        "top": diagnostics.top_allocations(stored, key_type, limit, include),
+    }
+
+@router.get("/tracemalloc/snapshots")
+def list_snapshots():
+    return {"pid": diagnostics.process_memory()["pid"], "snapshots": diagnostics.snapshots.list()}
+
+@router.get("/tracemalloc/diff")
+def diff_snapshots(
+    before: str,
+    after: str,
+    limit: int = Query(20, ge=1, le=500),
+    key_type: str = Query("lineno", pattern=KEY_TYPES),
+    include: Optional[str] = Query(None, description="Only sites in files matching this pattern, e.g. */app/*")
+):
+    """Allocation sites that grew most between two snapshots of this worker."""
+    return {
+        "before": diagnostics.describe_snapshot(_snapshot(before)),
+        "after": diagnostics.describe_snapshot(_snapshot(after)),
+        "top": diagnostics.diff_allocations(_snapshot(before), _snapshot(after), key_type, limit, include),
+    }
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.session import get_db
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session, selectinload, undefer
+from sqlalchemy.sql import func
+from typing import Callable, List, Optional
+from app.db.session import get_db, get_read_db
+from app.core.config import settings
+from app.db.versions import bump_version, get_version
+from app.core.capture import capture
+from app.core.http_cache import cached_response, response_cache
+from app.core.pagination import page_size, paginate
+from app.core.rate_limit import deferred_rate_limit, rate_limit
+from app.core.runtime import register_warmup
+from app.core.serialization import columnar_rankings, encoder_for, negotiate_format
 from app.models.models import Job, Skill, Application, Resume
 from app.services.job_matcher import JobMatcher
-import json
+from app.services.job_index import job_index
+from app.services.match_data import job_match_data, resume_match_data
+from app.services.search_index import resume_index
+from .auth import get_current_user
 
 router = APIRouter()
 job_matcher = JobMatcher()
+register_warmup("job_matcher", job_matcher.warmup)
+if job_matcher.lexical_weight > 0:
+    job_matcher.lexical_index = resume_index
 
 @router.post("/")
 def create_job(
@@ -38,8 +53,11 @@ def create_job(
         job.skills.append(skill)
     
     db.add(job)
+    bump_version(db, "jobs")
     db.commit()
     db.refresh(job)
+    job_index.invalidate()
+    response_cache.invalidate("jobs")
     
     return {
         "id": job.id,
@@ -52,12 +70,20 @@ def create_job(
     }
 
 @router.get("/{job_id}")
-def get_job(job_id: int, db: Session = Depends(get_db)):
+def get_job(job_id: int, request: Request, db: Session = Depends(get_db)):
     """Get job details by ID."""
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    return cached_response(
+        request,
+        (job.id, job.updated_at or job.created_at),
+        lambda: (_job_details(job), {}),
+        tags=[f"job:{job.id}"]
+    )
+
+def _job_details(job: Job) -> dict:
     return {
         "id": job.id,
         "title": job.title,
@@ -73,18 +99,25 @@ def get_job(job_id: int, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_jobs(
-    skip: int = 0,
-    limit: int = 10,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
     active_only: bool = True,
     db: Session = Depends(get_db)
 ):
-    """List all jobs with optional filtering."""
-    query = db.query(Job)
-    if active_only:
-        query = query.filter(Job.is_active == True)
-    
-    jobs = query.offset(skip).limit(limit).all()
+    """List jobs, newest first. The next page's cursor is sent in `X-Next-Cursor`."""
+    def build():
+        query = db.query(Job).options(selectinload(Job.skills))
+        if active_only:
+            query = query.filter(Job.is_active == True)
+        
+        jobs, next_cursor = paginate(query, Job, cursor, limit)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        return _job_summaries(jobs), headers
     
+    return cached_response(request, (get_version(db, "jobs"),), build, tags=["jobs"])
+
+def _job_summaries(jobs: List[Job]) -> List[dict]:
     return [
         {
             "id": job.id,
@@ -139,9 +172,15 @@ def update_job(
                 skill = Skill(name=skill_name)
                 db.add(skill)
             job.skills.append(skill)
+        # Skill changes only touch job_skills, so bump the job's own timestamp
+        job.updated_at = func.now()
     
+    bump_version(db, "jobs")
     db.commit()
     db.refresh(job)
+    job_index.invalidate()
+    response_cache.invalidate(f"job:{job.id}")
+    response_cache.invalidate("jobs")
     
     return {
         "id": job.id,
@@ -155,42 +194,84 @@ def update_job(
         "updated_at": job.updated_at
     }
 
-@router.get("/{job_id}/candidates")
-def get_matching_candidates(job_id: int, db: Session = Depends(get_db)):
-    """Get ranked list of candidates matching a job."""
+@router.get("/{job_id}/candidates", dependencies=[Depends(get_current_user)])
+def get_matching_candidates(
+    job_id: int,
+    request: Request,
+    format: Optional[str] = Query(None, description="json, compact or msgpack; overrides Accept"),
+    collapse_duplicates: bool = Query(False, description="Rank only the newest of near-duplicate resumes"),
+    db: Session = Depends(get_db),
+    admit: Callable[[], None] = Depends(deferred_rate_limit("ranking"))
+):
+    """Get ranked list of candidates matching a job.
+    
+    The compact and msgpack formats return the ranking as parallel columns
+    with the weights sent once, which is much smaller for large pools.
+    """
+    fmt = negotiate_format(request, format)
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    capture("rank", lambda: {"job": job_match_data(job), "format": fmt, "collapse_duplicates": collapse_duplicates})
     
-    # Get all resumes
-    resumes = db.query(Resume).all()
+    def build():
+        # Get all resumes
+        resumes = db.query(Resume).options(undefer(Resume.raw_text)).all()
+        job_matcher.skill_index.sync(db)
+        if job_matcher.lexical_index is not None:
+            resume_index.sync(db)
+        
+        # Prepare job and candidate data for matching
+        job_data = job_match_data(job)
+        candidates = [resume_match_data(resume) for resume in resumes]
+        
+        # Rank candidates
+        return job_matcher.rank_candidates(candidates, job_data, collapse_duplicates=collapse_duplicates), {}
     
-    # Prepare job data for matching
-    job_data = {
-        "id": job.id,
-        "title": job.title,
-        "description": job.description,
-        "requirements": job.requirements,
-        "min_experience": job.min_experience,
-        "education_required": job.education_required,
-        "required_skills": [skill.name for skill in job.skills]
-    }
+    # Rankings change with the job itself or with the resume pool
+    version = (job.id, job.updated_at or job.created_at, get_version(db, "resumes"))
+    return cached_response(
+        request,
+        version,
+        build,
+        tags=[f"job:{job.id}", "rankings"],
+        encode=encoder_for(fmt, columnar_rankings),
+        variant=fmt,
+        admit=admit
+    )
+
+@router.post("/candidates/batch", dependencies=[Depends(get_current_user), Depends(rate_limit("ranking"))])
+def get_matching_candidates_batch(
+    job_ids: List[int] = Body(..., embed=True, min_length=1, max_length=settings.MAX_BATCH_JOBS),
+    top_k: int = Body(50, embed=True, ge=1, le=settings.MAX_BATCH_TOP_K),
+    db: Session = Depends(get_read_db)
+):
+    """Rank the candidate pool against several jobs in one pass.
     
-    # Prepare candidate data for matching
-    candidates = []
-    for resume in resumes:
-        parsed_data = json.loads(resume.parsed_data)
-        candidate_data = {
-            "id": resume.candidate_id,
-            "resume_id": resume.id,
-            "raw_text": parsed_data.get("raw_text", ""),
-            "skills": parsed_data.get("skills", []),
-            "education": parsed_data.get("education", []),
-            "experience_years": parsed_data.get("experience", [{}])[0].get("years", 0) if parsed_data.get("experience") else 0
-        }
-        candidates.append(candidate_data)
+    Resumes are streamed from the database and scored block by block against
+    all requested jobs, so each resume is embedded once instead of once per
+    job. Only the top_k candidates of every job are returned.
+    """
+    job_ids = list(dict.fromkeys(job_ids))
+    jobs = db.query(Job).options(selectinload(Job.skills)).filter(Job.id.in_(job_ids)).all()
+    found = {job.id: job for job in jobs}
+    missing = [job_id for job_id in job_ids if job_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Jobs not found: {missing}")
     
-    # Rank candidates
-    ranked_candidates = job_matcher.rank_candidates(candidates, job_data)
+    jobs_data = [job_match_data(found[job_id]) for job_id in job_ids]
+    capture("rank_batch", {"jobs": jobs_data, "top_k": top_k})
+    job_matcher.skill_index.sync(db)
+    resumes = (
+        db.query(Resume)
+        .options(undefer(Resume.raw_text))
+        .order_by(Resume.id)
+        .yield_per(settings.MATCH_BLOCK_SIZE)
+    )
+    candidates = (resume_match_data(resume) for resume in resumes)
+    rankings = job_matcher.batch_rank(jobs_data, candidates, top_k=top_k)
     
-    return ranked_candidates 
\ No newline at end of file
+    return [
+        {"job_id": job_id, "candidates": rankings[job_id]}
+        for job_id in job_ids
+    ]
\ No newline at end of file
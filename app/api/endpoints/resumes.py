@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
 import os
 from app.db.session import get_db
+from app.db.versions import bump_version
+from app.core.capture import capture
+from app.core.http_cache import response_cache
+from app.core.pagination import page_size, paginate
+from app.core.rate_limit import rate_limit
+from app.core.runtime import register_warmup
 from app.services.resume_parser import ResumeParser
-from app.models.models import Resume, Candidate
+from app.services.dedup import detach_duplicates, duplicate_index, flag_duplicate, minhash_signature
+from app.services.docx_extractor import extract_docx_text
+from app.services.experience_parser import total_experience_years
+from app.services.pdf_extractor import PDFExtractionError, extract_pdf_text
+from app.services.section_segmenter import section_offsets, section_text, segment_resume
+from app.services.job_index import job_index
+from app.services.match_data import resume_match_data
+from app.services.search_index import resume_index
+from .auth import get_current_user
+from app.models.models import Application, Candidate, Job, Resume
 from app.core.config import settings
+from app.core.metrics import metrics
 import json
 import spacy
-import PyPDF2
-import docx
-import re
-from app.core.deps import get_current_user
-from app.models.resume import ResumeAnalysis
-from app.models.job import Job
-from app.models.application import Application
 from app.schemas.resume import ResumeAnalysisResponse
 
 router = APIRouter()
 resume_parser = ResumeParser()
+register_warmup("resume_parser", resume_parser.warmup)
 
 # Load spaCy model for NLP
 try:
@@ -30,18 +40,10 @@ except OSError:
     nlp = spacy.load("en_core_web_sm")
 
 def extract_text_from_pdf(file):
-    text = ""
-    pdf_reader = PyPDF2.PdfReader(file)
-    for page in pdf_reader.pages:
-        text += page.extract_text()
-    return text
+    return extract_pdf_text(file)
 
 def extract_text_from_docx(file):
-    doc = docx.Document(file)
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    return text
+    return extract_docx_text(file)
 
 def extract_skills(text):
     # Common technical skills to look for
@@ -65,24 +67,8 @@ def extract_skills(text):
     
     return found_skills
 
-def extract_experience(text):
-    # Use spaCy to identify entities and their relationships
-    doc = nlp(text)
-    
-    # Look for experience-related patterns
-    experience_patterns = [
-        r"(\d+)\s*(?:years?|yrs?)\s*(?:of)?\s*experience",
-        r"experience:\s*(\d+)\s*(?:years?|yrs?)",
-        r"(\d+)\s*(?:years?|yrs?)\s*(?:in)?\s*the\s*field"
-    ]
-    
-    experience = []
-    for pattern in experience_patterns:
-        matches = re.finditer(pattern, text.lower())
-        for match in matches:
-            experience.append(int(match.group(1)))
-    
-    return max(experience) if experience else 0
+def extract_experience(text, sections=None):
+    return total_experience_years(text, sections)
 
 def extract_education(text):
     # Common education degrees
@@ -92,45 +78,38 @@ def extract_education(text):
     ]
     
     # Look for education-related patterns
+    text_lower = text.lower()
+    found_degrees = [degree for degree in degrees if degree in text_lower]
+    if not found_degrees:
+        return []
+    
+    # Try to extract the institution names, parsing the text once
+    doc = nlp(text)
+    metrics.inc("resume_nlp_tokens", len(doc))
     education = []
-    for degree in degrees:
-        if degree in text.lower():
-            # Try to extract the institution name
-            doc = nlp(text)
-            for ent in doc.ents:
-                if ent.label_ == "ORG" and degree in text[ent.start-20:ent.end+20].lower():
-                    education.append({
-                        "degree": degree.upper(),
-                        "institution": ent.text,
-                        "year": None  # Could be enhanced to extract graduation year
-                    })
+    for degree in found_degrees:
+        for ent in doc.ents:
+            if ent.label_ == "ORG" and degree in text_lower[max(ent.start_char - 20, 0):ent.end_char + 20]:
+                education.append({
+                    "degree": degree.upper(),
+                    "institution": ent.text,
+                    "year": None  # Could be enhanced to extract graduation year
+                })
     
     return education
 
-def calculate_job_match(resume_skills, job_skills, experience_years, required_experience):
-    # Calculate skill match
-    matched_skills = set(resume_skills) & set(job_skills)
-    skill_match_score = len(matched_skills) / len(job_skills) if job_skills else 0
-    
-    # Calculate experience match
-    experience_match_score = min(experience_years / required_experience, 1) if required_experience > 0 else 1
-    
-    # Combine scores (70% skills, 30% experience)
-    total_score = (skill_match_score * 0.7) + (experience_match_score * 0.3)
-    
-    return {
-        "match_score": total_score,
-        "matched_skills": list(matched_skills)
-    }
-
-@router.post("/upload")
-async def upload_resume(
+@router.post("/upload", dependencies=[Depends(rate_limit("upload"))])
+def upload_resume(
     file: UploadFile = File(...),
     candidate_id: int = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    """Upload and parse a resume."""
+    """Upload and parse a resume.
+
+    A plain def: extraction, segmentation, NER, MinHash and the database work
+    all block, so the whole request runs in the threadpool.
+    """
     # Validate file type
     if not file.filename.endswith(('.pdf', '.doc', '.docx')):
         raise HTTPException(status_code=400, detail="Only PDF and Word documents are allowed")
@@ -141,8 +120,9 @@ async def upload_resume(
     # Save file
     file_path = os.path.join(settings.UPLOAD_FOLDER, file.filename)
     with open(file_path, "wb") as buffer:
-        content = await file.read()
+        content = file.file.read()
         buffer.write(content)
+    capture("upload", {"candidate_id": candidate_id}, body=content, filename=file.filename)
     
     try:
         # Extract text based on file type
@@ -151,65 +131,154 @@ async def upload_resume(
         else:
             text = extract_text_from_docx(content)
         
-        # Extract information
+        # Extract information; NER only runs on the Education section when there is one
+        sections = segment_resume(text)
         skills = extract_skills(text)
-        experience_years = extract_experience(text)
-        education = extract_education(text)
+        experience_years = extract_experience(text, sections)
+        education = extract_education(section_text(text, sections, "education") or text)
         
         # Create resume record
         resume = Resume(
             candidate_id=candidate_id,
             file_path=file_path,
-            skills=skills,
-            experience_years=experience_years,
-            education=education
+            parsed_data=json.dumps({
+                "skills": skills,
+                "experience_years": experience_years,
+                "education": education,
+                "sections": section_offsets(sections)
+            }),
+            raw_text=text
         )
         
+        # Link near-duplicates of an earlier upload to the original; texts
+        # too short to sign are never flagged
+        signature = minhash_signature(text)
+        original = flag_duplicate(db, resume, signature) if signature is not None else None
+        
         db.add(resume)
+        bump_version(db, "resumes")
         db.commit()
         db.refresh(resume)
+        resume_index.add_resume(resume.id, text)
+        if signature is not None:
+            duplicate_index.add_resume(resume.id, signature)
+        response_cache.invalidate("rankings")
         
         return {
             "message": "Resume uploaded and processed successfully",
-            "resume_id": resume.id
+            "resume_id": resume.id,
+            "candidate_id": resume.candidate_id,
+            "duplicate_of": original.id if original else None
         }
     
     except Exception as e:
         # Clean up file if processing fails
         if os.path.exists(file_path):
             os.remove(file_path)
-        raise HTTPException(status_code=500, detail=str(e))
+        status_code = 422 if isinstance(e, PDFExtractionError) else 500
+        raise HTTPException(status_code=status_code, detail=str(e))
+
+# Under /resumes: a bare /search would be taken by the jobs router's /{job_id}
+@router.get("/resumes/search")
+def search_resumes(
+    q: str = Query(..., min_length=1),
+    limit: int = Depends(page_size),
+    db: Session = Depends(get_db)
+):
+    """Keyword search over resume text.
+    
+    Supports `+required`, `-excluded` and `"exact phrase"` terms; results are
+    ranked by BM25.
+    """
+    resume_index.sync(db)
+    hits = resume_index.search(q, limit=limit)
+    
+    # Drop hits for resumes deleted through another worker
+    rows = {
+        row.id: row
+        for row in db.query(Resume.id, Resume.candidate_id).filter(Resume.id.in_([hit.doc_id for hit in hits]))
+    } if hits else {}
+    for hit in hits:
+        if hit.doc_id not in rows:
+            resume_index.remove_resume(hit.doc_id)
+    
+    return [
+        {
+            "resume_id": hit.doc_id,
+            "candidate_id": rows[hit.doc_id].candidate_id,
+            "score": hit.score
+        }
+        for hit in hits
+        if hit.doc_id in rows
+    ]
+
+# Fields of the resume endpoints; raw_text is only returned when asked for
+RESUME_FIELDS = {
+    "id": Resume.id,
+    "candidate_id": Resume.candidate_id,
+    "file_path": Resume.file_path,
+    "parsed_data": Resume.parsed_data,
+    "raw_text": Resume.raw_text,
+    "duplicate_of": Resume.duplicate_of_id,
+    "created_at": Resume.created_at,
+    "updated_at": Resume.updated_at,
+}
+DEFAULT_RESUME_FIELDS = ("id", "candidate_id", "file_path", "parsed_data", "created_at", "updated_at")
+
+def resume_fields(
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated subset of: {', '.join(RESUME_FIELDS)}. Defaults to all but raw_text."
+    )
+) -> List[str]:
+    """Dependency parsing the `fields=` selector of the resume endpoints."""
+    if not fields:
+        return list(DEFAULT_RESUME_FIELDS)
+    selected = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in selected if field not in RESUME_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields selected")
+    return selected
+
+def _load_fields(fields: List[str]):
+    """Load only the selected columns (plus the pagination keys); raw_text stays deferred unless selected."""
+    columns = {RESUME_FIELDS[field] for field in fields} | {Resume.id, Resume.created_at}
+    return load_only(*columns)
+
+def _resume_body(resume: Resume, fields: List[str]) -> dict:
+    body = {}
+    for field in fields:
+        if field == "parsed_data":
+            body[field] = json.loads(resume.parsed_data) if resume.parsed_data else {}
+        elif field == "duplicate_of":
+            body[field] = resume.duplicate_of_id
+        else:
+            body[field] = getattr(resume, field)
+    return body
 
 @router.get("/{resume_id}")
-def get_resume(resume_id: int, db: Session = Depends(get_db)):
-    """Get resume details by ID."""
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
+def get_resume(resume_id: int, fields: List[str] = Depends(resume_fields), db: Session = Depends(get_db)):
+    """Get resume details by ID. Select fields with `fields=`; raw_text is only included when selected."""
+    resume = db.query(Resume).options(_load_fields(fields)).filter(Resume.id == resume_id).first()
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    return {
-        "id": resume.id,
-        "candidate_id": resume.candidate_id,
-        "file_path": resume.file_path,
-        "parsed_data": json.loads(resume.parsed_data),
-        "created_at": resume.created_at,
-        "updated_at": resume.updated_at
-    }
+    return _resume_body(resume, fields)
 
 @router.get("/candidate/{candidate_id}")
-def get_candidate_resumes(candidate_id: int, db: Session = Depends(get_db)):
-    """Get all resumes for a candidate."""
-    resumes = db.query(Resume).filter(Resume.candidate_id == candidate_id).all()
-    return [
-        {
-            "id": resume.id,
-            "file_path": resume.file_path,
-            "parsed_data": json.loads(resume.parsed_data),
-            "created_at": resume.created_at,
-            "updated_at": resume.updated_at
-        }
-        for resume in resumes
-    ]
+def get_candidate_resumes(
+    candidate_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
+    fields: List[str] = Depends(resume_fields),
+    db: Session = Depends(get_db)
+):
+    """Get a candidate's resumes, newest first. The next page's cursor is sent in `X-Next-Cursor`."""
+    query = db.query(Resume).options(_load_fields(fields)).filter(Resume.candidate_id == candidate_id)
+    resumes, next_cursor = paginate(query, Resume, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [_resume_body(resume, fields) for resume in resumes]
 
 @router.delete("/{resume_id}")
 def delete_resume(resume_id: int, db: Session = Depends(get_db)):
@@ -223,14 +292,24 @@ def delete_resume(resume_id: int, db: Session = Depends(get_db)):
         os.remove(resume.file_path)
     
     # Delete database record
+    detach_duplicates(db, resume)
     db.delete(resume)
+    bump_version(db, "resumes")
     db.commit()
+    resume_index.remove_resume(resume_id)
+    duplicate_index.remove_resume(resume_id)
+    response_cache.invalidate("rankings")
     
     return {"message": "Resume deleted successfully"}
 
-@router.get("/{resume_id}/analysis", response_model=ResumeAnalysisResponse)
-async def analyze_resume(
+@router.get(
+    "/{resume_id}/analysis",
+    response_model=ResumeAnalysisResponse,
+    dependencies=[Depends(rate_limit("analysis"))]
+)
+def analyze_resume(
     resume_id: int,
+    top_n: Optional[int] = Query(None, ge=1),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
@@ -243,39 +322,40 @@ async def analyze_resume(
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    # Get all jobs
-    jobs = db.query(Job).all()
+    parsed_data = json.loads(resume.parsed_data)
+    resume_data = resume_match_data(resume, parsed_data, include_text=False)
     
-    # Calculate matches for each job
-    job_matches = []
-    for job in jobs:
-        # Check if application already exists
-        existing_application = db.query(Application).filter(
-            Application.job_id == job.id,
-            Application.resume_id == resume_id
-        ).first()
-        
-        match_result = calculate_job_match(
-            resume.skills,
-            job.required_skills,
-            resume.experience_years,
-            job.min_experience
-        )
-        
-        job_matches.append({
-            "job": job,
-            "match_score": match_result["match_score"],
-            "matched_skills": match_result["matched_skills"],
-            "has_applied": bool(existing_application)
-        })
+    # Score against all active jobs in one pass
+    matches, demanded_skills = job_index.match(
+        db,
+        resume_data["skills"],
+        resume_data["experience_years"],
+        top_n=top_n
+    )
     
-    # Sort matches by score
-    job_matches.sort(key=lambda x: x["match_score"], reverse=True)
+    # Resolve the matched jobs and existing applications with one query each
+    job_ids = [match.job_id for match in matches]
+    jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_(job_ids))} if job_ids else {}
+    applied_job_ids = {
+        job_id for (job_id,) in db.query(Application.job_id).filter(Application.resume_id == resume_id)
+    }
+    
+    job_matches = [
+        {
+            "job": jobs[match.job_id],
+            "match_score": match.match_score,
+            "matched_skills": match.matched_skills,
+            "has_applied": match.job_id in applied_job_ids
+        }
+        for match in matches
+        if match.job_id in jobs
+    ]
     
+    demanded = set(demanded_skills)
     return {
         "candidate": candidate,
-        "skills": [{"name": skill, "matched": any(skill in match["matched_skills"] for match in job_matches)} for skill in resume.skills],
-        "experience": resume.experience_years,
-        "education": resume.education,
+        "skills": [{"name": skill, "matched": skill.lower() in demanded} for skill in resume_data["skills"]],
+        "experience": resume_data["experience_years"],
+        "education": resume_data["education"],
         "job_matches": job_matches
-    } 
\ No newline at end of file
+    }
\ No newline at end of file
@@ -0,0 +1,123 @@
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import case, literal_column
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.core.config import settings
+from app.core.http_cache import cached_response
+from app.db.session import get_db
+from app.db.versions import get_version
+from app.models.models import Application, Candidate, Job, Resume
+
+router = APIRouter()
+
+SCORE_BUCKETS = 10  # match score histogram over [0, 1]
+
+@router.get("/stats")
+def get_stats(
+    request: Request,
+    top_jobs: int = Query(10, ge=1, le=100, description="Jobs listed in applicants_per_job"),
+    recent_days: int = Query(7, ge=1, le=90, description="Window of recent_activity"),
+    db: Session = Depends(get_db)
+):
+    """Dashboard statistics, aggregated in the database.
+
+    The response is cached until jobs, resumes or applications change, and
+    for at most STATS_CACHE_TTL_SECONDS so counts maintained elsewhere and
+    the recent-activity window stay fresh.
+    """
+    def build():
+        return {
+            "totals": _totals(db),
+            "applications_by_status": _applications_by_status(db),
+            "applicants_per_job": _applicants_per_job(db, top_jobs),
+            "score_distribution": _score_distribution(db),
+            "recent_activity": _recent_activity(db, recent_days),
+        }, {}
+
+    version = (
+        get_version(db, "jobs"),
+        get_version(db, "resumes"),
+        get_version(db, "applications"),
+        int(time.time() // settings.STATS_CACHE_TTL_SECONDS),
+    )
+    return cached_response(request, version, build, tags=["stats"])
+
+def _totals(db: Session) -> dict:
+    jobs, active_jobs = db.query(
+        func.count(Job.id),
+        func.coalesce(func.sum(case((Job.is_active == True, 1), else_=0)), 0)
+    ).one()
+    return {
+        "jobs": jobs,
+        "active_jobs": active_jobs,
+        "candidates": db.query(func.count(Candidate.id)).scalar(),
+        "resumes": db.query(func.count(Resume.id)).scalar(),
+        "applications": db.query(func.count(Application.id)).scalar(),
+    }
+
+def _applications_by_status(db: Session) -> dict:
+    rows = db.query(Application.status, func.count(Application.id)).group_by(Application.status)
+    return {status or "unknown": count for status, count in rows}
+
+def _applicants_per_job(db: Session, limit: int) -> list:
+    applicants = func.count(Application.id)
+    rows = (
+        db.query(Job.id, Job.title, applicants, func.avg(Application.match_score))
+        .join(Application, Application.job_id == Job.id)
+        .group_by(Job.id, Job.title)
+        .order_by(applicants.desc(), Job.id)
+        .limit(limit)
+    )
+    return [
+        {
+            "job_id": job_id,
+            "title": title,
+            "applicants": count,
+            "average_score": round(average, 4) if average is not None else None
+        }
+        for job_id, title, count, average in rows
+    ]
+
+def _score_distribution(db: Session) -> list:
+    """Application counts per match score bucket [i/10, (i+1)/10); a score of 1 falls in the last bucket."""
+    # Thresholds rather than a float-to-int cast, which rounds on PostgreSQL and truncates on SQLite.
+    # Literals, not bound parameters, so GROUP BY matches the selected expression on PostgreSQL.
+    bucket = case(
+        *[
+            (Application.match_score >= literal_column(repr(index / SCORE_BUCKETS)), literal_column(str(index)))
+            for index in range(SCORE_BUCKETS - 1, 0, -1)
+        ],
+        else_=literal_column("0")
+    )
+    counts = dict(
+        db.query(bucket, func.count(Application.id))
+        .filter(Application.match_score.isnot(None))
+        .group_by(bucket)
+    )
+    return [
+        {
+            "min_score": index / SCORE_BUCKETS,
+            "max_score": (index + 1) / SCORE_BUCKETS,
+            "count": counts.get(index, 0)
+        }
+        for index in range(SCORE_BUCKETS)
+    ]
+
+def _recent_activity(db: Session, days: int) -> dict:
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    day = func.date(Application.created_at)
+    per_day = (
+        db.query(day, func.count(Application.id))
+        .filter(Application.created_at >= since)
+        .group_by(day)
+        .order_by(day)
+    )
+    return {
+        "days": days,
+        "jobs": db.query(func.count(Job.id)).filter(Job.created_at >= since).scalar(),
+        "resumes": db.query(func.count(Resume.id)).filter(Resume.created_at >= since).scalar(),
+        "applications": db.query(func.count(Application.id)).filter(Application.created_at >= since).scalar(),
+        "applications_per_day": [{"date": str(date), "count": count} for date, count in per_day],
+    }
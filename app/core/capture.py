@@ -0,0 +1,261 @@
+"""Opt-in capture of parse and rank inputs for offline replay (scripts/replay_capture.py).
+
+With CAPTURE_ENABLED, routes call `capture(...)` with their inputs: uploaded
+documents, job payloads and ranking parameters. Records are queued and
+written by a background thread, so capturing never blocks a request; when
+the queue is full or the archive reached CAPTURE_MAX_BYTES records are
+dropped and counted.
+
+Archive layout, one directory per archive:
+
+    index-<pid>.jsonl    one JSON entry per captured request, per worker process
+    blobs/<sha256>       uploaded documents, stored once per distinct content
+
+Every record passes through the registered scrubbers before it is written.
+With CAPTURE_SCRUB the built-in ones mask e-mail addresses and phone numbers
+in the parameters and in the text of DOCX uploads, and replace upload file
+names, which usually carry the candidate's name, by a placeholder with the
+same extension. PDF uploads cannot be
+rewritten and are stored as uploaded; register a scrubber that drops them
+(returns None) if they must not leave the server.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+import zipfile
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class CaptureRecord(NamedTuple):
+    route: str  # upload, rank or rank_batch
+    params: Dict[str, Any]  # JSON-serializable request inputs
+    body: Optional[bytes] = None  # uploaded document
+    filename: Optional[str] = None
+
+Scrubber = Callable[[CaptureRecord], Optional[CaptureRecord]]
+
+# Scrubbing
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"(?<!\w)\+?\d[\d ().-]{7,}\d(?!\w)")
+
+def _mask_phone(match: "re.Match") -> str:
+    # Date ranges such as "2019 - 2023" have fewer digits than a phone number
+    return "[phone]" if sum(char.isdigit() for char in match.group()) >= 9 else match.group()
+
+def scrub_text(text: str) -> str:
+    """Mask e-mail addresses and phone numbers."""
+    return PHONE_PATTERN.sub(_mask_phone, EMAIL_PATTERN.sub("[email]", text))
+
+def _scrub_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return scrub_text(value)
+    if isinstance(value, list):
+        return [_scrub_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _scrub_value(item) for key, item in value.items()}
+    return value
+
+def scrub_params(record: CaptureRecord) -> CaptureRecord:
+    return record._replace(params=_scrub_value(record.params))
+
+# Text runs of WordprocessingML parts; markup outside them is left untouched
+_DOCX_TEXT = re.compile(rb"(<w:t(?:\s[^>]*)?>)([^<]*)(</w:t>)")
+
+def scrub_docx(record: CaptureRecord) -> CaptureRecord:
+    """Mask contact details in the text runs of a DOCX upload.
+
+    Only runs are rewritten, so an address split across runs by the editor
+    can survive.
+    """
+    if not record.body or not (record.filename or "").lower().endswith(".docx"):
+        return record
+    try:
+        source = zipfile.ZipFile(io.BytesIO(record.body))
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                data = source.read(info)
+                if info.filename.startswith("word/") and info.filename.endswith(".xml"):
+                    data = _DOCX_TEXT.sub(
+                        lambda match: match.group(1) + scrub_text(match.group(2).decode("utf-8")).encode("utf-8") + match.group(3),
+                        data
+                    )
+                target.writestr(info, data)
+    except (zipfile.BadZipFile, UnicodeDecodeError):
+        # Not a document we can rewrite; it is still parsed the same way on replay
+        return record
+    return record._replace(body=output.getvalue())
+
+def scrub_filename(record: CaptureRecord) -> CaptureRecord:
+    """Keep only the extension of the upload's file name; replay needs nothing else."""
+    if not record.filename:
+        return record
+    return record._replace(filename="resume" + os.path.splitext(record.filename)[1])
+
+_scrubbers: List[Scrubber] = []
+
+def register_scrubber(scrubber: Scrubber) -> None:
+    """Run `scrubber` on every record before it is written; returning None drops the record."""
+    _scrubbers.append(scrubber)
+
+def scrub(record: CaptureRecord) -> Optional[CaptureRecord]:
+    scrubbers = ([scrub_params, scrub_docx, scrub_filename] if settings.CAPTURE_SCRUB else []) + _scrubbers
+    for scrubber in scrubbers:
+        record = scrubber(record)
+        if record is None:
+            return None
+    return record
+
+# Archive
+
+class CaptureArchive:
+    """Reads and appends capture entries in an archive directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.blob_path = os.path.join(path, "blobs")
+
+    def size(self) -> int:
+        total = 0
+        for directory in (self.path, self.blob_path):
+            if os.path.isdir(directory):
+                total += sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+        return total
+
+    def append(self, record: CaptureRecord, timestamp: float) -> int:
+        """Write one record; returns the bytes added to the archive."""
+        os.makedirs(self.blob_path, exist_ok=True)
+        written = 0
+        entry = {
+            "id": uuid.uuid4().hex,
+            "timestamp": timestamp,
+            "route": record.route,
+            "params": record.params,
+        }
+        if record.body is not None:
+            digest = hashlib.sha256(record.body).hexdigest()
+            blob = os.path.join(self.blob_path, digest)
+            if not os.path.exists(blob):
+                partial = f"{blob}.{os.getpid()}.partial"
+                with open(partial, "wb") as file:
+                    file.write(record.body)
+                os.replace(partial, blob)
+                written += len(record.body)
+            entry.update(blob=digest, filename=record.filename)
+        line = (json.dumps(entry, default=str) + "\n").encode("utf-8")
+        with open(os.path.join(self.path, f"index-{os.getpid()}.jsonl"), "ab") as file:
+            file.write(line)
+        return written + len(line)
+
+    def entries(self) -> List[Dict]:
+        """All entries of every worker, in capture order."""
+        entries = []
+        if os.path.isdir(self.path):
+            for name in sorted(os.listdir(self.path)):
+                if name.startswith("index-") and name.endswith(".jsonl"):
+                    with open(os.path.join(self.path, name), encoding="utf-8") as file:
+                        entries.extend(json.loads(line) for line in file if line.strip())
+        entries.sort(key=lambda entry: (entry["timestamp"], entry["id"]))
+        return entries
+
+    def body(self, entry: Dict) -> Optional[bytes]:
+        if not entry.get("blob"):
+            return None
+        with open(os.path.join(self.blob_path, entry["blob"]), "rb") as file:
+            return file.read()
+
+    def __iter__(self) -> Iterator[Tuple[Dict, Optional[bytes]]]:
+        for entry in self.entries():
+            yield entry, self.body(entry)
+
+class CaptureWriter:
+    """Background thread draining a bounded queue of records into an archive."""
+
+    def __init__(self, archive: CaptureArchive, max_bytes: int, queue_size: int = 32):
+        self.archive = archive
+        self.max_bytes = max_bytes
+        self._queue: "queue.Queue[Tuple[CaptureRecord, float]]" = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    def submit(self, record: CaptureRecord) -> None:
+        self._start()
+        try:
+            self._queue.put_nowait((record, time.time()))
+        except queue.Full:
+            metrics.inc("capture_dropped", reason="queue_full")
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        self._size = self.archive.size()
+        while True:
+            record, timestamp = self._queue.get()
+            try:
+                self._write(record, timestamp)
+            except Exception:
+                logger.exception("Could not write capture record for %s", record.route)
+                metrics.inc("capture_dropped", reason="error")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, record: CaptureRecord, timestamp: float) -> None:
+        if self._size >= self.max_bytes:
+            metrics.inc("capture_dropped", reason="archive_full")
+            return
+        record = scrub(record)
+        if record is None:
+            metrics.inc("capture_dropped", reason="scrubbed")
+            return
+        self._size += self.archive.append(record, timestamp)
+        metrics.inc("capture_records", route=record.route)
+
+    def flush(self) -> None:
+        """Wait until every queued record is written."""
+        if self._thread is not None:
+            self._queue.join()
+
+_writer: Optional[CaptureWriter] = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> CaptureWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = CaptureWriter(CaptureArchive(settings.CAPTURE_PATH), settings.CAPTURE_MAX_BYTES)
+        return _writer
+
+def capture(
+    route: str,
+    params: Union[Dict[str, Any], Callable[[], Dict[str, Any]]],
+    body: Optional[bytes] = None,
+    filename: Optional[str] = None
+) -> None:
+    """Record a request's inputs if capture is enabled and the request is sampled.
+
+    `params` may be a callable, so requests that are not captured skip building them.
+    """
+    if not settings.CAPTURE_ENABLED or random.random() >= settings.CAPTURE_SAMPLE_RATE:
+        return
+    if callable(params):
+        params = params()
+    get_writer().submit(CaptureRecord(route, params, body, filename))
@@ -0,0 +1,51 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+from app.core.metrics import metrics
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+class SingleFlight:
+    """Coalesce concurrent identical computations within a process.
+
+    The first caller for a key runs `func`; callers arriving with the same key
+    while it runs block until it finishes and share its result (or exception).
+    Nothing is kept once the call completes, so later callers compute afresh
+    (or hit whatever cache `func` fills).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.inc("singleflight_coalesced", flight=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        return len(self._calls)
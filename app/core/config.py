@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import os
 from dotenv import load_dotenv
 
@@ -14,34 +14,117 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    USER_CACHE_TTL_SECONDS: float = 30.0  # bounds staleness across workers
+    USER_CACHE_SIZE: int = 1024
+    PASSWORD_HASH_WORKERS: int = 2  # threads reserved for bcrypt
     
     # Database
     POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "localhost")
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "resume_screening")
-    SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    SQLALCHEMY_DATABASE_URI: Optional[str] = os.getenv("DATABASE_URL")
+    SQLALCHEMY_REPLICA_URI: Optional[str] = os.getenv("DATABASE_REPLICA_URL")  # serves GET requests; reads lag writes
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a connection
 
     # ElasticSearch
     ELASTICSEARCH_HOST: str = os.getenv("ELASTICSEARCH_HOST", "localhost")
     ELASTICSEARCH_PORT: int = int(os.getenv("ELASTICSEARCH_PORT", "9200"))
+    ELASTICSEARCH_INDEX_PREFIX: str = os.getenv("ELASTICSEARCH_INDEX_PREFIX", "cvats")
+    ELASTICSEARCH_SYNC_ENABLED: bool = os.getenv("ELASTICSEARCH_SYNC_ENABLED", "false").lower() == "true"
+    SEARCH_SYNC_BATCH_SIZE: int = 500
+    SEARCH_SYNC_MAX_ATTEMPTS: int = 10
+    SEARCH_SYNC_BACKOFF_SECONDS: float = 2.0  # doubled on every failed attempt
+    SEARCH_SYNC_MAX_BACKOFF_SECONDS: float = 600.0
+    SEARCH_SYNC_POLL_SECONDS: float = 1.0
+    SEARCH_OUTBOX_RETENTION_HOURS: int = 24  # processed rows kept for replay after a reindex
+    
+    # Pagination
+    DEFAULT_PAGE_SIZE: int = 20
+    MAX_PAGE_SIZE: int = 100
+    
+    # Keyword search
+    SEARCH_INDEX_PATH: str = os.getenv("SEARCH_INDEX_PATH", "data/resume_index.npz")
+    SEARCH_INDEX_SAVE_SECONDS: float = 60.0  # the writer worker saves pending index changes this often
+    SEARCH_LEXICAL_WEIGHT: float = float(os.getenv("SEARCH_LEXICAL_WEIGHT", "0"))  # 0 disables BM25 in matching
+    # In-memory indexes (search, duplicates, skills) re-read every id this often: rows
+    # committed out of id order are missed by the incremental sync
+    INDEX_RECONCILE_SECONDS: float = float(os.getenv("INDEX_RECONCILE_SECONDS", "300"))
+    
+    # Response cache
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # serialized bodies kept per worker
+    STATS_CACHE_TTL_SECONDS: float = 30.0  # dashboard statistics are recomputed at least this often
+    
+    # Admission control: (tokens per second, burst) per user, or per client address without a token
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+        "ranking": (0.5, 10),
+        "analysis": (1.0, 20),
+        "upload": (0.2, 5),
+    }
+    RATE_LIMIT_MAX_KEYS: int = 10000  # buckets kept per worker and scope
+    TRUSTED_PROXY_HOPS: int = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))  # reverse proxies whose X-Forwarded-For is trusted
+    
+    # CPU threads: the cores available are split across the server worker processes
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "4"))  # must match uvicorn --workers
+    TORCH_NUM_THREADS: int = int(os.getenv("TORCH_NUM_THREADS", "0"))  # 0 = cores // workers
+    TORCH_INTEROP_THREADS: int = 1
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    
+    # Request capture for offline replay (app.core.capture, scripts/replay_capture.py)
+    CAPTURE_ENABLED: bool = os.getenv("CAPTURE_ENABLED", "false").lower() == "true"
+    CAPTURE_PATH: str = os.getenv("CAPTURE_PATH", "data/capture")
+    CAPTURE_SAMPLE_RATE: float = float(os.getenv("CAPTURE_SAMPLE_RATE", "1.0"))
+    CAPTURE_MAX_BYTES: int = 1024 * 1024 * 1024  # capture stops once the archive reaches this size
+    CAPTURE_SCRUB: bool = True  # mask e-mail addresses, phone numbers and upload file names before writing
     
     # File Upload
     UPLOAD_FOLDER: str = "uploads"
     MAX_CONTENT_LENGTH: int = 16 * 1024 * 1024  # 16MB max file size
+
+    # PDF extraction
+    PDF_BACKEND: str = os.getenv("PDF_BACKEND", "pypdf2")
+    PDF_WORKERS: int = int(os.getenv("PDF_WORKERS", "2"))
+    PDF_MIN_PAGES_PER_WORKER: int = 8  # shorter documents are read by a single worker
+    PDF_TIMEOUT_SECONDS: float = 30.0
+    PDF_WORKER_MEMORY_MB: int = 512  # address-space limit of each worker
     
     # ML Model Settings
     SPACY_MODEL: str = "en_core_web_lg"
     BERT_MODEL: str = "bert-base-uncased"
+    MATCH_BLOCK_SIZE: int = 256  # resumes scored per block in batch matching
+    MAX_BATCH_JOBS: int = 500
+    MAX_BATCH_TOP_K: int = 1000
+    MAX_BULK_APPLICATIONS: int = 1000
+    SKILL_VECTORS: str = os.getenv("SKILL_VECTORS", "spacy")  # spacy (word vectors) or bert
+    SKILL_MATCH_THRESHOLD: float = 0.8  # cosine similarity to treat a resume skill as a known skill
+    SKILL_CACHE_SIZE: int = 50000  # cached canonical skill sets
+
+    # Near-duplicate resume detection (MinHash/LSH); changing the first two
+    # invalidates stored signatures
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_SHINGLE_SIZE: int = 3  # words per shingle
+    DEDUP_BANDS: int = 32  # 4 rows per band: pairs above 0.7 similarity are almost always candidates
+    DEDUP_THRESHOLD: float = 0.7  # estimated Jaccard similarity to flag a duplicate
+    DEDUP_MIN_WORDS: int = 20  # shorter texts (scans, failed extraction) are never signed
     
     class Config:
         case_sensitive = True
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.SQLALCHEMY_DATABASE_URI = (
-            f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
-            f"@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
-        )
+        if not self.SQLALCHEMY_DATABASE_URI:
+            self.SQLALCHEMY_DATABASE_URI = (
+                f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+                f"@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
+            )
+        # Hosting providers hand out postgres:// URLs, which SQLAlchemy does not accept
+        for name in ("SQLALCHEMY_DATABASE_URI", "SQLALCHEMY_REPLICA_URI"):
+            uri = getattr(self, name)
+            if uri and uri.startswith("postgres://"):
+                setattr(self, name, "postgresql://" + uri[len("postgres://"):])
 
 settings = Settings() 
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""Memory accounting of a worker process: RSS, model sizes, spaCy vocabularies, allocators and tracemalloc.
+
+Everything here describes the process it runs in. Behind several workers each
+request reaches one of them, so results carry the pid and tracemalloc
+snapshots only exist in the worker that took them.
+"""
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """Resident set size (current and peak) and virtual size in bytes."""
+    memory = {"pid": os.getpid(), "rss_bytes": None, "peak_rss_bytes": None, "virtual_bytes": None}
+    fields = {"VmRSS:": "rss_bytes", "VmHWM:": "peak_rss_bytes", "VmSize:": "virtual_bytes"}
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                parts = line.split()
+                if parts and parts[0] in fields:
+                    memory[fields[parts[0]]] = int(parts[1]) * 1024
+    except OSError:
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            memory["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return memory
+
+def python_memory() -> Dict[str, Any]:
+    """Allocations owned by the interpreter, as opposed to native libraries."""
+    return {
+        "gc_objects": len(gc.get_objects()),
+        "gc_counts": gc.get_count(),
+        "threads": threading.active_count(),
+        "tracemalloc": tracemalloc.is_tracing(),
+        "traced_bytes": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+    }
+
+# Models
+
+def torch_module_size(module) -> Dict[str, int]:
+    """Parameter and buffer bytes of a torch module."""
+    parameters = sum(p.numel() * p.element_size() for p in module.parameters())
+    buffers = sum(b.numel() * b.element_size() for b in module.buffers())
+    return {
+        "parameters": sum(p.numel() for p in module.parameters()),
+        "parameter_bytes": parameters,
+        "buffer_bytes": buffers,
+    }
+
+def spacy_stats(nlp) -> Dict[str, Any]:
+    """Pipeline, vocabulary, string store and vector table of a spaCy Language.
+
+    The string store only grows: every distinct token text ever seen by the
+    pipeline stays interned, which is the usual source of slow growth.
+    """
+    vectors = nlp.vocab.vectors
+    return {
+        "model": f"{nlp.meta.get('lang', '')}_{nlp.meta.get('name', '')}",
+        "pipeline": list(nlp.pipe_names),
+        "vocab_lexemes": len(nlp.vocab),
+        "string_store": len(nlp.vocab.strings),
+        "vector_rows": vectors.shape[0],
+        "vector_keys": vectors.n_keys,
+        "vector_bytes": int(getattr(vectors.data, "nbytes", 0)),
+    }
+
+def torch_allocator_stats() -> Dict[str, Any]:
+    """Threading and allocator state of torch, if it is loaded.
+
+    CPU tensors are served by the system allocator (see malloc_info); the
+    caching allocator statistics exist for CUDA only.
+    """
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return {"loaded": False}
+    stats: Dict[str, Any] = {
+        "loaded": True,
+        "version": getattr(torch, "__version__", None),
+        "num_threads": torch.get_num_threads(),
+        "num_interop_threads": torch.get_num_interop_threads(),
+        "cuda": torch.cuda.is_available(),
+    }
+    if stats["cuda"]:
+        stats.update({
+            "cuda_allocated_bytes": torch.cuda.memory_allocated(),
+            "cuda_reserved_bytes": torch.cuda.memory_reserved(),
+            "cuda_peak_allocated_bytes": torch.cuda.max_memory_allocated(),
+        })
+    return stats
+
+# Native heap
+
+_libc = None
+
+def _load_libc():
+    global _libc
+    if _libc is None and sys.platform.startswith("linux"):
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        except OSError:
+            _libc = False
+    return _libc or None
+
+class _MallInfo2(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_size_t) for name in (
+        "arena", "ordblks", "smblks", "hblks", "hblkhd", "usmblks", "fsmblks", "uordblks", "fordblks", "keepcost"
+    )]
+
+def malloc_info() -> Optional[Dict[str, int]]:
+    """glibc heap usage: bytes in use versus free bytes the allocator keeps mapped."""
+    libc = _load_libc()
+    if libc is None or not hasattr(libc, "mallinfo2"):
+        return None
+    libc.mallinfo2.restype = _MallInfo2
+    info = libc.mallinfo2()
+    return {
+        "heap_bytes": info.arena,
+        "mmap_bytes": info.hblkhd,
+        "in_use_bytes": info.uordblks,
+        "free_bytes": info.fordblks,
+    }
+
+def malloc_trim() -> Optional[Dict[str, Any]]:
+    """Return free heap pages to the OS and report the RSS change.
+
+    A large drop points at allocator retention (fragmentation, freed tensors)
+    rather than live objects.
+    """
+    libc = _load_libc()
+    if libc is None or not hasattr(libc, "malloc_trim"):
+        return None
+    before = process_memory()["rss_bytes"]
+    released = bool(libc.malloc_trim(0))
+    after = process_memory()["rss_bytes"]
+    return {
+        "released": released,
+        "rss_before_bytes": before,
+        "rss_after_bytes": after,
+        "rss_freed_bytes": before - after if before is not None and after is not None else None,
+    }
+
+# tracemalloc snapshots
+
+class StoredSnapshot(NamedTuple):
+    id: str
+    taken_at: float
+    label: Optional[str]
+    snapshot: tracemalloc.Snapshot
+
+class SnapshotStore:
+    """The last `capacity` tracemalloc snapshots of this process, by id."""
+
+    def __init__(self, capacity: int = 8):
+        self.capacity = capacity
+        self._snapshots: "OrderedDict[str, StoredSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, frames: int) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def take(self, label: Optional[str] = None) -> StoredSnapshot:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        # Drop tracemalloc's own bookkeeping from the results
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        stored = StoredSnapshot(uuid.uuid4().hex[:12], time.time(), label, snapshot)
+        with self._lock:
+            self._snapshots[stored.id] = stored
+            while len(self._snapshots) > self.capacity:
+                self._snapshots.popitem(last=False)
+        return stored
+
+    def get(self, snapshot_id: str) -> Optional[StoredSnapshot]:
+        with self._lock:
+            return self._snapshots.get(snapshot_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [describe_snapshot(stored) for stored in self._snapshots.values()]
+
+snapshots = SnapshotStore()
+
+def describe_snapshot(stored: StoredSnapshot) -> Dict[str, Any]:
+    return {
+        "id": stored.id,
+        "label": stored.label,
+        "taken_at": stored.taken_at,
+        "traced_bytes": sum(trace.size for trace in stored.snapshot.traces),
+    }
+
+def _filtered(snapshot: tracemalloc.Snapshot, include: Optional[str]) -> tracemalloc.Snapshot:
+    if not include:
+        return snapshot
+    return snapshot.filter_traces([tracemalloc.Filter(True, include)])
+
+def _frames(traceback: tracemalloc.Traceback) -> List[str]:
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+def top_allocations(stored: StoredSnapshot, key_type: str, limit: int, include: Optional[str] = None) -> List[Dict]:
+    """Largest allocation sites of one snapshot."""
+    statistics = _filtered(stored.snapshot, include).statistics(key_type)
+    return [
+        {"site": _frames(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+        for stat in statistics[:limit]
+    ]
+
+def diff_allocations(
+    before: StoredSnapshot,
+    after: StoredSnapshot,
+    key_type: str,
+    limit: int,
+    include: Optional[str] = None
+) -> List[Dict]:
+    """Allocation sites that grew the most between two snapshots."""
+    statistics = _filtered(after.snapshot, include).compare_to(_filtered(before.snapshot, include), key_type)
+    return [
+        {
+            "site": _frames(stat.traceback),
+            "size_bytes": stat.size,
+            "size_diff_bytes": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        }
+        for stat in statistics[:limit]
+    ]
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from fastapi import Request, Response
+from app.core.concurrency import SingleFlight
+from app.core.config import settings
+from app.core.rate_limit import RateLimitExceeded
+from app.core.serialization import JSON_MEDIA_TYPE, dumps_json
+
+class ResponseCache:
+    """LRU of serialized response bodies, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, Dict[str, str], frozenset]]" = OrderedDict()  # body, headers, tags
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key: str, body: bytes, headers: Dict[str, str], tags: Iterable[str] = ()) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (body, headers, frozenset(tags))
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (old_body, _, _) = self._entries.popitem(last=False)
+                self.size -= len(old_body)
+
+    def invalidate(self, tag: str) -> None:
+        """Drop every entry stored with `tag`."""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if tag in entry[2]]:
+                self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_BYTES)
+# Concurrent misses for the same ETag build the body once
+response_builds = SingleFlight("cached_response")
+
+def make_etag(*parts: Any) -> str:
+    """Strong entity tag for a response fully determined by `parts`."""
+    return '"' + hashlib.sha256(repr(parts).encode()).hexdigest()[:32] + '"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip() for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def _encode_json(content: Any) -> Tuple[bytes, str]:
+    return dumps_json(content), JSON_MEDIA_TYPE
+
+def cached_response(
+    request: Request,
+    version: Tuple,
+    build: Callable[[], Tuple[Any, Dict[str, str]]],
+    tags: Iterable[str] = (),
+    encode: Callable[[Any], Tuple[bytes, str]] = _encode_json,
+    variant: str = "json",
+    admit: Optional[Callable[[], None]] = None
+) -> Response:
+    """Serve a versioned resource with ETag / If-None-Match support.
+
+    `version` must change whenever the response would; it is hashed together
+    with the request URL and the negotiated `variant` into the ETag. `build`
+    returns the content and any extra headers and is only called when the body
+    is not cached yet; concurrent requests for the same uncached body wait
+    for a single build. `encode` turns it into (body, media type).
+
+    `admit` (see rate_limit.deferred_rate_limit) is called just before a
+    build, so 304s, cache hits and requests that wait for another build are
+    not charged.
+    """
+    etag = make_etag(request.url.path, str(request.url.query), variant, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept"}
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    admitted = []
+
+    def build_body() -> Tuple[bytes, Dict[str, str]]:
+        cached = response_cache.get(etag)
+        if cached is not None:
+            return cached
+        if admit is not None:
+            admitted.append(True)
+            admit()
+        content, extra_headers = build()
+        body, media_type = encode(content)
+        extra_headers = {**extra_headers, "Content-Type": media_type}
+        response_cache.set(etag, body, extra_headers, tags)
+        return body, extra_headers
+
+    while True:
+        try:
+            body, extra_headers = response_cache.get(etag) or response_builds.do(etag, build_body)
+            break
+        except RateLimitExceeded:
+            if admitted:
+                raise
+            # The build we waited for was refused by its caller's limit, not ours
+
+    return Response(content=body, headers={**headers, **extra_headers})
@@ -0,0 +1,54 @@
+import threading
+from typing import Callable, Dict
+
+def _key(name: str, labels: Dict[str, str]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f"{label}={value}" for label, value in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+class Metrics:
+    """Small in-process registry of counters, timings and gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record a duration; reported as count, total and max."""
+        key = _key(name, labels)
+        with self._lock:
+            timing = self._timings.setdefault(key, {"count": 0, "total": 0.0, "max": 0.0})
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    def gauge(self, name: str, read: Callable[[], float], **labels) -> None:
+        """Register a callback evaluated at snapshot time."""
+        with self._lock:
+            self._gauges[_key(name, labels)] = read
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {key: dict(timing) for key, timing in self._timings.items()}
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "timings": timings,
+            "gauges": {key: read() for key, read in gauges.items()},
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+metrics = Metrics()
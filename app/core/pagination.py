@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query as SAQuery
+from app.core.config import settings
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor string."""
+    payload = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def page_size(limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE)) -> int:
+    """Dependency enforcing the maximum page size on list endpoints."""
+    return limit
+
+def paginate(query: SAQuery, model: Any, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of `query`, newest first, and the cursor of the next page.
+
+    Rows are ordered by (created_at, id) descending, so every page is a range
+    scan on the matching composite index instead of an OFFSET walk.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < (created_at, row_id))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+from fastapi import HTTPException, Request
+from jose import JWTError, jwt
+from app.core.config import settings
+from app.core.metrics import metrics
+
+class TokenBucketLimiter:
+    """Per-key token buckets refilled at `rate` tokens per second up to `burst`.
+
+    Buckets are kept in an LRU of `max_keys` entries; an evicted key starts
+    again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()  # tokens, last refill
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, now: float = None) -> float:
+        """Take a token for `key`. Returns 0 if admitted, else seconds until a token is available."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate if self.rate > 0 else float("inf")
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+def client_address(request: Request) -> str:
+    """The client address, as forwarded by the TRUSTED_PROXY_HOPS proxies in front of the app.
+
+    Each proxy appends the address it received the request from to
+    X-Forwarded-For, so the client is the entry that many hops from the
+    right; anything further left was sent by the client and is ignored.
+    """
+    address = request.client.host if request.client else "unknown"
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if forwarded:
+            address = forwarded[-min(hops, len(forwarded))]
+    return address
+
+def client_key(request: Request) -> str:
+    """The authenticated user (JWT subject) if the request carries a valid token, else the client address.
+
+    Only the token signature is checked, without a database lookup; routes
+    that require a user still authenticate through their own dependency.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"]).get("sub")
+        except JWTError:
+            subject = None
+        if subject:
+            return f"user:{subject}"
+    return f"ip:{client_address(request)}"
+
+class RateLimitExceeded(HTTPException):
+    def __init__(self, wait: float):
+        super().__init__(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, int(wait + 0.999)))}
+        )
+
+_limiters: Dict[str, TokenBucketLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(scope: str) -> TokenBucketLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(scope)
+        if limiter is None:
+            rate, burst = settings.RATE_LIMITS[scope]
+            limiter = _limiters[scope] = TokenBucketLimiter(rate, burst, settings.RATE_LIMIT_MAX_KEYS)
+        return limiter
+
+def charge(scope: str, request: Request) -> None:
+    """Take a token from the caller's bucket for `scope`, or raise RateLimitExceeded (429)."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    wait = get_limiter(scope).acquire(client_key(request))
+    if wait > 0:
+        metrics.inc("rate_limit_rejected", scope=scope)
+        raise RateLimitExceeded(wait)
+    metrics.inc("rate_limit_admitted", scope=scope)
+
+def rate_limit(scope: str) -> Callable:
+    """Dependency admitting a request if the caller's bucket for `scope` has a token, else 429.
+
+    Limits per scope are (tokens per second, burst) in settings.RATE_LIMITS.
+    """
+    async def dependency(request: Request) -> None:
+        charge(scope, request)
+
+    return dependency
+
+def deferred_rate_limit(scope: str) -> Callable:
+    """Dependency returning a callable that charges the caller's bucket for `scope` when called.
+
+    For cached routes: pass it as cached_response's `admit`, so only requests
+    that build a body pay, not 304s or cache hits.
+    """
+    async def dependency(request: Request) -> Callable[[], None]:
+        return lambda: charge(scope, request)
+
+    return dependency
@@ -0,0 +1,138 @@
+"""Per-worker CPU thread configuration, model warmup and readiness.
+
+`configure_threads()` must run before numpy, torch or spaCy are imported: the
+BLAS/OpenMP libraries read their thread counts from the environment once, at
+load time. app.main calls it first thing.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Thread-count variables of the BLAS/OpenMP runtimes numpy and torch may load
+BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+class ThreadPlan(NamedTuple):
+    cores: int  # cores available to this process
+    workers: int  # server worker processes sharing them
+    intra_op: int  # torch intra-op threads and BLAS threads per worker
+    inter_op: int  # torch inter-op threads per worker
+
+def available_cores() -> int:
+    """Cores this process may run on (honours taskset/cgroup CPU affinity)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def thread_plan(workers: Optional[int] = None, cores: Optional[int] = None) -> ThreadPlan:
+    """Split the available cores evenly among the worker processes.
+
+    Each worker gets at least one intra-op thread; TORCH_NUM_THREADS overrides
+    the computed count. Requests are already parallel across the threadpool, so
+    one inter-op thread per worker is enough.
+    """
+    cores = cores or available_cores()
+    workers = max(1, workers or settings.WEB_CONCURRENCY)
+    intra_op = settings.TORCH_NUM_THREADS or max(1, cores // workers)
+    return ThreadPlan(cores, workers, intra_op, settings.TORCH_INTEROP_THREADS)
+
+_applied_plan: Optional[ThreadPlan] = None
+
+def configure_threads(plan: Optional[ThreadPlan] = None) -> ThreadPlan:
+    """Apply a thread plan to this process: BLAS environment variables, then torch.
+
+    Variables already set in the environment are left alone so an operator
+    can still pin them explicitly.
+    """
+    global _applied_plan
+    plan = plan or thread_plan()
+    for variable in BLAS_THREAD_VARIABLES:
+        os.environ.setdefault(variable, str(plan.intra_op))
+
+    try:
+        import torch
+    except ImportError:  # pragma: no cover - torch is optional for the API itself
+        torch = None
+    if torch is not None:
+        torch.set_num_threads(plan.intra_op)
+        try:
+            torch.set_num_interop_threads(plan.inter_op)
+        except RuntimeError:
+            # Can only be set once, before the first inter-op parallel work
+            pass
+
+    _applied_plan = plan
+    metrics.gauge("runtime_intra_op_threads", lambda: plan.intra_op)
+    metrics.gauge("runtime_workers", lambda: plan.workers)
+    logger.info(
+        "Thread plan: %d cores / %d workers -> %d intra-op, %d inter-op threads",
+        plan.cores, plan.workers, plan.intra_op, plan.inter_op
+    )
+    return plan
+
+def applied_plan() -> Optional[ThreadPlan]:
+    return _applied_plan
+
+# Warmup and readiness
+
+_warmups: Dict[str, Callable[[], None]] = {}
+
+def register_warmup(name: str, func: Callable[[], None]) -> None:
+    """Run `func` once at startup, before the worker reports ready."""
+    _warmups[name] = func
+
+class Readiness:
+    """Startup state of this worker, reported by /health/ready."""
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.components: Dict[str, str] = {}  # warmup name -> pending, ok or error
+
+    def run_warmups(self) -> None:
+        self.started_at = time.monotonic()
+        self.components = {name: "pending" for name in _warmups}
+        for name, func in list(_warmups.items()):
+            started = time.perf_counter()
+            try:
+                func()
+                self.components[name] = "ok"
+            except Exception:
+                logger.exception("Warmup %s failed", name)
+                self.components[name] = "error"
+            metrics.observe("runtime_warmup_seconds", time.perf_counter() - started, component=name)
+        self.finished_at = time.monotonic()
+        # A failed warmup is logged, not fatal: the first real request retries the lazy work
+        self.ready.set()
+
+    def start(self) -> threading.Thread:
+        """Run the warmups in a background thread so liveness probes answer meanwhile."""
+        thread = threading.Thread(target=self.run_warmups, name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready.is_set(),
+            "warmup": dict(self.components),
+            "warmup_seconds": (
+                round(self.finished_at - self.started_at, 3)
+                if self.finished_at is not None and self.started_at is not None else None
+            ),
+        }
+
+readiness = Readiness()
+metrics.gauge("runtime_ready", lambda: 1.0 if readiness.ready.is_set() else 0.0)
@@ -0,0 +1,98 @@
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional format
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+COMPACT_MEDIA_TYPE = "application/vnd.cvats.compact+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# format= values and the media types that select them through Accept
+FORMATS = {
+    "json": (JSON_MEDIA_TYPE,),
+    "compact": (COMPACT_MEDIA_TYPE,),
+    "msgpack": (MSGPACK_MEDIA_TYPE, "application/x-msgpack"),
+}
+
+def dumps_json(content: Any) -> bytes:
+    """Serialize to JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(content)).encode()
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return jsonable_encoder(value)
+
+def dumps_msgpack(content: Any) -> bytes:
+    if msgpack is None:
+        raise HTTPException(status_code=406, detail="MessagePack is not available on this server")
+    return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+def negotiate_format(request: Request, requested: Optional[str] = None) -> str:
+    """Pick the response format from `format=` or, failing that, the Accept header."""
+    if requested:
+        if requested not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unknown format: {requested}")
+        return requested
+    accept = request.headers.get("accept", "")
+    for name, media_types in FORMATS.items():
+        if name != "json" and any(media_type in accept for media_type in media_types):
+            return name
+    return "json"
+
+def encoder_for(fmt: str, to_compact: Callable[[Any], Any]) -> Callable[[Any], Tuple[bytes, str]]:
+    """Encoder producing (body, media type) for `fmt`; compact formats go through `to_compact`."""
+    if fmt == "compact":
+        return lambda content: (dumps_json(to_compact(content)), COMPACT_MEDIA_TYPE)
+    if fmt == "msgpack":
+        return lambda content: (dumps_msgpack(to_compact(content)), MSGPACK_MEDIA_TYPE)
+    return lambda content: (dumps_json(content), JSON_MEDIA_TYPE)
+
+# Score precision of the compact formats; rankings never need more than this
+COMPACT_SCORE_DIGITS = 4
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, COMPACT_SCORE_DIGITS) if isinstance(value, float) else value
+
+def columnar_rankings(ranked_candidates: List[Dict]) -> Dict:
+    """Turn rank_candidates output into parallel columns with the weights sent once.
+    
+    Scores are rounded to COMPACT_SCORE_DIGITS decimals.
+    """
+    columns: Dict[str, List] = {"candidate_id": [], "resume_id": [], "name": [], "match_score": []}
+    breakdown_keys: List[str] = []
+    weights: Dict[str, float] = {}
+    if ranked_candidates:
+        first_breakdown = ranked_candidates[0].get("breakdown", {})
+        weights = first_breakdown.get("weights", {})
+        breakdown_keys = [key for key in first_breakdown if key != "weights"]
+        for key in breakdown_keys:
+            columns[key] = []
+        if "duplicates" in ranked_candidates[0]:
+            columns["duplicates"] = []
+
+    for entry in ranked_candidates:
+        columns["candidate_id"].append(entry.get("candidate_id"))
+        columns["resume_id"].append(entry.get("resume_id"))
+        columns["name"].append(entry.get("name"))
+        columns["match_score"].append(_round(entry.get("match_score")))
+        breakdown = entry.get("breakdown", {})
+        for key in breakdown_keys:
+            columns[key].append(_round(breakdown.get(key)))
+        if "duplicates" in columns:
+            columns["duplicates"].append(entry.get("duplicates", []))
+
+    return {"count": len(ranked_candidates), "weights": weights, "columns": columns}
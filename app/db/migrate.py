@@ -0,0 +1,32 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Revision matching the schema create_all used to build
+BASELINE_REVISION = "0001"
+
+def alembic_config(connection=None) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    # Leave the application's logging alone
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """Migrate the database to `revision`.
+
+    A database created by create_all before migrations existed has tables but
+    no alembic_version; it is stamped at the baseline first, and the later
+    migrations only add what it is missing.
+    """
+    with engine.begin() as connection:
+        config = alembic_config(connection)
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "users" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
@@ -1,14 +1,68 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import metrics
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+def _engine_options(uri: str) -> dict:
+    if uri.startswith("sqlite"):
+        # Used for local runs and tests; SQLite manages its own connections
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+def _instrument(engine: Engine, role: str) -> None:
+    """Count pool connects/checkouts/checkins and expose pool occupancy."""
+    event.listen(engine, "connect", lambda *args: metrics.inc("db_pool_connects_total", engine=role))
+    event.listen(engine, "checkout", lambda *args: metrics.inc("db_pool_checkouts_total", engine=role))
+    event.listen(engine, "checkin", lambda *args: metrics.inc("db_pool_checkins_total", engine=role))
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        metrics.gauge("db_pool_checked_out", pool.checkedout, engine=role)
+    if hasattr(pool, "overflow"):
+        metrics.gauge("db_pool_overflow", pool.overflow, engine=role)
+
+def create_engines(primary_uri: str, replica_uri: str = None):
+    """Create the primary engine and the engine used for reads (the primary if no replica)."""
+    primary = create_engine(primary_uri, **_engine_options(primary_uri))
+    _instrument(primary, "primary")
+    if not replica_uri:
+        return primary, primary
+    replica = create_engine(replica_uri, **_engine_options(replica_uri))
+    _instrument(replica, "replica")
+    return primary, replica
+
+engine, read_engine = create_engines(settings.SQLALCHEMY_DATABASE_URI, settings.SQLALCHEMY_REPLICA_URI)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Dependency
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    """Session for the request: GET requests read from the replica, everything else from the primary.
+
+    A GET sees the replica's state, including the principal lookup and the
+    resource versions behind ETags, so it can miss a write made just before
+    (e.g. a PUT followed by a GET) for as long as the replica lags. Versions
+    are deliberately read from the same session as the body: a primary
+    version paired with a replica body would cache stale data under the new
+    version until the next write.
+    """
+    db = ReadSessionLocal() if request.method in ("GET", "HEAD") else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db():
+    """Read-only session for non-GET routes that only read, such as batch ranking."""
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
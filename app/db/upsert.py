@@ -0,0 +1,46 @@
+from typing import Dict, List, Sequence
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING ... RETURNING
+_ON_CONFLICT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def insert_ignore_conflicts(
+    db: Session,
+    model,
+    rows: List[Dict],
+    conflict_columns: Sequence[str],
+    returning: Sequence[str] = ("id",)
+) -> List[Dict]:
+    """Insert `rows` in the caller's transaction, skipping rows that hit the unique
+    constraint on `conflict_columns`. Returns the `returning` columns of the rows
+    actually inserted.
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    columns = [table.c[name] for name in returning]
+    dialect_insert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = (
+            dialect_insert(table)
+            .on_conflict_do_nothing(index_elements=list(conflict_columns))
+            .returning(*columns)
+        )
+        return [dict(row._mapping) for row in db.execute(statement, rows)]
+
+    # Other databases: one savepoint per row
+    inserted = []
+    for row in rows:
+        try:
+            with db.begin_nested():
+                result = db.execute(insert(table).values(**row).returning(*columns))
+                inserted.append(dict(result.one()._mapping))
+        except IntegrityError:
+            continue
+    return inserted
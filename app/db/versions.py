@@ -0,0 +1,25 @@
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.models import ResourceVersion
+
+def get_version(db: Session, name: str) -> int:
+    """Current version of a resource collection (0 if it was never changed)."""
+    version = db.query(ResourceVersion.version).filter(ResourceVersion.name == name).scalar()
+    return version or 0
+
+def bump_version(db: Session, name: str) -> None:
+    """Increment a resource version as part of the caller's transaction."""
+    result = db.execute(
+        update(ResourceVersion)
+        .where(ResourceVersion.name == name)
+        .values(version=ResourceVersion.version + 1)
+    )
+    if result.rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(ResourceVersion).values(name=name, version=1))
+    except IntegrityError:
+        # Another transaction created the row first
+        bump_version(db, name)
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.db.session import engine, SessionLocal
-from app.db.base_class import Base
+from app.db.migrate import upgrade_database
 from app.models.models import User, Job, Skill
 from app.core.config import settings
 from passlib.context import CryptContext
@@ -9,8 +9,8 @@ from passlib.context import CryptContext
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def init_db() -> None:
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create or migrate the schema
+    upgrade_database(engine)
     
     db = SessionLocal()
     try:
@@ -1,7 +1,21 @@
-from fastapi import FastAPI
+from app.core.runtime import configure_threads, readiness
+
+# Thread counts are read once when numpy/torch load, so set them before any model import
+configure_threads()
+
+import logging
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import auth, jobs, candidates, resumes, applications
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from app.api.endpoints import auth, jobs, candidates, resumes, applications, stats, diagnostics
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.services.search_index import resume_index
+from app.services.search_sync import register_outbox_listener
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="CV-ATS API",
@@ -12,6 +26,10 @@ app = FastAPI(
     redoc_url="/redoc"  # ReDoc will be available at /redoc
 )
 
+# Record search index changes alongside every write
+if settings.ELASTICSEARCH_SYNC_ENABLED:
+    register_outbox_listener(SessionLocal)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -19,14 +37,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # Pagination cursor and cache validators
 )
 
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_STR, tags=["Authentication"])
+# Routers share the prefix and are matched in order: /stats must come before
+# the jobs router's /{job_id}, which would take it and answer 422
+app.include_router(stats.router, prefix=settings.API_V1_STR, tags=["Statistics"])
 app.include_router(jobs.router, prefix=settings.API_V1_STR, tags=["Jobs"])
 app.include_router(candidates.router, prefix=settings.API_V1_STR, tags=["Candidates"])
 app.include_router(resumes.router, prefix=settings.API_V1_STR, tags=["Resumes"])
-app.include_router(applications.router, prefix=settings.API_V1_STR, tags=["Applications"])
+# Its "/" and "/{application_id}" routes would collide with the jobs router's
+app.include_router(applications.router, prefix=f"{settings.API_V1_STR}/applications", tags=["Applications"])
+app.include_router(diagnostics.router, prefix=settings.API_V1_STR, tags=["Diagnostics"])
 
 @app.get("/")
 async def root():
@@ -36,6 +60,43 @@ async def root():
         "base_url": settings.BASE_URL
     }
 
+@app.on_event("startup")
+def start_warmup():
+    if settings.WARMUP_ENABLED:
+        readiness.start()
+    else:
+        readiness.ready.set()
+
+@app.on_event("startup")
+def start_index_writer():
+    # One worker persists the keyword index; the others only load what it saved
+    resume_index.start_writer()
+
+@app.get("/health/live")
+async def liveness():
+    """The process is up and serving; never depends on models or the database."""
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def readiness_check():
+    """Ready for traffic once warmup inference has run and the database answers."""
+    status = readiness.status()
+    try:
+        with SessionLocal() as db:
+            db.execute(text("SELECT 1"))
+        status["database"] = "ok"
+    except Exception:
+        # Exception text can carry connection details; it goes to the log only
+        logger.exception("Readiness check could not reach the database")
+        status["database"] = "error"
+    ready = status["ready"] and status["database"] == "ok"
+    return JSONResponse(status_code=200 if ready else 503, content=status)
+
+@app.get("/metrics", dependencies=[Depends(auth.get_current_admin)])
+async def get_metrics():
+    """In-process counters, timings and gauges of this worker. Administrators only."""
+    return metrics.snapshot()
+
 # For Vercel serverless deployment
 if __name__ == "__main__":
     import uvicorn
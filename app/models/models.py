@@ -1,14 +1,17 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime, Float, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, LargeBinary, String, Text, DateTime, Float, Table, Index, UniqueConstraint
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
+from app.db.types import CompressedText
 
 # Association table for many-to-many relationship between jobs and skills
 job_skills = Table(
     'job_skills',
     Base.metadata,
-    Column('job_id', Integer, ForeignKey('jobs.id')),
-    Column('skill_id', Integer, ForeignKey('skills.id'))
+    Column('job_id', Integer, ForeignKey('jobs.id'), primary_key=True),
+    Column('skill_id', Integer, ForeignKey('skills.id'), primary_key=True),
+    # Jobs requiring a skill
+    Index('ix_job_skills_skill_id', 'skill_id')
 )
 
 class User(Base):
@@ -29,11 +32,20 @@ class Resume(Base):
     candidate_id = Column(Integer, ForeignKey("candidates.id"))
     file_path = Column(String)
     parsed_data = Column(Text)  # JSON string of parsed resume data
+    # Extracted CV text, zlib-compressed and only loaded when accessed or undeferred
+    raw_text = deferred(Column(CompressedText))
+    minhash = Column(LargeBinary)  # MinHash signature of the raw text
+    duplicate_of_id = Column(Integer, ForeignKey("resumes.id"), index=True)  # original of a near-duplicate
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     candidate = relationship("Candidate", back_populates="resumes")
 
+    __table_args__ = (
+        # Keyset pagination of a candidate's resumes
+        Index("ix_resumes_candidate_created_id", "candidate_id", "created_at", "id"),
+    )
+
 class Candidate(Base):
     __tablename__ = "candidates"
 
@@ -65,6 +77,12 @@ class Job(Base):
     skills = relationship("Skill", secondary=job_skills, back_populates="jobs")
     applications = relationship("Application", back_populates="job")
 
+    __table_args__ = (
+        # Keyset pagination of the (active) job list
+        Index("ix_jobs_created_id", "created_at", "id"),
+        Index("ix_jobs_active_created_id", "is_active", "created_at", "id"),
+    )
+
 class Skill(Base):
     __tablename__ = "skills"
 
@@ -79,8 +97,8 @@ class Application(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(Integer, ForeignKey("jobs.id"))
-    candidate_id = Column(Integer, ForeignKey("candidates.id"))
-    resume_id = Column(Integer, ForeignKey("resumes.id"))
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), index=True)
     status = Column(String)  # pending, shortlisted, rejected
     match_score = Column(Float)  # ML-based matching score
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -88,4 +106,37 @@ class Application(Base):
 
     job = relationship("Job", back_populates="applications")
     candidate = relationship("Candidate", back_populates="applications")
-    resume = relationship("Resume") 
\ No newline at end of file
+    resume = relationship("Resume")
+
+    __table_args__ = (
+        # Keyset pagination of the application list
+        Index("ix_applications_created_id", "created_at", "id"),
+        # One application per resume and job; bulk creation skips existing pairs
+        UniqueConstraint("job_id", "resume_id", name="uq_applications_job_resume"),
+    )
+
+class SearchOutbox(Base):
+    """Pending search-index change, written in the same transaction as the entity."""
+    __tablename__ = "search_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String, nullable=False)  # resume, job, application
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False)  # upsert, delete
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text)
+    available_at = Column(DateTime(timezone=True), server_default=func.now())  # retry backoff
+    processed_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Claiming pending rows in order
+        Index("ix_search_outbox_pending", "processed_at", "available_at", "id"),
+    )
+
+class ResourceVersion(Base):
+    """Monotonic change counter of a resource collection, used to version cached responses."""
+    __tablename__ = "resource_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class Candidate(BaseModel):
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    experience_years: Optional[float] = None
+    education_level: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
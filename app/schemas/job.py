@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class Job(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    requirements: Optional[str] = None
+    min_experience: Optional[float] = None
+    education_required: Optional[str] = None
+    is_active: bool = True
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,243 @@
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set
+import numpy as np
+from sqlalchemy.orm import Session, undefer
+from app.core.config import settings
+from app.models.models import Resume
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+
+# Hash permutations (a * x + b) mod p. The seed is fixed: stored signatures are
+# only comparable when every process uses the same permutations.
+_rng = np.random.default_rng(20240501)
+_PERMUTATION_A = _rng.integers(1, _MERSENNE_PRIME, size=settings.DEDUP_NUM_PERM, dtype=np.uint64)
+_PERMUTATION_B = _rng.integers(0, _MERSENNE_PRIME, size=settings.DEDUP_NUM_PERM, dtype=np.uint64)
+
+def shingles(text: str, size: int = None) -> Set[str]:
+    """Word n-grams of the normalized text; short texts become a single shingle."""
+    size = size or settings.DEDUP_SHINGLE_SIZE
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (DEDUP_NUM_PERM uint32 values) of the text's shingles.
+
+    None for texts under DEDUP_MIN_WORDS words: scanned PDFs and failed
+    extractions would otherwise share one signature and all match each other.
+    """
+    if len(_WORD.findall(text)) < settings.DEDUP_MIN_WORDS:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode()) for shingle in shingles(text)), dtype=np.uint64
+    )
+    # (num_perm, n_shingles); products stay below 2**63
+    permuted = (_PERMUTATION_A[:, None] * (hashes[None, :] % _MERSENNE_PRIME) + _PERMUTATION_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4")
+
+def estimated_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.mean(first == second))
+
+class DuplicateMatch(NamedTuple):
+    resume_id: int
+    similarity: float
+
+class MinHashLSH:
+    """Banded LSH over MinHash signatures.
+
+    Signatures are split into DEDUP_BANDS bands; two resumes become candidates
+    when any band is identical, so a query only looks at a few buckets instead
+    of every stored resume.
+    """
+
+    def __init__(self, num_perm: int = None, bands: int = None):
+        self.num_perm = num_perm or settings.DEDUP_NUM_PERM
+        self.bands = bands or settings.DEDUP_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError("DEDUP_NUM_PERM must be a multiple of DEDUP_BANDS")
+        self.rows = self.num_perm // self.bands
+        self.signatures: Dict[int, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [defaultdict(set) for _ in range(self.bands)]
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def insert(self, key: int, signature: np.ndarray) -> None:
+        self.remove(key)
+        self.signatures[key] = signature
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            buckets[band_key].add(key)
+
+    def remove(self, key: int) -> None:
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def query(self, signature: np.ndarray, threshold: float) -> List[DuplicateMatch]:
+        """Stored keys whose estimated similarity is at least `threshold`, best first."""
+        candidates: Set[int] = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates |= buckets.get(band_key, set())
+        matches = [
+            DuplicateMatch(key, estimated_similarity(signature, self.signatures[key]))
+            for key in candidates
+        ]
+        matches = [match for match in matches if match.similarity >= threshold]
+        matches.sort(key=lambda match: (-match.similarity, match.resume_id))
+        return matches
+
+class DuplicateIndex(MinHashLSH):
+    """LSH index of stored resume signatures, kept in sync with the database.
+
+    `sync` reads signatures above the highest indexed id and, every
+    INDEX_RECONCILE_SECONDS, compares all signed ids with the index, so rows
+    committed out of id order are picked up.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.max_resume_id = 0
+        self._reconciled_at = None
+        self._lock = threading.Lock()
+
+    def sync(self, db: Session) -> None:
+        """Add signatures of resumes stored since the last sync (or since start-up)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._reconciled_at is None or now - self._reconciled_at >= settings.INDEX_RECONCILE_SECONDS:
+                self._reconcile(db)
+                self._reconciled_at = now
+                return
+            rows = (
+                db.query(Resume.id, Resume.minhash)
+                .filter(Resume.id > self.max_resume_id, Resume.minhash.isnot(None))
+                .order_by(Resume.id)
+                .all()
+            )
+            for resume_id, minhash in rows:
+                self.insert(resume_id, signature_from_bytes(minhash))
+                self.max_resume_id = resume_id
+
+    def _reconcile(self, db: Session, batch_size: int = 500) -> None:
+        stored = {resume_id for (resume_id,) in db.query(Resume.id).filter(Resume.minhash.isnot(None))}
+        for resume_id in set(self.signatures) - stored:
+            self.remove(resume_id)
+        missing = sorted(stored - set(self.signatures))
+        for start in range(0, len(missing), batch_size):
+            rows = db.query(Resume.id, Resume.minhash).filter(Resume.id.in_(missing[start:start + batch_size]))
+            for resume_id, minhash in rows:
+                self.insert(resume_id, signature_from_bytes(minhash))
+        if stored:
+            self.max_resume_id = max(self.max_resume_id, max(stored))
+
+    def add_resume(self, resume_id: int, signature: np.ndarray) -> None:
+        with self._lock:
+            self.insert(resume_id, signature)
+            self.max_resume_id = max(self.max_resume_id, resume_id)
+
+    def remove_resume(self, resume_id: int) -> None:
+        with self._lock:
+            self.remove(resume_id)
+
+    def find_duplicate(self, db: Session, signature: np.ndarray) -> Optional[Resume]:
+        """Oldest original of the closest stored near-duplicate, or None."""
+        self.sync(db)
+        with self._lock:
+            matches = self.query(signature, settings.DEDUP_THRESHOLD)
+        for match in matches:
+            resume = db.get(Resume, match.resume_id)
+            if resume is None:
+                # Deleted by another worker
+                self.remove_resume(match.resume_id)
+                continue
+            if resume.duplicate_of_id is not None:
+                original = db.get(Resume, resume.duplicate_of_id)
+                if original is not None:
+                    return original
+            return resume
+        return None
+
+def flag_duplicate(db: Session, resume: Resume, signature: np.ndarray) -> Optional[Resume]:
+    """Store the signature on a new resume and link it to an earlier near-duplicate.
+
+    A duplicate points at the original through duplicate_of_id and is attached
+    to the original's candidate when the upload did not name one; an explicit,
+    different candidate is kept so agency submissions stay visible.
+    """
+    # Look up before setting the signature: autoflush would otherwise let sync()
+    # index a stored resume under its own signature and match it with itself
+    original = duplicate_index.find_duplicate(db, signature)
+    resume.minhash = signature_to_bytes(signature)
+    if original is None:
+        return None
+    resume.duplicate_of_id = original.id
+    if resume.candidate_id is None:
+        resume.candidate_id = original.candidate_id
+    return original
+
+def detach_duplicates(db: Session, resume: Resume) -> None:
+    """Before deleting `resume`, promote its oldest duplicate to be the new original."""
+    duplicates = (
+        db.query(Resume)
+        .filter(Resume.duplicate_of_id == resume.id)
+        .order_by(Resume.id)
+        .all()
+    )
+    if not duplicates:
+        return
+    new_original = duplicates[0]
+    new_original.duplicate_of_id = None
+    for duplicate in duplicates[1:]:
+        duplicate.duplicate_of_id = new_original.id
+
+def backfill_signatures(db: Session, batch_size: int = 500) -> int:
+    """Sign and flag stored resumes that have no signature yet, oldest first.
+
+    Older resumes are processed first so the earliest copy of a group stays
+    the original. Resumes with too little text stay unsigned. Commits once
+    per batch and returns the number signed.
+    """
+    signed = 0
+    last_id = 0
+    while True:
+        resumes = (
+            db.query(Resume)
+            .options(undefer(Resume.raw_text))
+            .filter(Resume.id > last_id, Resume.minhash.is_(None))
+            .order_by(Resume.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not resumes:
+            return signed
+        for resume in resumes:
+            signature = minhash_signature(resume.raw_text or "")
+            if signature is None:
+                continue
+            flag_duplicate(db, resume, signature)
+            duplicate_index.add_resume(resume.id, signature)
+            signed += 1
+        db.commit()
+        last_id = resumes[-1].id
+
+# Shared per-process duplicate index
+duplicate_index = DuplicateIndex()
@@ -0,0 +1,90 @@
+import io
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterator, List, Union
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+PARAGRAPH = W_NS + "p"
+TEXT = W_NS + "t"
+# Run content that stands for a character of its own
+SPECIAL_CHARACTERS = {
+    W_NS + "tab": "\t",
+    W_NS + "br": "\n",
+    W_NS + "cr": "\n",
+    W_NS + "noBreakHyphen": "-",
+}
+# Legacy copy of drawings/text boxes; the mc:Choice branch already holds the text
+FALLBACK = MC_NS + "Fallback"
+
+DocxSource = Union[str, bytes, BinaryIO]
+
+def _part_number(name: str) -> int:
+    match = re.search(r"(\d+)\.xml$", name)
+    return int(match.group(1)) if match else 0
+
+def _text_parts(archive: zipfile.ZipFile) -> List[str]:
+    """Headers, main document and footers, in that order."""
+    names = archive.namelist()
+    if "word/document.xml" not in names:
+        raise ValueError("Not a DOCX file: word/document.xml is missing")
+    headers = sorted((name for name in names if re.match(r"word/header\d*\.xml$", name)), key=_part_number)
+    footers = sorted((name for name in names if re.match(r"word/footer\d*\.xml$", name)), key=_part_number)
+    return headers + ["word/document.xml"] + footers
+
+def _iter_part_paragraphs(stream: BinaryIO) -> Iterator[str]:
+    """Yield the text of every paragraph of one WordprocessingML part.
+
+    Elements are cleared and detached as soon as they end, so memory stays
+    bounded by the nesting depth rather than the size of the document.
+    Paragraphs nested in text boxes are yielded before the paragraph that
+    anchors them.
+    """
+    stack = []
+    buffers: List[List[str]] = []
+    skip_depth = 0
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == FALLBACK:
+                skip_depth += 1
+            elif elem.tag == PARAGRAPH and not skip_depth:
+                buffers.append([])
+            continue
+
+        tag = elem.tag
+        if tag == FALLBACK:
+            skip_depth -= 1
+        elif not skip_depth and buffers:
+            if tag == TEXT:
+                buffers[-1].append(elem.text or "")
+            elif tag in SPECIAL_CHARACTERS:
+                buffers[-1].append(SPECIAL_CHARACTERS[tag])
+            elif tag == PARAGRAPH:
+                yield "".join(buffers.pop())
+
+        stack.pop()
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+def iter_docx_paragraphs(source: DocxSource) -> Iterator[str]:
+    """Yield paragraph texts of a DOCX file, including tables, text boxes, headers and footers."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        archive = zipfile.ZipFile(source)
+    except zipfile.BadZipFile as exc:
+        raise ValueError("Not a DOCX file: invalid zip archive") from exc
+
+    with archive:
+        for name in _text_parts(archive):
+            with archive.open(name) as stream:
+                yield from _iter_part_paragraphs(stream)
+
+def extract_docx_text(source: DocxSource) -> str:
+    """Extract text from a DOCX path, file object or bytes, one line per paragraph."""
+    return "\n".join(iter_docx_paragraphs(source))
@@ -0,0 +1,110 @@
+import re
+from datetime import date
+from typing import Iterable, List, NamedTuple, Optional
+from app.services.section_segmenter import Section, section_text
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+def _date(prefix: str) -> str:
+    """A month-and-year or year-only date; group names are prefixed so two can share a pattern."""
+    return (
+        rf"(?:(?:(?P<{prefix}_month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?"
+        rf"|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?,?\s*"
+        rf"|(?P<{prefix}_month_number>0?[1-9]|1[0-2])\s*[/.]\s*))?"
+        rf"(?P<{prefix}_year>(?:19|20)\d\d)"
+    )
+
+_PRESENT = r"(?P<present>present|current(?:ly)?|now|today|ongoing|date)"
+_SEPARATOR = r"\s*(?:-|–|—|to|until|till|through|thru)\s*"
+
+# "Jan 2019 – Present", "2015-2018", "03/2016 to 11/2017", "May 2012 - June 2014"
+_RANGE = re.compile(
+    rf"(?<![\w/.]){_date('start')}{_SEPARATOR}(?:{_date('end')}|{_PRESENT})(?![\w/])",
+    re.IGNORECASE
+)
+# "since March 2020"
+_SINCE = re.compile(rf"\bsince\s+{_date('start')}(?![\w/])", re.IGNORECASE)
+# "3+ yrs", "5 years of experience", "over 10 years"
+_DURATION = re.compile(r"\b(?P<years>\d{1,2}(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+
+# Claimed durations above this are typos or not about tenure ("20 years old" is fine, "150 yrs" is not)
+_MAX_CLAIMED_YEARS = 50
+
+class DateRange(NamedTuple):
+    start: int  # months since year 0
+    end: int  # exclusive
+
+def _has_month(match, prefix: str) -> bool:
+    return bool(match.group(f"{prefix}_month") or match.group(f"{prefix}_month_number"))
+
+def _months(match, prefix: str, inclusive: bool) -> int:
+    year = int(match.group(f"{prefix}_year"))
+    month_name = match.group(f"{prefix}_month")
+    month_number = match.group(f"{prefix}_month_number")
+    if month_name:
+        month = _MONTHS[month_name[:3].lower()]
+    elif month_number:
+        month = int(month_number)
+    else:
+        # Year-only dates count from January, so "2015-2018" is three years
+        return year * 12
+    return year * 12 + month - 1 + (1 if inclusive else 0)
+
+def find_date_ranges(text: str, today: Optional[date] = None) -> List[DateRange]:
+    """Every employment-style date range in `text`, in order of appearance."""
+    today = today or date.today()
+    now = today.year * 12 + today.month
+    ranges = []
+    for match in _RANGE.finditer(text):
+        start = _months(match, "start", inclusive=False)
+        if match.group("present"):
+            end = now
+        elif _has_month(match, "start") and not _has_month(match, "end"):
+            # "Dec 2018 - 2019" runs through December 2019, not up to its January
+            end = (int(match.group("end_year")) + 1) * 12
+        else:
+            end = _months(match, "end", inclusive=True)
+        if start < min(end, now + 1):
+            ranges.append(DateRange(start, min(end, now)))
+    for match in _SINCE.finditer(text):
+        start = _months(match, "start", inclusive=False)
+        if start < now:
+            ranges.append(DateRange(start, now))
+    return ranges
+
+def merge_ranges(ranges: Iterable[DateRange]) -> List[DateRange]:
+    """Merge overlapping or touching ranges so concurrent jobs are counted once."""
+    merged: List[DateRange] = []
+    for current in sorted(ranges):
+        if merged and current.start <= merged[-1].end:
+            merged[-1] = DateRange(merged[-1].start, max(merged[-1].end, current.end))
+        else:
+            merged.append(current)
+    return merged
+
+def claimed_years(text: str) -> Optional[float]:
+    """Largest explicit duration such as "3+ yrs", or None."""
+    claims = [float(match.group("years")) for match in _DURATION.finditer(text)]
+    claims = [claim for claim in claims if claim <= _MAX_CLAIMED_YEARS]
+    return max(claims) if claims else None
+
+def total_experience_years(
+    text: str,
+    sections: Optional[List[Section]] = None,
+    today: Optional[date] = None
+) -> float:
+    """Total non-overlapping tenure in years, rounded to one decimal.
+
+    Date ranges are read from the Experience sections when `sections` has any,
+    so study periods under Education are not counted, and from the whole text
+    otherwise. Without any date range the largest explicit duration anywhere in
+    the text is used instead.
+    """
+    tenure_text = (section_text(text, sections, "experience") if sections else "") or text
+    ranges = merge_ranges(find_date_ranges(tenure_text, today))
+    if ranges:
+        return round(sum(current.end - current.start for current in ranges) / 12, 1)
+    return claimed_years(text) or 0.0
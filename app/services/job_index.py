@@ -0,0 +1,147 @@
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from app.models.models import Job
+
+# Combine scores (70% skills, 30% experience)
+SKILL_WEIGHT = 0.7
+EXPERIENCE_WEIGHT = 0.3
+
+class JobMatchResult(NamedTuple):
+    job_id: int
+    match_score: float
+    matched_skills: List[str]
+
+class _Snapshot(NamedTuple):
+    version: Tuple
+    job_ids: np.ndarray            # (n_jobs,) int64
+    skill_vocab: Dict[str, int]    # lower-cased skill name -> column
+    required: np.ndarray           # (n_jobs, n_skills) bool, required-skill bitset per job
+    skill_counts: np.ndarray       # (n_jobs,) number of required skills
+    min_experience: np.ndarray     # (n_jobs,) float64
+    job_skills: List[List[str]]    # lower-cased required skills per job
+
+class ActiveJobIndex:
+    """Precomputed matrix view of all active jobs for one-pass resume matching.
+
+    The index is rebuilt lazily whenever the active job set changes. Local writes
+    call `invalidate()`; writes made by other workers are picked up through a
+    cheap aggregate version query on the jobs table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+
+    def invalidate(self) -> None:
+        """Drop the current snapshot so the next lookup rebuilds it."""
+        self._snapshot = None
+
+    def _current_version(self, db: Session) -> Tuple:
+        count, last_change = db.query(
+            func.count(Job.id),
+            func.max(func.coalesce(Job.updated_at, Job.created_at))
+        ).filter(Job.is_active == True).one()
+        return (count, last_change)
+
+    def _build(self, db: Session, version: Tuple) -> _Snapshot:
+        jobs = (
+            db.query(Job)
+            .options(selectinload(Job.skills))
+            .filter(Job.is_active == True)
+            .order_by(Job.id)
+            .all()
+        )
+
+        skill_vocab: Dict[str, int] = {}
+        job_skills = []
+        for job in jobs:
+            names = sorted({skill.name.lower() for skill in job.skills if skill.name})
+            for name in names:
+                skill_vocab.setdefault(name, len(skill_vocab))
+            job_skills.append(names)
+
+        required = np.zeros((len(jobs), len(skill_vocab)), dtype=bool)
+        for row, names in enumerate(job_skills):
+            required[row, [skill_vocab[name] for name in names]] = True
+
+        return _Snapshot(
+            version=version,
+            job_ids=np.array([job.id for job in jobs], dtype=np.int64),
+            skill_vocab=skill_vocab,
+            required=required,
+            skill_counts=required.sum(axis=1),
+            min_experience=np.array([job.min_experience or 0.0 for job in jobs], dtype=np.float64),
+            job_skills=job_skills
+        )
+
+    def snapshot(self, db: Session) -> _Snapshot:
+        """Return an up-to-date snapshot, rebuilding it if the active jobs changed."""
+        version = self._current_version(db)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._build(db, version)
+                self._snapshot = snapshot
+        return snapshot
+
+    def match(
+        self,
+        db: Session,
+        resume_skills: Iterable[str],
+        experience_years: float,
+        top_n: Optional[int] = None
+    ) -> Tuple[List[JobMatchResult], List[str]]:
+        """Score a resume against every active job in one vectorized pass.
+
+        Returns the matches sorted by score (limited to `top_n` if given) and the
+        resume skills that are required by at least one active job.
+        """
+        snapshot = self.snapshot(db)
+        resume_skill_set = {skill.lower() for skill in resume_skills if skill}
+        known_skills = sorted(skill for skill in resume_skill_set if skill in snapshot.skill_vocab)
+        columns = [snapshot.skill_vocab[skill] for skill in known_skills]
+
+        matched_counts = snapshot.required[:, columns].sum(axis=1)
+        skill_scores = np.divide(
+            matched_counts, snapshot.skill_counts,
+            out=np.zeros(len(snapshot.job_ids)), where=snapshot.skill_counts > 0
+        )
+
+        required_experience = snapshot.min_experience
+        experience_scores = np.where(
+            required_experience > 0,
+            np.minimum((experience_years or 0) / np.where(required_experience > 0, required_experience, 1), 1.0),
+            1.0
+        )
+
+        scores = SKILL_WEIGHT * skill_scores + EXPERIENCE_WEIGHT * experience_scores
+
+        if top_n is not None and top_n < len(scores):
+            rows = np.argpartition(-scores, top_n)[:top_n]
+            rows = rows[np.argsort(-scores[rows], kind="stable")]
+        else:
+            rows = np.argsort(-scores, kind="stable")
+
+        matches = [
+            JobMatchResult(
+                job_id=int(snapshot.job_ids[row]),
+                match_score=float(scores[row]),
+                matched_skills=[skill for skill in snapshot.job_skills[row] if skill in resume_skill_set]
+            )
+            for row in rows
+        ]
+
+        demanded = snapshot.required[:, columns].any(axis=0)
+        demanded_skills = [skill for skill, hit in zip(known_skills, demanded) if hit]
+
+        return matches, demanded_skills
+
+# Shared per-process index
+job_index = ActiveJobIndex()
@@ -1,18 +1,71 @@
-from typing import Dict, List, Tuple
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import spacy
 from transformers import AutoTokenizer, AutoModel
 import torch
 from app.core.config import settings
+from app.services.skill_index import SkillIndex, skill_key
+
+# Weights of the score components
+MATCH_WEIGHTS = {
+    "skills": 0.3,
+    "experience": 0.25,
+    "education": 0.2,
+    "semantic": 0.25
+}
+
+# Simple education level matching
+EDUCATION_LEVELS = {
+    "phd": 4,
+    "master": 3,
+    "bachelor": 2,
+    "associate": 1
+}
+
+# Sample input for warmup inference
+WARMUP_TEXT = (
+    "Senior Python developer with 5 years of experience building REST APIs "
+    "with FastAPI and PostgreSQL. Bachelor of Science in Computer Science."
+)
 
 class JobMatcher:
     def __init__(self):
         self.nlp = spacy.load(settings.SPACY_MODEL)
         self.tokenizer = AutoTokenizer.from_pretrained(settings.BERT_MODEL)
         self.model = AutoModel.from_pretrained(settings.BERT_MODEL)
-        self.tfidf_vectorizer = TfidfVectorizer(stop_words='english')
+        # Optional BM25 index over resume text (see app.services.search_index)
+        self.lexical_index = None
+        self.lexical_weight = settings.SEARCH_LEXICAL_WEIGHT
+        # Known skills for fuzzy skill matching ("postgres" -> "postgresql")
+        self.skill_index = SkillIndex(self.get_skill_vectors)
+
+    def warmup(self) -> None:
+        """Run one small inference so the first request does not pay for lazy allocations."""
+        self.get_bert_embeddings([WARMUP_TEXT, WARMUP_TEXT[:40]])
+        self.get_skill_vectors(["python", "postgresql"])
+
+    def get_skill_vectors(self, skills: List[str]) -> np.ndarray:
+        """Vectors of skill names: averaged spaCy word vectors, or BERT with SKILL_VECTORS=bert."""
+        if settings.SKILL_VECTORS == "bert":
+            return self.get_bert_embeddings(skills)
+        return np.array([self.nlp.make_doc(skill).vector for skill in skills], dtype=np.float32)
+
+    def get_bert_embeddings(self, texts: List[str], batch_size: int = 16) -> np.ndarray:
+        """Get BERT [CLS] embeddings for many texts, one forward pass per batch."""
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                return_tensors="pt", padding=True, truncation=True, max_length=512
+            )
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+                embeddings.append(outputs.last_hidden_state[:, 0, :].numpy())
+        if not embeddings:
+            return np.zeros((0, self.model.config.hidden_size), dtype=np.float32)
+        return np.vstack(embeddings)
 
     def get_bert_embedding(self, text: str) -> np.ndarray:
         """Get BERT embedding for a text."""
@@ -32,8 +85,8 @@ class JobMatcher:
         if not resume_skills or not job_skills:
             return 0.0
         
-        # Convert to sets for easier comparison
-        resume_skill_set = set(skill.lower() for skill in resume_skills)
+        # Map resume skills onto the nearest of the job's skills, then compare sets
+        resume_skill_set = self.skill_index.canonicalize(resume_skills, job_skills)
         job_skill_set = set(skill.lower() for skill in job_skills)
         
         # Calculate Jaccard similarity
@@ -58,16 +111,8 @@ class JobMatcher:
         if not resume_edu or not job_req_edu:
             return 0.0
         
-        # Simple education level matching
-        edu_levels = {
-            "phd": 4,
-            "master": 3,
-            "bachelor": 2,
-            "associate": 1
-        }
-        
-        job_level = edu_levels.get(job_req_edu.lower(), 0)
-        resume_levels = [edu_levels.get(edu["degree"].lower(), 0) for edu in resume_edu if edu["degree"]]
+        job_level = EDUCATION_LEVELS.get(job_req_edu.lower(), 0)
+        resume_levels = [EDUCATION_LEVELS.get(edu["degree"].lower(), 0) for edu in resume_edu if edu["degree"]]
         
         if not resume_levels:
             return 0.0
@@ -85,7 +130,26 @@ class JobMatcher:
         similarity = cosine_similarity([emb1], [emb2])[0][0]
         return float(similarity)
 
-    def match_resume_to_job(self, resume_data: Dict, job_data: Dict) -> Tuple[float, Dict]:
+    def get_lexical_query(self, job_data: Dict) -> str:
+        """Build the keyword query used for lexical matching of a job."""
+        return " ".join([
+            job_data.get("description") or "",
+            job_data.get("requirements") or "",
+            " ".join(job_data.get("required_skills", []))
+        ])
+
+    def calculate_lexical_scores(self, resume_ids: List[int], job_data: Dict) -> Dict[int, float]:
+        """Calculate normalized BM25 scores of resumes against a job's text."""
+        if self.lexical_index is None:
+            return {}
+        return self.lexical_index.score_documents(self.get_lexical_query(job_data), resume_ids)
+
+    def match_resume_to_job(
+        self,
+        resume_data: Dict,
+        job_data: Dict,
+        lexical_score: Optional[float] = None
+    ) -> Tuple[float, Dict]:
         """Match a resume to a job and return match score and detailed breakdown."""
         # Calculate individual component scores
         skill_score = self.calculate_skill_match(
@@ -110,12 +174,7 @@ class JobMatcher:
         )
         
         # Calculate weighted final score
-        weights = {
-            "skills": 0.3,
-            "experience": 0.25,
-            "education": 0.2,
-            "semantic": 0.25
-        }
+        weights = dict(MATCH_WEIGHTS)
         
         final_score = (
             weights["skills"] * skill_score +
@@ -133,22 +192,289 @@ class JobMatcher:
             "weights": weights
         }
         
+        # Blend in keyword relevance when a lexical index is attached
+        if self.lexical_index is not None and self.lexical_weight > 0:
+            if lexical_score is None:
+                resume_id = resume_data.get("resume_id")
+                lexical_score = self.calculate_lexical_scores([resume_id], job_data).get(resume_id, 0.0)
+            weights = {name: weight * (1 - self.lexical_weight) for name, weight in weights.items()}
+            weights["lexical"] = self.lexical_weight
+            final_score = final_score * (1 - self.lexical_weight) + self.lexical_weight * lexical_score
+            breakdown["lexical_match"] = lexical_score
+            breakdown["weights"] = weights
+        
         return final_score, breakdown
 
-    def rank_candidates(self, candidates: List[Dict], job_data: Dict) -> List[Dict]:
-        """Rank multiple candidates for a job."""
+    def rank_candidates(
+        self,
+        candidates: List[Dict],
+        job_data: Dict,
+        collapse_duplicates: bool = False
+    ) -> List[Dict]:
+        """Rank multiple candidates for a job.
+        
+        With collapse_duplicates, near-duplicate resumes (see app.services.dedup)
+        are scored once: the newest copy of each group is ranked and the others
+        are listed under "duplicates".
+        """
         ranked_candidates = []
+        duplicates: Dict[int, List[int]] = {}
+        if collapse_duplicates:
+            candidates, duplicates = self.collapse_duplicates(candidates)
+        
+        # Score keyword relevance for the whole pool in one index pass
+        lexical_scores = {}
+        if self.lexical_index is not None and self.lexical_weight > 0:
+            lexical_scores = self.calculate_lexical_scores(
+                [candidate.get("resume_id") for candidate in candidates], job_data
+            )
         
         for candidate in candidates:
-            score, breakdown = self.match_resume_to_job(candidate, job_data)
+            score, breakdown = self.match_resume_to_job(
+                candidate, job_data, lexical_scores.get(candidate.get("resume_id"))
+            )
             ranked_candidates.append({
                 "candidate_id": candidate.get("id"),
+                "resume_id": candidate.get("resume_id"),
                 "name": candidate.get("name"),
                 "match_score": score,
                 "breakdown": breakdown
             })
+            if collapse_duplicates:
+                ranked_candidates[-1]["duplicates"] = duplicates.get(candidate.get("resume_id"), [])
         
         # Sort by match score in descending order
         ranked_candidates.sort(key=lambda x: x["match_score"], reverse=True)
         
-        return ranked_candidates 
\ No newline at end of file
+        return ranked_candidates
+
+    @staticmethod
+    def collapse_duplicates(candidates: List[Dict]) -> Tuple[List[Dict], Dict[int, List[int]]]:
+        """Keep the newest resume of each near-duplicate group.
+        
+        Returns the kept candidates and, per kept resume id, the resume ids of
+        the copies that were dropped.
+        """
+        groups: Dict[int, List[Dict]] = {}
+        for candidate in candidates:
+            root = candidate.get("duplicate_of") or candidate.get("resume_id")
+            groups.setdefault(root, []).append(candidate)
+        
+        kept, duplicates = [], {}
+        for group in groups.values():
+            group.sort(key=lambda candidate: candidate.get("resume_id") or 0, reverse=True)
+            kept.append(group[0])
+            duplicates[group[0].get("resume_id")] = sorted(candidate.get("resume_id") for candidate in group[1:])
+        return kept, duplicates
+
+    # Batch matching
+
+    def _job_features(self, jobs: List[Dict]) -> Dict:
+        """Precompute the job side of the score matrix."""
+        skill_sets = [{skill.lower() for skill in job.get("required_skills", []) if skill} for job in jobs]
+        vocab: Dict[str, int] = {}
+        for skill_set in skill_sets:
+            for skill in sorted(skill_set):
+                vocab.setdefault(skill, len(vocab))
+        self.skill_index.add(vocab)
+        embeddings = self.get_bert_embeddings([job.get("description") or "" for job in jobs])
+        return {
+            "vocab": list(vocab),
+            # Vocabulary columns of every job's skills, in the order canonicalize compares them
+            "skill_columns": [np.array([vocab[skill] for skill in sorted(skill_set)], dtype=np.int64) for skill_set in skill_sets],
+            "min_experience": np.array([
+                np.nan if job.get("min_experience") is None else job["min_experience"] for job in jobs
+            ], dtype=np.float64),
+            # -1 marks a job without an education requirement (always scores 0)
+            "education_level": np.array([
+                EDUCATION_LEVELS.get(job["education_required"].lower(), 0) if job.get("education_required") else -1
+                for job in jobs
+            ], dtype=np.float64),
+            "embeddings": self._normalize(embeddings),
+        }
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms > 0, norms, 1.0)
+
+    @staticmethod
+    def _education_level(resume_edu: List[Dict]) -> float:
+        levels = [EDUCATION_LEVELS.get(edu["degree"].lower(), 0) for edu in resume_edu or [] if edu.get("degree")]
+        return max(levels) if levels else -1
+
+    def _skill_scores(self, job_features: Dict, candidates: List[Dict]) -> np.ndarray:
+        """(n_jobs, n_candidates) Jaccard similarity of each job's skills and the resume skills mapped onto them.
+
+        Same mapping as canonicalize: the block's resume skills are compared with
+        the union of the job skills in one matrix product, and every job picks
+        its own columns from it.
+        """
+        vocab, job_columns = job_features["vocab"], job_features["skill_columns"]
+        skill_lists = [skill_key(candidate.get("skills", [])) for candidate in candidates]
+        terms = sorted({term for skill_list in skill_lists for term in skill_list})
+        term_index = {term: index for index, term in enumerate(terms)}
+        # One (resume, term) pair per resume skill
+        pair_rows = np.array([row for row, skill_list in enumerate(skill_lists) for _ in skill_list], dtype=np.int64)
+        pair_terms = np.array([term_index[term] for skill_list in skill_lists for term in skill_list], dtype=np.int64)
+        similarities = self.skill_index.similarities(terms, vocab)
+
+        n_candidates = len(candidates)
+        intersection = np.zeros((len(job_columns), n_candidates))
+        canonical_counts = np.zeros((len(job_columns), n_candidates))
+        for row, columns in enumerate(job_columns):
+            mapped = self.skill_index.match_columns(
+                similarities[:, columns], terms, [vocab[column] for column in columns]
+            )[pair_terms]
+            hit = mapped >= 0
+            # Several resume skills can map onto the same job skill
+            hits = np.unique(pair_rows[hit] * max(len(columns), 1) + mapped[hit]) // max(len(columns), 1)
+            intersection[row] = np.bincount(hits, minlength=n_candidates)
+            canonical_counts[row] = intersection[row] + np.bincount(pair_rows[~hit], minlength=n_candidates)
+
+        job_counts = np.array([len(columns) for columns in job_columns], dtype=np.float64)[:, None]
+        union = job_counts + canonical_counts - intersection
+        return np.where(
+            (job_counts > 0) & (canonical_counts > 0),
+            intersection / np.where(union > 0, union, 1.0),
+            0.0
+        )
+
+    def _score_block(self, job_features: Dict, candidates: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Score one block of candidates against all jobs.
+
+        Returns the (n_jobs, n_candidates) total scores and the (4, n_jobs,
+        n_candidates) skill/experience/education/semantic components, using the
+        same rules as the per-pair calculate_* methods.
+        """
+        skill = self._skill_scores(job_features, candidates)
+
+        # Experience: linear up to the requirement
+        resume_exp = np.array([
+            np.nan if candidate.get("experience_years") is None else candidate["experience_years"]
+            for candidate in candidates
+        ], dtype=np.float64)[None, :]
+        required_exp = job_features["min_experience"][:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            experience = np.where(resume_exp >= required_exp, 1.0, resume_exp / required_exp)
+        experience = np.nan_to_num(experience, nan=0.0, posinf=0.0, neginf=0.0)
+
+        # Education: highest resume level against the required level
+        resume_level = np.array([self._education_level(c.get("education")) for c in candidates], dtype=np.float64)[None, :]
+        job_level = job_features["education_level"][:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            education = np.where(resume_level >= job_level, 1.0, resume_level / job_level)
+        education = np.where((resume_level < 0) | (job_level < 0), 0.0, education)
+
+        # Semantic: cosine similarity of normalized [CLS] embeddings
+        resume_embeddings = self._normalize(
+            self.get_bert_embeddings([candidate.get("raw_text") or "" for candidate in candidates])
+        )
+        semantic = job_features["embeddings"] @ resume_embeddings.T
+
+        components = np.stack([skill, experience, education, semantic]).astype(np.float64)
+        weights = np.array([
+            MATCH_WEIGHTS["skills"], MATCH_WEIGHTS["experience"],
+            MATCH_WEIGHTS["education"], MATCH_WEIGHTS["semantic"]
+        ])
+        totals = np.tensordot(weights, components, axes=1)
+        return totals, components
+
+    def score_matrix(self, jobs: List[Dict], candidates: List[Dict], block_size: int = None) -> np.ndarray:
+        """Full (n_jobs, n_candidates) match score matrix, computed block by block."""
+        block_size = block_size or settings.MATCH_BLOCK_SIZE
+        job_features = self._job_features(jobs)
+        blocks = [
+            self._score_block(job_features, candidates[start:start + block_size])[0]
+            for start in range(0, len(candidates), block_size)
+        ]
+        return np.hstack(blocks) if blocks else np.zeros((len(jobs), 0))
+
+    def iter_score_blocks(
+        self,
+        jobs: List[Dict],
+        candidates: Iterable[Dict],
+        block_size: int = None
+    ) -> Iterator[Tuple[List[Dict], np.ndarray, np.ndarray]]:
+        """Consume candidates in blocks and yield (block, totals, components) for each.
+
+        totals is (n_jobs, len(block)) and components (4, n_jobs, len(block)),
+        as returned by _score_block; the caller decides what to keep.
+        """
+        block_size = block_size or settings.MATCH_BLOCK_SIZE
+        job_features = self._job_features(jobs)
+        candidates = iter(candidates)
+        while True:
+            block = list(islice(candidates, block_size))
+            if not block:
+                return
+            totals, components = self._score_block(job_features, block)
+            yield block, totals, components
+
+    def batch_rank(
+        self,
+        jobs: List[Dict],
+        candidates: Iterable[Dict],
+        top_k: int = 50,
+        block_size: int = None
+    ) -> Dict[int, List[Dict]]:
+        """Rank a candidate pool against many jobs and keep the top-k per job.
+
+        Candidates are consumed in blocks of `block_size`, so only one
+        (n_jobs, block_size) slice of the score matrix and the current top-k are
+        held at a time, and every resume is embedded once for all jobs. The
+        optional lexical component is not part of the batch scores.
+        """
+        n_jobs = len(jobs)
+        best_scores = np.full((n_jobs, 0), -np.inf)
+        best_index = np.zeros((n_jobs, 0), dtype=np.int64)
+        best_components = np.zeros((4, n_jobs, 0))
+        identities: Dict[int, Tuple] = {}  # pool position -> identity, for entries in some top-k
+        offset = 0
+
+        for block, totals, components in self.iter_score_blocks(jobs, candidates, block_size):
+            # Merge the block into the running top-k of every job
+            scores = np.hstack([best_scores, totals])
+            index = np.hstack([best_index, np.broadcast_to(np.arange(offset, offset + len(block)), totals.shape)])
+            merged_components = np.concatenate([best_components, components], axis=2)
+            if scores.shape[1] > top_k:
+                keep = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                index = np.take_along_axis(index, keep, axis=1)
+                merged_components = np.take_along_axis(merged_components, keep[None, :, :], axis=2)
+            best_scores, best_index, best_components = scores, index, merged_components
+
+            # Identities of entries that fell out of every top-k are dropped with the block
+            identities = {
+                position: identities[position] if position < offset else (
+                    block[position - offset].get("id"),
+                    block[position - offset].get("resume_id"),
+                    block[position - offset].get("name")
+                )
+                for position in np.unique(best_index).tolist()
+            }
+            offset += len(block)
+
+        weights = dict(MATCH_WEIGHTS)
+        results = {}
+        for row, job in enumerate(jobs):
+            order = np.argsort(-best_scores[row], kind="stable")
+            ranked = []
+            for column in order:
+                candidate_id, resume_id, name = identities[best_index[row, column]]
+                skill, experience, education, semantic = best_components[:, row, column]
+                ranked.append({
+                    "candidate_id": candidate_id,
+                    "resume_id": resume_id,
+                    "name": name,
+                    "match_score": float(best_scores[row, column]),
+                    "breakdown": {
+                        "skill_match": float(skill),
+                        "experience_match": float(experience),
+                        "education_match": float(education),
+                        "semantic_match": float(semantic),
+                        "weights": weights
+                    }
+                })
+            results[job.get("id")] = ranked
+        return results
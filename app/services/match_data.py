@@ -0,0 +1,49 @@
+import json
+from typing import Dict, Optional
+from sqlalchemy import inspect
+from app.models.models import Job, Resume
+from app.services.experience_parser import total_experience_years
+
+def job_match_data(job: Job) -> Dict:
+    """Build the job payload consumed by JobMatcher."""
+    return {
+        "id": job.id,
+        "title": job.title,
+        "description": job.description,
+        "requirements": job.requirements,
+        "min_experience": job.min_experience,
+        "education_required": job.education_required,
+        "required_skills": [skill.name for skill in job.skills]
+    }
+
+def resume_match_data(resume: Resume, parsed_data: Optional[Dict] = None, include_text: bool = True) -> Dict:
+    """Build the candidate payload consumed by JobMatcher from a stored resume.
+    
+    `raw_text` is a deferred column: callers scoring many resumes should load
+    it with `undefer(Resume.raw_text)`, and callers that do not need the text
+    pass include_text=False to skip it ("raw_text" is then "").
+    
+    Resumes parsed before experience_years was stored are scored from their
+    text; with include_text=False only when the text is already loaded, since
+    a per-row load would defeat the deferral (they count 0 years otherwise).
+    """
+    if parsed_data is None:
+        parsed_data = json.loads(resume.parsed_data) if resume.parsed_data else {}
+    text_loaded = include_text or "raw_text" not in inspect(resume).unloaded
+    raw_text = (resume.raw_text or "") if text_loaded else ""
+    
+    experience_years = parsed_data.get("experience_years")
+    if experience_years is None:
+        experience_years = total_experience_years(raw_text)
+    if not include_text:
+        raw_text = ""
+    
+    return {
+        "id": resume.candidate_id,
+        "resume_id": resume.id,
+        "duplicate_of": resume.duplicate_of_id,
+        "raw_text": raw_text,
+        "skills": parsed_data.get("skills", []),
+        "education": parsed_data.get("education", []),
+        "experience_years": experience_years
+    }
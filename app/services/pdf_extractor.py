@@ -0,0 +1,252 @@
+import importlib
+import io
+import multiprocessing
+import threading
+import time
+from multiprocessing.connection import wait
+from typing import Any, BinaryIO, Callable, Dict, List, Tuple, Type, Union
+import PyPDF2
+from app.core.config import settings
+from app.core.metrics import metrics
+
+try:
+    import fitz
+except ImportError:  # pragma: no cover - optional faster backend
+    fitz = None
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+PDFSource = Union[str, bytes]
+
+class PDFExtractionError(ValueError):
+    """The PDF could not be read."""
+
+class PDFExtractionTimeout(PDFExtractionError):
+    """Extraction did not finish within PDF_TIMEOUT_SECONDS."""
+
+class PDFBackend:
+    """Text extraction library used inside the worker processes.
+
+    Backends receive either a file path or the raw bytes of the document.
+    Workers import the class by its `module:Class` path, so define backends at
+    module level; `register_backend` makes them selectable by name.
+    """
+    name = ""
+
+    def page_count(self, source: PDFSource) -> int:
+        raise NotImplementedError
+
+    def extract_pages(self, source: PDFSource, start: int, stop: int) -> List[str]:
+        """Text of pages [start, stop)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def open(source: PDFSource) -> Union[str, BinaryIO]:
+        return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+class PyPDF2Backend(PDFBackend):
+    name = "pypdf2"
+
+    def page_count(self, source: PDFSource) -> int:
+        return len(PyPDF2.PdfReader(self.open(source)).pages)
+
+    def extract_pages(self, source: PDFSource, start: int, stop: int) -> List[str]:
+        reader = PyPDF2.PdfReader(self.open(source))
+        return [reader.pages[number].extract_text() or "" for number in range(start, stop)]
+
+class PyMuPDFBackend(PDFBackend):
+    """MuPDF bindings; several times faster than PyPDF2 when installed."""
+    name = "pymupdf"
+
+    def _document(self, source: PDFSource):
+        if isinstance(source, (bytes, bytearray)):
+            return fitz.open(stream=source, filetype="pdf")
+        return fitz.open(source)
+
+    def page_count(self, source: PDFSource) -> int:
+        with self._document(source) as document:
+            return document.page_count
+
+    def extract_pages(self, source: PDFSource, start: int, stop: int) -> List[str]:
+        with self._document(source) as document:
+            return [document[number].get_text() for number in range(start, stop)]
+
+BACKENDS: Dict[str, PDFBackend] = {}
+
+def register_backend(backend_class: Type[PDFBackend]) -> None:
+    BACKENDS[backend_class.name] = backend_class()
+
+register_backend(PyPDF2Backend)
+if fitz is not None:
+    register_backend(PyMuPDFBackend)
+
+def get_backend(name: str = None) -> PDFBackend:
+    name = name or settings.PDF_BACKEND
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise PDFExtractionError(f"Unknown PDF backend: {name}")
+
+# Worker side
+
+def _limit_memory(memory_mb: int) -> None:
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _load_backend(path: str) -> PDFBackend:
+    """Instantiate a backend from its `module:Class` path.
+
+    Workers only preload this module, so backends registered by other modules
+    are not in their BACKENDS.
+    """
+    module_name, _, qualname = path.partition(":")
+    backend_class = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        backend_class = getattr(backend_class, attribute)
+    return backend_class()
+
+def _extract_first_pages(backend_path: str, source: PDFSource, stop: int) -> Tuple[int, List[str]]:
+    """Page count plus the text of the first `stop` pages."""
+    backend = _load_backend(backend_path)
+    total_pages = backend.page_count(source)
+    return total_pages, backend.extract_pages(source, 0, min(stop, total_pages))
+
+def _extract_pages(backend_path: str, source: PDFSource, start: int, stop: int) -> List[str]:
+    return _load_backend(backend_path).extract_pages(source, start, stop)
+
+def _run_task(connection, memory_mb: int, func: Callable, args: Tuple) -> None:
+    _limit_memory(memory_mb)
+    try:
+        connection.send(("ok", func(*args)))
+    except BaseException as exc:
+        connection.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        connection.close()
+
+# Parent side
+
+_context = None
+_context_lock = threading.Lock()
+
+def _get_context():
+    """forkserver where available: workers start from a clean, small process."""
+    global _context
+    with _context_lock:
+        if _context is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                _context = multiprocessing.get_context("forkserver")
+                _context.set_forkserver_preload([__name__])
+            else:
+                _context = multiprocessing.get_context("spawn")
+        return _context
+
+# Pages per second of every backend that has extracted something
+_throughput: Dict[str, List[float]] = {}
+_throughput_lock = threading.Lock()
+
+def _record_throughput(backend_name: str, pages: int, seconds: float) -> None:
+    with _throughput_lock:
+        if backend_name not in _throughput:
+            _throughput[backend_name] = [0, 0.0]
+            totals = _throughput[backend_name]
+            metrics.gauge(
+                "pdf_pages_per_second",
+                lambda: totals[0] / totals[1] if totals[1] else 0.0,
+                backend=backend_name
+            )
+        _throughput[backend_name][0] += pages
+        _throughput[backend_name][1] += seconds
+
+def _run_isolated(tasks: List[Tuple[Callable, Tuple]], deadline: float, memory_mb: int) -> List[Any]:
+    """Run each task in its own worker process, at most PDF_WORKERS at a time.
+
+    A worker that crashes or is killed (for example by the memory limit) fails
+    the whole extraction; workers still running at the deadline are killed.
+    """
+    context = _get_context()
+    pending = list(enumerate(tasks))
+    running = {}  # receiving end of the pipe -> (task index, process)
+    results: List[Any] = [None] * len(tasks)
+    try:
+        while pending or running:
+            while pending and len(running) < max(settings.PDF_WORKERS, 1):
+                index, (func, args) = pending.pop(0)
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_run_task, args=(sender, memory_mb, func, args), daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = (index, process)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise PDFExtractionTimeout("PDF extraction timed out")
+            for receiver in wait(list(running), timeout=remaining):
+                index, process = running.pop(receiver)
+                try:
+                    status, value = receiver.recv()
+                except EOFError:
+                    process.join()
+                    raise PDFExtractionError(f"PDF worker exited with code {process.exitcode}")
+                finally:
+                    receiver.close()
+                process.join()
+                if status != "ok":
+                    raise PDFExtractionError(value)
+                results[index] = value
+    finally:
+        for receiver, (_, process) in running.items():
+            process.kill()
+            process.join()
+            receiver.close()
+    return results
+
+def extract_pdf_text(
+    source: PDFSource,
+    backend: str = None,
+    timeout: float = None,
+    memory_mb: int = None
+) -> str:
+    """Extract the text of a PDF path or bytes in isolated worker processes.
+
+    One worker reads the page count and the first PDF_MIN_PAGES_PER_WORKER
+    pages, which covers a typical CV. Longer documents have the remaining pages
+    split evenly over up to PDF_WORKERS processes running in parallel. Every
+    worker is limited to `memory_mb` of address space; if the whole document is
+    not done within `timeout` seconds the workers are killed and
+    PDFExtractionTimeout is raised.
+    """
+    pdf_backend = get_backend(backend)
+    backend_path = f"{type(pdf_backend).__module__}:{type(pdf_backend).__qualname__}"
+    timeout = timeout or settings.PDF_TIMEOUT_SECONDS
+    memory_mb = memory_mb if memory_mb is not None else settings.PDF_WORKER_MEMORY_MB
+    deadline = time.monotonic() + timeout
+    started = time.perf_counter()
+
+    try:
+        first_chunk = settings.PDF_MIN_PAGES_PER_WORKER
+        (total_pages, pages), = _run_isolated(
+            [(_extract_first_pages, (backend_path, source, first_chunk))], deadline, memory_mb
+        )
+        remaining_pages = max(total_pages - first_chunk, 0)
+        chunk = max(first_chunk, -(-remaining_pages // max(settings.PDF_WORKERS, 1)))
+        chunks = _run_isolated([
+            (_extract_pages, (backend_path, source, start, min(start + chunk, total_pages)))
+            for start in range(first_chunk, total_pages, chunk)
+        ], deadline, memory_mb)
+    except PDFExtractionTimeout:
+        metrics.inc("pdf_extraction_timeouts", backend=pdf_backend.name)
+        raise PDFExtractionTimeout(f"PDF extraction timed out after {timeout:g}s")
+    except PDFExtractionError as exc:
+        metrics.inc("pdf_extraction_failures", backend=pdf_backend.name)
+        raise PDFExtractionError(f"Could not extract PDF text: {exc}") from exc
+
+    pages += [page for chunk_pages in chunks for page in chunk_pages]
+    seconds = time.perf_counter() - started
+    metrics.inc("pdf_pages_extracted", len(pages), backend=pdf_backend.name)
+    metrics.observe("pdf_extraction_seconds", seconds, backend=pdf_backend.name)
+    _record_throughput(pdf_backend.name, len(pages), seconds)
+    return "".join(pages)
@@ -1,32 +1,41 @@
 import spacy
-import PyPDF2
-import docx
 import json
 from typing import Dict, List, Optional
 from pathlib import Path
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.docx_extractor import extract_docx_text
+from app.services.experience_parser import total_experience_years
+from app.services.pdf_extractor import extract_pdf_text
+from app.services.section_segmenter import section_offsets, section_text, segment_resume
 
 class ResumeParser:
     def __init__(self):
         self.nlp = spacy.load(settings.SPACY_MODEL)
-        
+
+    def warmup(self) -> None:
+        """Run the pipeline once so the first upload does not pay for lazy initialisation."""
+        self.nlp("Jane Doe. Software Engineer at Acme Corp since 2019. BSc Computer Science, MIT.")
+
     def extract_text_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF file."""
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
+        return extract_pdf_text(file_path)
 
     def extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX file."""
-        doc = docx.Document(file_path)
-        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+        return extract_docx_text(file_path)
 
-    def extract_skills(self, text: str) -> List[str]:
-        """Extract skills from text using NLP."""
+    def _nlp(self, text: str):
+        """Run the full spaCy pipeline, counting the tokens it processes."""
         doc = self.nlp(text)
+        metrics.inc("resume_nlp_tokens", len(doc))
+        return doc
+
+    def extract_skills(self, text: str) -> List[str]:
+        """Extract skills from text."""
+        # Skill matching only needs tokens; the pipeline runs on sections only
+        doc = self.nlp.tokenizer(text)
+        metrics.inc("resume_text_tokens", len(doc))
         # Common technical skills and their variations
         skill_patterns = [
             "python", "java", "javascript", "c++", "c#", "ruby", "php",
@@ -42,38 +51,48 @@ class ResumeParser:
         
         return list(skills)
 
-    def extract_education(self, text: str) -> List[Dict]:
-        """Extract education information."""
-        doc = self.nlp(text)
+    def extract_education(self, text: str, filter_keywords: bool = True) -> List[Dict]:
+        """Extract education information.
+
+        Pass filter_keywords=False when `text` is already the Education section.
+        """
+        doc = self._nlp(text)
         education = []
         
         # Common education keywords
         edu_keywords = ["bachelor", "master", "phd", "degree", "university", "college"]
         
         for sent in doc.sents:
-            if any(keyword in sent.text.lower() for keyword in edu_keywords):
+            if not sent.text.strip():
+                continue
+            if not filter_keywords or any(keyword in sent.text.lower() for keyword in edu_keywords):
                 education.append({
                     "text": sent.text.strip(),
                     "degree": self._extract_degree(sent.text),
-                    "institution": self._extract_institution(sent.text)
+                    "institution": self._extract_institution(sent.ents)
                 })
         
         return education
 
-    def extract_experience(self, text: str) -> List[Dict]:
-        """Extract work experience information."""
-        doc = self.nlp(text)
+    def extract_experience(self, text: str, filter_keywords: bool = True) -> List[Dict]:
+        """Extract work experience information.
+
+        Pass filter_keywords=False when `text` is already the Experience section.
+        """
+        doc = self._nlp(text)
         experience = []
         
         # Common experience keywords
         exp_keywords = ["experience", "worked", "job", "position", "role"]
         
         for sent in doc.sents:
-            if any(keyword in sent.text.lower() for keyword in exp_keywords):
+            if not sent.text.strip():
+                continue
+            if not filter_keywords or any(keyword in sent.text.lower() for keyword in exp_keywords):
                 experience.append({
                     "text": sent.text.strip(),
-                    "years": self._extract_years(sent.text),
-                    "company": self._extract_company(sent.text)
+                    "years": total_experience_years(sent.text) or None,
+                    "company": self._extract_company(sent.ents)
                 })
         
         return experience
@@ -88,32 +107,18 @@ class ResumeParser:
                 return degree
         return None
 
-    def _extract_institution(self, text: str) -> Optional[str]:
-        """Extract institution name from text."""
+    def _extract_institution(self, ents) -> Optional[str]:
+        """Extract institution name from the entities of a sentence."""
         # This is a simple implementation. In production, you might want to use
         # a more sophisticated approach with a list of known institutions
-        doc = self.nlp(text)
-        for ent in doc.ents:
+        for ent in ents:
             if ent.label_ in ["ORG", "GPE"]:
                 return ent.text
         return None
 
-    def _extract_years(self, text: str) -> Optional[float]:
-        """Extract years of experience from text."""
-        doc = self.nlp(text)
-        for ent in doc.ents:
-            if ent.label_ == "DATE":
-                # Simple parsing of years
-                try:
-                    return float(ent.text.split()[0])
-                except (ValueError, IndexError):
-                    continue
-        return None
-
-    def _extract_company(self, text: str) -> Optional[str]:
-        """Extract company name from text."""
-        doc = self.nlp(text)
-        for ent in doc.ents:
+    def _extract_company(self, ents) -> Optional[str]:
+        """Extract company name from the entities of a sentence."""
+        for ent in ents:
             if ent.label_ == "ORG":
                 return ent.text
         return None
@@ -129,11 +134,19 @@ class ResumeParser:
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
 
+        # Find sections first so NER only runs where it is needed; fall back
+        # to the whole text when a CV has no recognizable heading
+        sections = segment_resume(text)
+        education_text = section_text(text, sections, "education")
+        experience_text = section_text(text, sections, "experience")
+
         # Extract information
         parsed_data = {
             "skills": self.extract_skills(text),
-            "education": self.extract_education(text),
-            "experience": self.extract_experience(text),
+            "education": self.extract_education(education_text or text, filter_keywords=not education_text),
+            "experience": self.extract_experience(experience_text or text, filter_keywords=not experience_text),
+            "experience_years": total_experience_years(text, sections),
+            "sections": section_offsets(sections),
             "raw_text": text
         }
 
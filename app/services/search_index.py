@@ -0,0 +1,430 @@
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.models import Resume
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Keeps tokens such as "c++", "c#" and "node.js" intact
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+QUERY_RE = re.compile(r'([+-]?)"([^"]*)"|([+-]?)(\S+)')
+
+# Positions are packed next to the document slot in one int64 key for phrase checks
+_POSITION_BITS = 24
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokenizer shared by indexing and querying."""
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+class SearchHit(NamedTuple):
+    doc_id: int
+    score: float
+
+class ParsedQuery(NamedTuple):
+    optional: List[str]           # scored, at least one must match when nothing is required
+    required: List[str]           # +term
+    excluded: List[str]           # -term
+    phrases: List[List[str]]      # "exact phrase", must match
+    excluded_phrases: List[List[str]]
+
+def parse_query(query: str) -> ParsedQuery:
+    """Parse `python +django -php "machine learning"` style queries."""
+    parsed = ParsedQuery([], [], [], [], [])
+    for match in QUERY_RE.finditer(query):
+        if match.group(2) is not None:
+            prefix, tokens, is_phrase = match.group(1), tokenize(match.group(2)), True
+        else:
+            prefix, tokens = match.group(3), tokenize(match.group(4))
+            is_phrase = len(tokens) > 1
+        if not tokens:
+            continue
+        if is_phrase:
+            (parsed.excluded_phrases if prefix == "-" else parsed.phrases).append(tokens)
+        elif prefix == "+":
+            parsed.required.append(tokens[0])
+        elif prefix == "-":
+            parsed.excluded.append(tokens[0])
+        else:
+            parsed.optional.append(tokens[0])
+    return parsed
+
+class _Postings:
+    """Append-only postings of one term: document slots, term frequencies and positions."""
+    __slots__ = ("docs", "tfs", "positions")
+
+    def __init__(self):
+        self.docs = array("i")
+        self.tfs = array("i")
+        self.positions = array("i")  # concatenated, `tfs[i]` entries per posting
+
+class BM25Index:
+    """Incrementally updatable in-memory inverted index with BM25 scoring.
+
+    Postings are kept in compact `array` buffers and scored with NumPy, removals
+    are tombstoned until the next save, and the index is persisted as CSR-style
+    sparse arrays in a single `.npz` file.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._terms: Dict[str, _Postings] = {}
+        self._doc_ids = array("q")          # slot -> external id
+        self._doc_lengths = array("i")      # slot -> token count
+        self._alive = bytearray()           # slot -> 1 if not removed
+        self._slots: Dict[int, int] = {}    # external id -> slot
+        self._total_length = 0
+        self.max_doc_id = 0                 # highest id ever indexed
+        self.mutations = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._slots
+
+    def add_document(self, doc_id: int, text: str) -> None:
+        """Index `text` under `doc_id`, replacing any previous version."""
+        tokens = tokenize(text)
+        term_positions: Dict[str, List[int]] = {}
+        for position, token in enumerate(tokens[:1 << _POSITION_BITS]):
+            term_positions.setdefault(token, []).append(position)
+
+        with self._lock:
+            self._remove(doc_id)
+            slot = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._doc_lengths.append(len(tokens))
+            self._alive.append(1)
+            self._slots[doc_id] = slot
+            self._total_length += len(tokens)
+            self.max_doc_id = max(self.max_doc_id, doc_id)
+
+            for term, positions in term_positions.items():
+                postings = self._terms.get(term)
+                if postings is None:
+                    postings = self._terms[term] = _Postings()
+                postings.docs.append(slot)
+                postings.tfs.append(len(positions))
+                postings.positions.extend(positions)
+            self.mutations += 1
+
+    def remove_document(self, doc_id: int) -> None:
+        """Remove a document; its postings are dropped on the next save."""
+        with self._lock:
+            if self._remove(doc_id):
+                self.mutations += 1
+
+    def _remove(self, doc_id: int) -> bool:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._alive[slot] = 0
+        self._total_length -= self._doc_lengths[slot]
+        return True
+
+    def _term_arrays(self, term: str, alive: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        postings = self._terms.get(term)
+        if postings is None or not postings.docs:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        docs = np.frombuffer(postings.docs, dtype=np.int32)
+        tfs = np.frombuffer(postings.tfs, dtype=np.int32)
+        mask = alive[docs]
+        return docs[mask], tfs[mask]
+
+    def _idf(self, df: int, n_docs: int) -> float:
+        return math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def _phrase_docs(self, tokens: List[str], alive: np.ndarray) -> np.ndarray:
+        """Slots of live documents containing `tokens` consecutively."""
+        keys = None
+        for offset, term in enumerate(tokens):
+            postings = self._terms.get(term)
+            if postings is None or not postings.docs:
+                return np.empty(0, dtype=np.int64)
+            docs = np.frombuffer(postings.docs, dtype=np.int32)
+            tfs = np.frombuffer(postings.tfs, dtype=np.int32)
+            positions = np.frombuffer(postings.positions, dtype=np.int32).astype(np.int64) - offset
+            slots = np.repeat(docs, tfs).astype(np.int64)
+            valid = (positions >= 0) & alive[slots]
+            term_keys = (slots[valid] << _POSITION_BITS) | positions[valid]
+            keys = term_keys if keys is None else np.intersect1d(keys, term_keys, assume_unique=True)
+            if not len(keys):
+                break
+        return np.unique(keys >> _POSITION_BITS)
+
+    def _bm25(self, terms: Iterable[str], alive: np.ndarray, n_docs: int) -> Tuple[np.ndarray, float]:
+        """BM25 scores of every slot for `terms`, and the highest score any document could reach."""
+        scores = np.zeros(len(self._doc_ids), dtype=np.float64)
+        lengths = np.frombuffer(self._doc_lengths, dtype=np.int32)
+        avg_length = (self._total_length / n_docs) if n_docs else 0.0
+        upper_bound = 0.0
+        for term in set(terms):
+            docs, tfs = self._term_arrays(term, alive)
+            if not len(docs):
+                continue
+            idf = self._idf(len(docs), n_docs)
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / max(avg_length, 1e-9))
+            scores[docs] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+            upper_bound += idf * (self.k1 + 1.0)
+        return scores, upper_bound
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Return the best `limit` documents for a boolean/phrase BM25 query."""
+        parsed = parse_query(query)
+        with self._lock:
+            n_docs = len(self._slots)
+            if not n_docs:
+                return []
+            alive = np.frombuffer(bytes(self._alive), dtype=np.bool_)
+            scored_terms = parsed.optional + parsed.required + [t for phrase in parsed.phrases for t in phrase]
+            scores, _ = self._bm25(scored_terms, alive, n_docs)
+
+            # Boolean and phrase prefilters
+            if parsed.required or parsed.phrases:
+                candidates = alive.copy()
+                for term in parsed.required:
+                    term_mask = np.zeros_like(candidates)
+                    term_mask[self._term_arrays(term, alive)[0]] = True
+                    candidates &= term_mask
+                for phrase in parsed.phrases:
+                    phrase_mask = np.zeros_like(candidates)
+                    phrase_mask[self._phrase_docs(phrase, alive)] = True
+                    candidates &= phrase_mask
+            else:
+                candidates = scores > 0
+            for term in parsed.excluded:
+                candidates[self._term_arrays(term, alive)[0]] = False
+            for phrase in parsed.excluded_phrases:
+                candidates[self._phrase_docs(phrase, alive)] = False
+
+            slots = np.flatnonzero(candidates)
+            if len(slots) > limit:
+                slots = slots[np.argpartition(-scores[slots], limit)[:limit]]
+            slots = slots[np.argsort(-scores[slots], kind="stable")]
+            return [SearchHit(int(self._doc_ids[slot]), float(scores[slot])) for slot in slots]
+
+    def score_documents(self, query: str, doc_ids: Iterable[int]) -> Dict[int, float]:
+        """BM25 scores of `doc_ids` for a free-text query, normalized to [0, 1).
+
+        Scores are divided by the best score any document could reach for the
+        query, so they are comparable across jobs and usable as a match feature.
+        """
+        terms = tokenize(query)
+        with self._lock:
+            n_docs = len(self._slots)
+            if not n_docs or not terms:
+                return {doc_id: 0.0 for doc_id in doc_ids}
+            alive = np.frombuffer(bytes(self._alive), dtype=np.bool_)
+            scores, upper_bound = self._bm25(terms, alive, n_docs)
+            return {
+                doc_id: (float(scores[self._slots[doc_id]]) / upper_bound) if doc_id in self._slots and upper_bound else 0.0
+                for doc_id in doc_ids
+            }
+
+    def save(self, path: str) -> None:
+        """Persist live documents as CSR sparse arrays, replacing `path` atomically.
+
+        The arrays are copied under the lock; the file is written outside it,
+        so searches and updates are not held up by the disk.
+        """
+        with self._lock:
+            saved_mutations = self.mutations
+            alive = np.frombuffer(bytes(self._alive), dtype=np.bool_)
+            # Renumber live slots densely so tombstones are dropped
+            new_slot = np.cumsum(alive, dtype=np.int64) - 1
+
+            terms, term_ptr, post_docs, post_tfs, positions = [], [0], [], [], []
+            for term, postings in self._terms.items():
+                docs = np.frombuffer(postings.docs, dtype=np.int32)
+                tfs = np.frombuffer(postings.tfs, dtype=np.int32)
+                keep = alive[docs]
+                if not keep.any():
+                    continue
+                term_positions = np.frombuffer(postings.positions, dtype=np.int32)
+                terms.append(term)
+                post_docs.append(new_slot[docs[keep]].astype(np.int32))
+                post_tfs.append(tfs[keep])
+                positions.append(term_positions[np.repeat(keep, tfs)])
+                term_ptr.append(term_ptr[-1] + int(keep.sum()))
+
+            arrays = {
+                "doc_ids": np.frombuffer(self._doc_ids, dtype=np.int64)[alive],
+                "doc_lengths": np.frombuffer(self._doc_lengths, dtype=np.int32)[alive],
+                "terms": np.array(terms, dtype=np.str_),
+                "term_ptr": np.array(term_ptr, dtype=np.int64),
+                "post_docs": np.concatenate(post_docs) if post_docs else np.empty(0, dtype=np.int32),
+                "post_tfs": np.concatenate(post_tfs) if post_tfs else np.empty(0, dtype=np.int32),
+                "positions": np.concatenate(positions) if positions else np.empty(0, dtype=np.int32),
+                "params": np.array([self.k1, self.b]),
+            }
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                np.savez(tmp_file, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self.mutations -= saved_mutations
+
+    def load(self, path: str) -> None:
+        """Replace the index contents with a file written by `save`."""
+        with np.load(path) as data:
+            doc_ids = data["doc_ids"]
+            doc_lengths = data["doc_lengths"]
+            terms = data["terms"]
+            term_ptr = data["term_ptr"]
+            post_docs = data["post_docs"].astype(np.int32)
+            post_tfs = data["post_tfs"].astype(np.int32)
+            positions = data["positions"].astype(np.int32)
+            self.k1, self.b = (float(value) for value in data["params"])
+
+        position_ptr = np.concatenate([[0], np.cumsum(post_tfs, dtype=np.int64)])
+        with self._lock:
+            self._clear()
+            self._doc_ids = array("q", doc_ids.astype(np.int64).tobytes())
+            self._doc_lengths = array("i", doc_lengths.astype(np.int32).tobytes())
+            self._alive = bytearray(b"\x01" * len(doc_ids))
+            self._slots = {int(doc_id): slot for slot, doc_id in enumerate(doc_ids)}
+            self._total_length = int(doc_lengths.sum())
+            self.max_doc_id = int(doc_ids.max()) if len(doc_ids) else 0
+            for index, term in enumerate(terms):
+                start, end = int(term_ptr[index]), int(term_ptr[index + 1])
+                postings = _Postings()
+                postings.docs.frombytes(post_docs[start:end].tobytes())
+                postings.tfs.frombytes(post_tfs[start:end].tobytes())
+                postings.positions.frombytes(positions[position_ptr[start]:position_ptr[end]].tobytes())
+                self._terms[str(term)] = postings
+
+class ResumeSearchIndex(BM25Index):
+    """BM25 index over resume raw text, kept in sync with the resumes table.
+
+    Every worker holds its own copy. New resumes uploaded through any worker are
+    picked up by `sync`, which reads rows above the highest indexed id and, every
+    INDEX_RECONCILE_SECONDS, compares all stored ids with the index: concurrent
+    uploads can commit out of id order, and deletes made by other workers are
+    only seen then. Callers drop hits whose resume no longer exists.
+
+    Requests never write the file: one worker, the holder of an exclusive lock
+    on `<path>.lock`, saves pending changes from a background thread (see
+    `start_writer`), and the others only load it.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._loaded = False
+        self._reconciled_at = None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock_file = None
+
+    def add_resume(self, resume_id: int, raw_text: str) -> None:
+        self.add_document(resume_id, raw_text)
+
+    def remove_resume(self, resume_id: int) -> None:
+        self.remove_document(resume_id)
+
+    def acquire_writer_lock(self) -> bool:
+        """Try to become the process that persists the index; held until the process exits."""
+        if self._writer_lock_file is not None:
+            return True
+        if fcntl is None:  # pragma: no cover - no flock on Windows, where development runs one worker
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._writer_lock_file = lock_file
+        return True
+
+    def start_writer(self) -> bool:
+        """Save pending changes every SEARCH_INDEX_SAVE_SECONDS if this worker holds the writer lock.
+
+        Returns whether this worker is the writer.
+        """
+        if self._writer is not None:
+            return True
+        if not self.acquire_writer_lock():
+            return False
+        self._writer = threading.Thread(target=self._write_loop, name="search-index-writer", daemon=True)
+        self._writer.start()
+        return True
+
+    def _write_loop(self) -> None:
+        while True:
+            time.sleep(settings.SEARCH_INDEX_SAVE_SECONDS)
+            try:
+                self.save_pending()
+            except Exception:
+                logger.exception("Could not save the search index to %s", self.path)
+
+    def save_pending(self) -> bool:
+        """Save the index if it changed since the last save; returns whether it wrote the file."""
+        # Before the first sync the index holds only this worker's uploads, not the saved file
+        if not self._loaded or not self.mutations:
+            return False
+        self.save(self.path)
+        return True
+
+    def sync(self, db: Session) -> None:
+        """Load the persisted index on first use and index resumes added since."""
+        with self._lock:
+            if not self._loaded:
+                if os.path.exists(self.path):
+                    self.load(self.path)
+                self._loaded = True
+
+            now = time.monotonic()
+            if self._reconciled_at is None or now - self._reconciled_at >= settings.INDEX_RECONCILE_SECONDS:
+                self._reconcile(db)
+                self._reconciled_at = now
+            else:
+                new_resumes = (
+                    db.query(Resume.id, Resume.raw_text)
+                    .filter(Resume.id > self.max_doc_id)
+                    .order_by(Resume.id)
+                    .all()
+                )
+                for resume_id, raw_text in new_resumes:
+                    self.add_document(resume_id, raw_text or "")
+
+    def _reconcile(self, db: Session, batch_size: int = 500) -> None:
+        """Index every stored resume missing from the index and drop deleted ones."""
+        stored = {resume_id for (resume_id,) in db.query(Resume.id)}
+        for resume_id in set(self._slots) - stored:
+            self.remove_document(resume_id)
+        missing = sorted(stored - set(self._slots))
+        for start in range(0, len(missing), batch_size):
+            rows = db.query(Resume.id, Resume.raw_text).filter(Resume.id.in_(missing[start:start + batch_size]))
+            for resume_id, raw_text in rows:
+                self.add_document(resume_id, raw_text or "")
+
+# Shared per-process resume index
+resume_index = ResumeSearchIndex(settings.SEARCH_INDEX_PATH)
@@ -0,0 +1,408 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session, selectinload, undefer
+from app.core.config import settings
+from app.models.models import Application, Job, Resume, SearchOutbox
+from app.services.match_data import job_match_data, resume_match_data
+
+logger = logging.getLogger(__name__)
+
+# Entity type -> model for everything mirrored into Elasticsearch
+ENTITY_MODELS = {
+    "resume": Resume,
+    "job": Job,
+    "application": Application,
+}
+ENTITY_TYPES = {model: entity_type for entity_type, model in ENTITY_MODELS.items()}
+
+def index_name(entity_type: str) -> str:
+    """Alias that search clients and the sync worker write to."""
+    return f"{settings.ELASTICSEARCH_INDEX_PREFIX}-{entity_type}s"
+
+# Documents
+
+def _resume_document(resume: Resume) -> Dict:
+    data = resume_match_data(resume)
+    return {
+        "candidate_id": resume.candidate_id,
+        "skills": data["skills"],
+        "education": data["education"],
+        "experience_years": data["experience_years"],
+        "raw_text": data["raw_text"],
+        "created_at": resume.created_at,
+        "updated_at": resume.updated_at
+    }
+
+def _job_document(job: Job) -> Dict:
+    document = job_match_data(job)
+    document.pop("id")
+    document.update({
+        "is_active": job.is_active,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    })
+    return document
+
+def _application_document(application: Application) -> Dict:
+    return {
+        "job_id": application.job_id,
+        "resume_id": application.resume_id,
+        "candidate_id": application.candidate_id,
+        "status": application.status,
+        "match_score": application.match_score,
+        "created_at": application.created_at,
+        "updated_at": application.updated_at
+    }
+
+DOCUMENT_BUILDERS: Dict[str, Callable] = {
+    "resume": _resume_document,
+    "job": _job_document,
+    "application": _application_document,
+}
+
+def _load_entities(db: Session, entity_type: str, entity_ids: Iterable[int]) -> Dict[int, object]:
+    model = ENTITY_MODELS[entity_type]
+    query = db.query(model).filter(model.id.in_(list(entity_ids)))
+    if model is Job:
+        query = query.options(selectinload(Job.skills))
+    elif model is Resume:
+        query = query.options(undefer(Resume.raw_text))
+    return {entity.id: entity for entity in query}
+
+def _action(entity_type: str, entity_id: int, entity: Optional[object], index: Optional[str] = None) -> Dict:
+    """Bulk action reflecting the current state of an entity (deleted if missing)."""
+    action = {"_index": index or index_name(entity_type), "_id": str(entity_id)}
+    if entity is None:
+        action["_op_type"] = "delete"
+    else:
+        action["_op_type"] = "index"
+        action["_source"] = DOCUMENT_BUILDERS[entity_type](entity)
+    return action
+
+# Backends
+
+class SearchBackend:
+    """Minimal surface of a search cluster used by the sync worker."""
+
+    def bulk(self, actions: List[Dict]) -> List[Tuple[str, str, str]]:
+        """Apply bulk actions and return (index, id, error) for the ones that failed."""
+        raise NotImplementedError
+
+    def create_index(self, name: str) -> None:
+        raise NotImplementedError
+
+    def point_alias(self, alias: str, index: str) -> None:
+        """Atomically move `alias` to `index` and drop the indexes it pointed to."""
+        raise NotImplementedError
+
+class ElasticsearchBackend(SearchBackend):
+    """Backend talking to the cluster configured by ELASTICSEARCH_HOST/PORT."""
+
+    def __init__(self, client=None):
+        from elasticsearch import Elasticsearch
+
+        self.client = client or Elasticsearch(
+            f"http://{settings.ELASTICSEARCH_HOST}:{settings.ELASTICSEARCH_PORT}",
+            retry_on_timeout=True
+        )
+
+    def bulk(self, actions: List[Dict]) -> List[Tuple[str, str, str]]:
+        from elasticsearch import helpers
+
+        # Deleting a document that is already gone is not a failure
+        _, errors = helpers.bulk(self.client, actions, raise_on_error=False, ignore_status=(404,))
+        failures = []
+        for error in errors:
+            (_, item), = error.items()
+            failures.append((item.get("_index"), item.get("_id"), str(item.get("error"))))
+        return failures
+
+    def create_index(self, name: str) -> None:
+        self.client.indices.create(index=name)
+
+    def point_alias(self, alias: str, index: str) -> None:
+        previous = []
+        if self.client.indices.exists_alias(name=alias):
+            previous = list(self.client.indices.get_alias(name=alias).keys())
+        elif self.client.indices.exists(index=alias):
+            # A concrete index created by auto-indexing before the first reindex
+            self.client.indices.delete(index=alias)
+        actions = [{"remove": {"index": old, "alias": alias}} for old in previous]
+        actions.append({"add": {"index": index, "alias": alias}})
+        self.client.indices.update_aliases(actions=actions)
+        for old in previous:
+            if old != index:
+                self.client.indices.delete(index=old)
+
+class InMemoryBackend(SearchBackend):
+    """Dictionary-backed stand-in for Elasticsearch, for tests and local runs."""
+
+    def __init__(self):
+        self.indexes: Dict[str, Dict[str, Dict]] = {}
+        self.aliases: Dict[str, str] = {}
+        self.fail_ids = set()  # ids whose actions report a failure
+        self.bulk_calls = 0
+
+    def _resolve(self, name: str) -> str:
+        return self.aliases.get(name, name)
+
+    def bulk(self, actions: List[Dict]) -> List[Tuple[str, str, str]]:
+        self.bulk_calls += 1
+        failures = []
+        for action in actions:
+            if action["_id"] in self.fail_ids:
+                failures.append((action["_index"], action["_id"], "simulated failure"))
+                continue
+            documents = self.indexes.setdefault(self._resolve(action["_index"]), {})
+            if action["_op_type"] == "delete":
+                documents.pop(action["_id"], None)
+            else:
+                documents[action["_id"]] = action["_source"]
+        return failures
+
+    def create_index(self, name: str) -> None:
+        self.indexes[name] = {}
+
+    def point_alias(self, alias: str, index: str) -> None:
+        previous = self.aliases.get(alias)
+        self.aliases[alias] = index
+        if previous and previous != index:
+            self.indexes.pop(previous, None)
+        if alias in self.indexes:
+            del self.indexes[alias]
+
+    def documents(self, entity_type: str) -> Dict[str, Dict]:
+        return self.indexes.get(self._resolve(index_name(entity_type)), {})
+
+# Outbox recording
+
+def _record_changes(session: Session, flush_context) -> None:
+    """Write outbox rows for mirrored entities touched by this flush.
+
+    Runs inside the flush, on the session's connection, so the change rows
+    commit or roll back together with the entities themselves.
+    """
+    rows = []
+    for obj in session.new:
+        entity_type = ENTITY_TYPES.get(type(obj))
+        if entity_type:
+            rows.append({"entity_type": entity_type, "entity_id": obj.id, "operation": "upsert"})
+    for obj in session.dirty:
+        entity_type = ENTITY_TYPES.get(type(obj))
+        if entity_type and session.is_modified(obj):
+            rows.append({"entity_type": entity_type, "entity_id": obj.id, "operation": "upsert"})
+    for obj in session.deleted:
+        entity_type = ENTITY_TYPES.get(type(obj))
+        if entity_type:
+            rows.append({"entity_type": entity_type, "entity_id": obj.id, "operation": "delete"})
+    if rows:
+        session.connection().execute(insert(SearchOutbox.__table__), rows)
+
+def record_bulk_changes(db: Session, entity_type: str, entity_ids: Iterable[int], operation: str = "upsert") -> None:
+    """Write outbox rows for entities changed with Core statements, which bypass the flush hook."""
+    rows = [{"entity_type": entity_type, "entity_id": entity_id, "operation": operation} for entity_id in entity_ids]
+    if rows:
+        db.execute(insert(SearchOutbox.__table__), rows)
+
+def register_outbox_listener(session_factory) -> None:
+    """Record search changes for every session created by `session_factory`."""
+    if not event.contains(session_factory, "after_flush", _record_changes):
+        event.listen(session_factory, "after_flush", _record_changes)
+
+# Worker
+
+class OutboxWorker:
+    """Pushes pending outbox rows to a search backend in bulk batches."""
+
+    def __init__(
+        self,
+        backend: SearchBackend,
+        session_factory: Callable[[], Session],
+        batch_size: int = settings.SEARCH_SYNC_BATCH_SIZE,
+        max_attempts: int = settings.SEARCH_SYNC_MAX_ATTEMPTS
+    ):
+        self.backend = backend
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = settings.SEARCH_SYNC_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=min(delay, settings.SEARCH_SYNC_MAX_BACKOFF_SECONDS))
+
+    def _push(self, db: Session, keys: Iterable[Tuple[str, int]], index: Optional[str] = None) -> Dict[Tuple[str, int], str]:
+        """Send the current state of `keys`, one bulk request per entity type, and return errors by key."""
+        by_type: Dict[str, set] = {}
+        for entity_type, entity_id in keys:
+            by_type.setdefault(entity_type, set()).add(entity_id)
+
+        errors = {}
+        for entity_type, entity_ids in by_type.items():
+            entities = _load_entities(db, entity_type, entity_ids)
+            actions = [
+                _action(entity_type, entity_id, entities.get(entity_id), index)
+                for entity_id in sorted(entity_ids)
+            ]
+            for _, failed_id, error in self.backend.bulk(actions):
+                errors[(entity_type, int(failed_id))] = error
+        return errors
+
+    def _fail(self, row: SearchOutbox, error: str, now: datetime) -> None:
+        """Leave `row` pending for a retry after the backoff, or give up on it."""
+        row.processed_at = None
+        row.attempts += 1
+        row.last_error = error
+        row.available_at = now + self._backoff(row.attempts)
+        if row.attempts >= self.max_attempts:
+            logger.error(
+                "Giving up on %s %s after %d attempts: %s",
+                row.entity_type, row.entity_id, row.attempts, error
+            )
+
+    def run_once(self) -> int:
+        """Process one batch of due outbox rows. Returns the number of rows handled."""
+        db = self.session_factory()
+        try:
+            now = datetime.now(timezone.utc)
+            rows = (
+                db.query(SearchOutbox)
+                .filter(
+                    SearchOutbox.processed_at.is_(None),
+                    SearchOutbox.available_at <= now,
+                    SearchOutbox.attempts < self.max_attempts
+                )
+                .order_by(SearchOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                db.rollback()
+                return 0
+
+            keys = {(row.entity_type, row.entity_id) for row in rows}
+            try:
+                errors = self._push(db, keys)
+            except Exception as e:
+                logger.warning("Search bulk sync failed for %d rows: %s", len(rows), e)
+                errors = {key: str(e) for key in keys}
+
+            for row in rows:
+                error = errors.get((row.entity_type, row.entity_id))
+                if error is None:
+                    row.processed_at = now
+                else:
+                    self._fail(row, error, now)
+
+            db.commit()
+            return len(rows)
+        finally:
+            db.close()
+
+    def prune(self) -> int:
+        """Delete processed rows older than the retention window."""
+        db = self.session_factory()
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.SEARCH_OUTBOX_RETENTION_HOURS)
+            deleted = (
+                db.query(SearchOutbox)
+                .filter(SearchOutbox.processed_at.isnot(None), SearchOutbox.processed_at < cutoff)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def run_forever(self, poll_interval: float = settings.SEARCH_SYNC_POLL_SECONDS) -> None:
+        """Drain the outbox until `stop()` is called, sleeping while it is empty."""
+        last_prune = 0.0
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+                if time.monotonic() - last_prune > 3600:
+                    self.prune()
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Search sync worker iteration failed")
+                processed = 0
+            if processed < self.batch_size:
+                self._stop.wait(poll_interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # Full reindex
+
+    def _scroll_ids(self, db: Session, entity_type: str) -> Iterator[List[int]]:
+        """Stream entity ids in batches with a server-side cursor."""
+        model = ENTITY_MODELS[entity_type]
+        result = db.execute(
+            select(model.id).order_by(model.id).execution_options(yield_per=self.batch_size)
+        )
+        for partition in result.partitions(self.batch_size):
+            yield [row[0] for row in partition]
+
+    def reindex(self, entity_type: str) -> int:
+        """Rebuild one entity index from the database and swap the alias to it.
+
+        Changes committed while the reindex runs are replayed from the outbox
+        (processed rows are retained) once the alias points at the new index.
+        Documents the replay fails to write are handed back to the sync worker:
+        the newest outbox row of each is left pending with the error.
+        """
+        db = self.session_factory()
+        try:
+            start_outbox_id = db.query(func.coalesce(func.max(SearchOutbox.id), 0)).scalar()
+            alias = index_name(entity_type)
+            new_index = f"{alias}-{datetime.now(timezone.utc):%Y%m%d%H%M%S%f}"
+            self.backend.create_index(new_index)
+
+            count = 0
+            for entity_ids in self._scroll_ids(db, entity_type):
+                errors = self._push(db, ((entity_type, entity_id) for entity_id in entity_ids), index=new_index)
+                if errors:
+                    raise RuntimeError(f"Reindex of {entity_type} failed for {len(errors)} documents")
+                count += len(entity_ids)
+                db.expunge_all()
+
+            self.backend.point_alias(alias, new_index)
+
+            changed = {
+                (entity_type, entity_id)
+                for (entity_id,) in db.query(SearchOutbox.entity_id).filter(
+                    SearchOutbox.id > start_outbox_id,
+                    SearchOutbox.entity_type == entity_type
+                ).distinct()
+            }
+            if changed:
+                errors = self._push(db, changed)
+                if errors:
+                    self._requeue(db, start_outbox_id, errors)
+            return count
+        finally:
+            db.close()
+
+    def _requeue(self, db: Session, start_outbox_id: int, errors: Dict[Tuple[str, int], str]) -> None:
+        logger.warning(
+            "Replay after reindex failed for %d documents; left pending for the sync worker", len(errors)
+        )
+        now = datetime.now(timezone.utc)
+        for (entity_type, entity_id), error in errors.items():
+            row = (
+                db.query(SearchOutbox)
+                .filter(
+                    SearchOutbox.id > start_outbox_id,
+                    SearchOutbox.entity_type == entity_type,
+                    SearchOutbox.entity_id == entity_id
+                )
+                .order_by(SearchOutbox.id.desc())
+                .first()
+            )
+            self._fail(row, error, now)
+        db.commit()
@@ -0,0 +1,117 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Heading phrases per section, compared against a normalized heading line
+SECTION_HEADINGS = {
+    "education": (
+        "education", "education and training", "academic background", "academic qualifications",
+        "academic history", "academics", "educational background", "qualifications", "degrees"
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history", "professional background",
+        "career", "positions held"
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+        "skills and competencies", "technologies", "tech stack", "tools and technologies", "expertise"
+    ),
+    "contact": (
+        "contact", "contact information", "contact info", "contact details", "personal details",
+        "personal information"
+    ),
+    "other": (
+        "summary", "professional summary", "profile", "professional profile", "objective",
+        "career objective", "about me", "projects", "personal projects", "certifications",
+        "certificates", "licenses and certifications", "courses", "training", "awards", "honors",
+        "achievements", "publications", "languages", "interests", "hobbies", "volunteering",
+        "volunteer experience", "references", "activities", "memberships"
+    ),
+}
+
+_HEADING_TO_SECTION = {
+    phrase: name for name, phrases in SECTION_HEADINGS.items() for phrase in phrases
+}
+# Headings are short: anything longer is prose that happens to start with a keyword
+_MAX_HEADING_WORDS = 5
+
+_LINE = re.compile(r"[^\n]*\n?")
+# Optional bullet/numbering, the heading words, then an optional separator and inline content
+_HEADING_LINE = re.compile(
+    r"^[ \t]*(?:[•\-*#>]+|\d+[.)]|[ivx]+[.)])?[ \t]*"
+    r"(?P<heading>[A-Za-z][A-Za-z &/]*?)[ \t]*"
+    r"(?:(?P<separator>[:|–—-])[ \t]*(?P<rest>.*?))?[ \t]*\r?\n?$"
+)
+_CONTACT_HINT = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+|\+?\d[\d ()./-]{7,}\d|linkedin\.com|github\.com",
+    re.IGNORECASE
+)
+
+class Section(NamedTuple):
+    name: str  # education, experience, skills, contact or other
+    heading: Optional[str]  # heading as written; None for text before the first heading
+    start: int  # offset of the section body, just after the heading
+    end: int
+
+def _normalize_heading(heading: str) -> str:
+    return " ".join(heading.lower().replace("&", " and ").replace("/", " and ").split())
+
+def _match_heading(line: str) -> Optional[Tuple[str, str, int]]:
+    """(section name, heading, length of the heading part) if `line` is a heading."""
+    match = _HEADING_LINE.match(line)
+    if not match:
+        return None
+    heading = match.group("heading")
+    if len(heading.split()) > _MAX_HEADING_WORDS:
+        return None
+    name = _HEADING_TO_SECTION.get(_normalize_heading(heading))
+    if name is None:
+        return None
+    # "Experience - 5 years at ..." is a heading with inline content only when
+    # the separator is a colon or the heading is set apart typographically
+    if match.group("rest") and match.group("separator") != ":" and not heading.isupper():
+        return None
+    body_offset = match.start("rest") if match.group("rest") else len(line)
+    return name, heading, body_offset
+
+def segment_resume(text: str) -> List[Section]:
+    """Split resume text into sections using heading heuristics.
+
+    A heading is a short line (optionally bulleted or numbered, optionally
+    followed by a colon and inline content) whose words match one of
+    SECTION_HEADINGS. Text before the first heading becomes a contact section
+    when it holds an e-mail, phone number or profile link, and `other` when it
+    does not. Sections cover the text without gaps.
+    """
+    headings = []  # (line start, body start, name, heading)
+    offset = 0
+    for line_match in _LINE.finditer(text):
+        line = line_match.group()
+        if not line:
+            break
+        if line.strip():
+            found = _match_heading(line)
+            if found:
+                name, heading, body_offset = found
+                headings.append((offset, offset + body_offset, name, heading))
+        offset += len(line)
+
+    sections = []
+    first_start = headings[0][0] if headings else len(text)
+    preamble = text[:first_start]
+    if preamble.strip():
+        name = "contact" if _CONTACT_HINT.search(preamble) else "other"
+        sections.append(Section(name, None, 0, first_start))
+
+    for index, (_, body_start, name, heading) in enumerate(headings):
+        end = headings[index + 1][0] if index + 1 < len(headings) else len(text)
+        sections.append(Section(name, heading, body_start, end))
+    return sections
+
+def section_text(text: str, sections: Iterable[Section], *names: str) -> str:
+    """Concatenated bodies of every section called one of `names` ("" if none)."""
+    return "\n".join(text[section.start:section.end].strip("\n") for section in sections if section.name in names)
+
+def section_offsets(sections: Iterable[Section]) -> List[Dict]:
+    """JSON-friendly form of the sections for parsed_data."""
+    return [section._asdict() for section in sections]
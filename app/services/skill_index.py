@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, Iterable, List, Sequence, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.models import Skill
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+
+def skill_key(skills: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sorted({skill.lower() for skill in skills if skill}))
+
+class SkillIndex:
+    """Unit vectors of skill names, for fuzzy matching of resume skills to a job's skills.
+
+    Each resume skill is mapped onto the most similar of the job's required
+    skills when their cosine similarity reaches SKILL_MATCH_THRESHOLD
+    ("postgres" becomes "postgresql"), and kept as written otherwise. Only the
+    job's skills are compared, with one matrix product, so a skill known from
+    another job can neither take the match nor hide one above the threshold.
+
+    Vectors of job skills and of the Skill table are computed once and kept as
+    rows of a normalized matrix; resume skills are embedded when a mapping is
+    computed. The encoder always runs outside the lock. The canonical set of
+    each distinct (resume skills, job skills) pair is cached (LRU), so
+    repeated scoring of a resume against a job costs one dictionary lookup.
+    """
+
+    def __init__(self, embed: Callable[[List[str]], np.ndarray], threshold: float = None, cache_size: int = None):
+        self.embed = embed
+        self.threshold = settings.SKILL_MATCH_THRESHOLD if threshold is None else threshold
+        self.cache_size = cache_size or settings.SKILL_CACHE_SIZE
+        self.names: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.max_skill_id = 0
+        self._reconciled_at = None
+        self._cache: "OrderedDict[Tuple[Tuple[str, ...], Tuple[str, ...]], FrozenSet[str]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _vectors(self, terms: List[str]) -> np.ndarray:
+        vectors = np.asarray(self.embed(terms), dtype=np.float32)
+        return _normalize(vectors.reshape(len(terms), -1))
+
+    def add(self, names: Iterable[str]) -> None:
+        """Embed and keep the vectors of skill names not seen before."""
+        names = list(dict.fromkeys(name.lower() for name in names if name))
+        with self._lock:
+            new = [name for name in names if name not in self.positions]
+        if not new:
+            return
+        vectors = self._vectors(new)
+        with self._lock:
+            # Another thread may have added some of them meanwhile
+            fresh = [row for row, name in enumerate(new) if name not in self.positions]
+            if not fresh:
+                return
+            self.matrix = vectors[fresh] if not self.names else np.vstack([self.matrix, vectors[fresh]])
+            for row in fresh:
+                self.positions[new[row]] = len(self.names)
+                self.names.append(new[row])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"skills": len(self.names), "matrix_bytes": self.matrix.nbytes, "cached_sets": len(self._cache)}
+
+    def sync(self, db: Session) -> None:
+        """Add skills stored since the last sync (or since start-up).
+
+        Every INDEX_RECONCILE_SECONDS all skills are read again, so skills
+        committed out of id order are not missed; known names are skipped.
+        """
+        query = db.query(Skill.id, Skill.name)
+        with self._lock:
+            now = time.monotonic()
+            if self._reconciled_at is None or now - self._reconciled_at >= settings.INDEX_RECONCILE_SECONDS:
+                self._reconciled_at = now
+            else:
+                query = query.filter(Skill.id > self.max_skill_id)
+        rows = query.order_by(Skill.id).all()
+        if rows:
+            self.add(name for _, name in rows)
+            with self._lock:
+                self.max_skill_id = max(self.max_skill_id, rows[-1][0])
+
+    def similarities(self, terms: Sequence[str], skills: Sequence[str]) -> np.ndarray:
+        """(len(terms), len(skills)) cosine similarities of lower-cased names."""
+        self.add(skills)
+        with self._lock:
+            known = {term: self.matrix[self.positions[term]] for term in terms if term in self.positions}
+            skill_vectors = self.matrix[[self.positions[skill] for skill in skills]] if skills else None
+        if not terms or skill_vectors is None:
+            return np.zeros((len(terms), len(skills)), dtype=np.float32)
+        unknown = [term for term in terms if term not in known]
+        if unknown:
+            known.update(zip(unknown, self._vectors(unknown)))
+        return np.stack([known[term] for term in terms]) @ skill_vectors.T
+
+    def match_columns(self, similarities: np.ndarray, terms: Sequence[str], skills: Sequence[str]) -> np.ndarray:
+        """Column in `skills` that each term maps to, or -1 if it is kept as written.
+
+        A term listed in `skills` maps to itself, any other to its most similar
+        skill if that reaches the threshold.
+        """
+        columns = np.full(len(terms), -1, dtype=np.int64)
+        if not len(terms) or not len(skills):
+            return columns
+        best = similarities.argmax(axis=1)
+        matched = similarities[np.arange(len(terms)), best] >= self.threshold
+        columns[matched] = best[matched]
+        exact = {skill: column for column, skill in enumerate(skills)}
+        for row, term in enumerate(terms):
+            if term in exact:
+                columns[row] = exact[term]
+        return columns
+
+    def canonicalize_many(self, skill_lists: Sequence[Iterable[str]], job_skills: Iterable[str]) -> List[FrozenSet[str]]:
+        """Canonical lower-cased skill set of every list against one job's skills.
+
+        Cache misses share one matrix product with the job's skill vectors.
+        """
+        job_key = skill_key(job_skills)
+        keys = [(skill_key(skills), job_key) for skills in skill_lists]
+        results = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[key] = self._cache[key]
+        missing = [key for key in dict.fromkeys(keys) if key not in results]
+        metrics.inc("skill_canonical_cache_hits", len(keys) - len(missing))
+        if missing:
+            metrics.inc("skill_canonical_cache_misses", len(missing))
+            terms = list(dict.fromkeys(term for resume_key, _ in missing for term in resume_key))
+            columns = self.match_columns(self.similarities(terms, job_key), terms, job_key)
+            canonical = {term: job_key[column] if column >= 0 else term for term, column in zip(terms, columns)}
+            with self._lock:
+                for key in missing:
+                    results[key] = frozenset(canonical[term] for term in key[0])
+                    self._cache[key] = results[key]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [results[key] for key in keys]
+
+    def canonicalize(self, skills: Iterable[str], job_skills: Iterable[str]) -> FrozenSet[str]:
+        return self.canonicalize_many([skills], job_skills)[0]
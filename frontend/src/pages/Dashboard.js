@@ -17,31 +17,16 @@ import {
 import axios from 'axios';
 
 function Dashboard() {
-    const [stats, setStats] = useState({
-        totalJobs: 0,
-        totalCandidates: 0,
-        totalResumes: 0,
-        activeApplications: 0,
-    });
+    const [stats, setStats] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
 
     useEffect(() => {
         const fetchStats = async () => {
             try {
-                const [jobsRes, candidatesRes, resumesRes, applicationsRes] = await Promise.all([
-                    axios.get('/api/jobs'),
-                    axios.get('/api/candidates'),
-                    axios.get('/api/resumes'),
-                    axios.get('/api/applications'),
-                ]);
-
-                setStats({
-                    totalJobs: jobsRes.data.length,
-                    totalCandidates: candidatesRes.data.length,
-                    totalResumes: resumesRes.data.length,
-                    activeApplications: applicationsRes.data.filter(app => app.status === 'pending').length,
-                });
+                // Counts are aggregated on the server; one small response
+                const response = await axios.get('/api/stats');
+                setStats(response.data);
             } catch (err) {
                 setError('Failed to fetch dashboard statistics');
                 console.error('Error fetching stats:', err);
@@ -94,6 +79,8 @@ function Dashboard() {
         );
     }
 
+    const { totals, applications_by_status: byStatus, applicants_per_job: topJobs } = stats;
+
     return (
         <Box sx={{ flexGrow: 1 }}>
             <Typography variant="h4" sx={{ mb: 4 }}>
@@ -103,7 +90,7 @@ function Dashboard() {
                 <Grid item xs={12} sm={6} md={3}>
                     <StatCard
                         title="Total Jobs"
-                        value={stats.totalJobs}
+                        value={totals.jobs}
                         icon={<WorkIcon sx={{ color: '#1976d2' }} />}
                         color="#1976d2"
                     />
@@ -111,7 +98,7 @@ function Dashboard() {
                 <Grid item xs={12} sm={6} md={3}>
                     <StatCard
                         title="Total Candidates"
-                        value={stats.totalCandidates}
+                        value={totals.candidates}
                         icon={<PeopleIcon sx={{ color: '#2e7d32' }} />}
                         color="#2e7d32"
                     />
@@ -119,7 +106,7 @@ function Dashboard() {
                 <Grid item xs={12} sm={6} md={3}>
                     <StatCard
                         title="Total Resumes"
-                        value={stats.totalResumes}
+                        value={totals.resumes}
                         icon={<DescriptionIcon sx={{ color: '#ed6c02' }} />}
                         color="#ed6c02"
                     />
@@ -127,11 +114,29 @@ function Dashboard() {
                 <Grid item xs={12} sm={6} md={3}>
                     <StatCard
                         title="Active Applications"
-                        value={stats.activeApplications}
+                        value={byStatus.pending || 0}
                         icon={<TrendingUpIcon sx={{ color: '#9c27b0' }} />}
                         color="#9c27b0"
                     />
                 </Grid>
+                {topJobs.length > 0 && (
+                    <Grid item xs={12}>
+                        <Paper sx={{ p: 2 }}>
+                            <Typography variant="h6" sx={{ mb: 2 }}>
+                                Applicants per Job
+                            </Typography>
+                            {topJobs.map((job) => (
+                                <Box
+                                    key={job.job_id}
+                                    sx={{ display: 'flex', justifyContent: 'space-between', py: 0.5 }}
+                                >
+                                    <Typography>{job.title}</Typography>
+                                    <Typography color="text.secondary">{job.applicants}</Typography>
+                                </Box>
+                            ))}
+                        </Paper>
+                    </Grid>
+                )}
             </Grid>
         </Box>
     );
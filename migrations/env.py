@@ -0,0 +1,57 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine
+from app.core.config import settings
+from app.db.base_class import Base
+import app.models.models  # noqa: F401 - registers the tables on Base.metadata
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Tables written by data migrations for review; not part of the models
+ARCHIVE_TABLES = {"applications_duplicates_0003"}
+
+def _include_name(name, type_, parent_names) -> bool:
+    return not (type_ == "table" and name in ARCHIVE_TABLES)
+
+def _configure(**options) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_name=_include_name,
+        # SQLite cannot ALTER constraints; batch mode recreates the table instead
+        render_as_batch=True,
+        compare_type=True,
+        **options
+    )
+
+def run_migrations_offline() -> None:
+    """Emit the SQL without a database connection (alembic upgrade --sql)."""
+    _configure(url=settings.SQLALCHEMY_DATABASE_URI, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    # app.db.migrate passes the application's connection in
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+    try:
+        with engine.connect() as connection:
+            _configure(connection=connection)
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,103 @@
+"""Baseline: the schema previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases created before migrations existed are stamped at this revision by
+app.db.migrate instead of running it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_admin", sa.Boolean()),
+        *_timestamps()
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "candidates",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("phone", sa.String()),
+        sa.Column("experience_years", sa.Float()),
+        sa.Column("education_level", sa.String()),
+        *_timestamps()
+    )
+    op.create_index("ix_candidates_id", "candidates", ["id"])
+    op.create_index("ix_candidates_email", "candidates", ["email"], unique=True)
+
+    op.create_table(
+        "resumes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id")),
+        sa.Column("file_path", sa.String()),
+        sa.Column("parsed_data", sa.Text()),
+        *_timestamps()
+    )
+    op.create_index("ix_resumes_id", "resumes", ["id"])
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String()),
+        sa.Column("description", sa.Text()),
+        sa.Column("requirements", sa.Text()),
+        sa.Column("min_experience", sa.Float()),
+        sa.Column("education_required", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        *_timestamps()
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_title", "jobs", ["title"])
+
+    op.create_table(
+        "skills",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("category", sa.String()),
+    )
+    op.create_index("ix_skills_id", "skills", ["id"])
+    op.create_index("ix_skills_name", "skills", ["name"], unique=True)
+
+    op.create_table(
+        "job_skills",
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id")),
+        sa.Column("skill_id", sa.Integer(), sa.ForeignKey("skills.id")),
+    )
+
+    op.create_table(
+        "applications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id")),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id")),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id")),
+        sa.Column("status", sa.String()),
+        sa.Column("match_score", sa.Float()),
+        *_timestamps()
+    )
+    op.create_index("ix_applications_id", "applications", ["id"])
+
+def downgrade() -> None:
+    for table in ("applications", "job_skills", "skills", "jobs", "resumes", "candidates", "users"):
+        op.drop_table(table)
@@ -0,0 +1,82 @@
+"""Catch up with schema changes made before migrations existed
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Keyset-pagination indexes, the search outbox, resource versions and the
+near-duplicate columns on resumes. Databases created with create_all after
+some of these landed already have part of them, so every step checks first.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+def _has_table(table: str) -> bool:
+    return _inspector().has_table(table)
+
+def _has_column(table: str, column: str) -> bool:
+    return column in {info["name"] for info in _inspector().get_columns(table)}
+
+def _has_index(table: str, index: str) -> bool:
+    return index in {info["name"] for info in _inspector().get_indexes(table)}
+
+def _create_index(name: str, table: str, columns) -> None:
+    if not _has_index(table, name):
+        op.create_index(name, table, columns)
+
+def upgrade() -> None:
+    _create_index("ix_resumes_candidate_created_id", "resumes", ["candidate_id", "created_at", "id"])
+    _create_index("ix_jobs_created_id", "jobs", ["created_at", "id"])
+    _create_index("ix_jobs_active_created_id", "jobs", ["is_active", "created_at", "id"])
+    _create_index("ix_applications_created_id", "applications", ["created_at", "id"])
+
+    if not _has_table("search_outbox"):
+        op.create_table(
+            "search_outbox",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entity_type", sa.String(), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column("operation", sa.String(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("last_error", sa.Text()),
+            sa.Column("available_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("processed_at", sa.DateTime(timezone=True)),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    _create_index("ix_search_outbox_id", "search_outbox", ["id"])
+    _create_index("ix_search_outbox_pending", "search_outbox", ["processed_at", "available_at", "id"])
+
+    if not _has_table("resource_versions"):
+        op.create_table(
+            "resource_versions",
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+        )
+
+    if not _has_column("resumes", "minhash"):
+        with op.batch_alter_table("resumes") as batch:
+            batch.add_column(sa.Column("minhash", sa.LargeBinary()))
+            batch.add_column(sa.Column("duplicate_of_id", sa.Integer()))
+            batch.create_foreign_key("fk_resumes_duplicate_of_id", "resumes", ["duplicate_of_id"], ["id"])
+    _create_index("ix_resumes_duplicate_of_id", "resumes", ["duplicate_of_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_resumes_duplicate_of_id", table_name="resumes")
+    with op.batch_alter_table("resumes") as batch:
+        batch.drop_constraint("fk_resumes_duplicate_of_id", type_="foreignkey")
+        batch.drop_column("duplicate_of_id")
+        batch.drop_column("minhash")
+    op.drop_table("resource_versions")
+    op.drop_table("search_outbox")
+    op.drop_index("ix_applications_created_id", table_name="applications")
+    op.drop_index("ix_jobs_active_created_id", table_name="jobs")
+    op.drop_index("ix_jobs_created_id", table_name="jobs")
+    op.drop_index("ix_resumes_candidate_created_id", table_name="resumes")
@@ -0,0 +1,109 @@
+"""Indexes and constraints for the hot queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+- applications: unique (job_id, resume_id), which also serves lookups by job,
+  plus indexes on resume_id and candidate_id
+- job_skills: primary key (job_id, skill_id) plus an index on skill_id
+
+Rows that would violate the new constraints are removed first. For
+applications the oldest of each (job_id, resume_id) pair is kept; the others
+may differ in status or match score, so they are moved to
+applications_duplicates_0003 for review and restored by the downgrade.
+Exact duplicate job_skills rows carry no data and are dropped.
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Applications set aside by the upgrade
+ARCHIVE_TABLE = "applications_duplicates_0003"
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+def _has_index(table: str, index: str) -> bool:
+    return index in {info["name"] for info in _inspector().get_indexes(table)}
+
+def _has_unique(table: str, columns) -> bool:
+    inspector = _inspector()
+    constraints = inspector.get_unique_constraints(table) + [
+        info for info in inspector.get_indexes(table) if info.get("unique")
+    ]
+    return any(info["column_names"] == list(columns) for info in constraints)
+
+def _create_index(name: str, table: str, columns) -> None:
+    if not _has_index(table, name):
+        op.create_index(name, table, columns)
+
+def _deduplicate_job_skills() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT DISTINCT job_id, skill_id FROM job_skills"
+        " WHERE job_id IS NOT NULL AND skill_id IS NOT NULL"
+    )).mappings().all()
+    bind.execute(sa.text("DELETE FROM job_skills"))
+    if rows:
+        bind.execute(
+            sa.text("INSERT INTO job_skills (job_id, skill_id) VALUES (:job_id, :skill_id)"),
+            [dict(row) for row in rows]
+        )
+
+def _archive_duplicate_applications() -> None:
+    """Move all but the oldest application of each (job_id, resume_id) pair to ARCHIVE_TABLE."""
+    bind = op.get_bind()
+    duplicates = (
+        "job_id IS NOT NULL AND resume_id IS NOT NULL"
+        " AND id NOT IN (SELECT MIN(id) FROM applications GROUP BY job_id, resume_id)"
+    )
+    pairs = bind.execute(sa.text(
+        f"SELECT DISTINCT job_id, resume_id FROM applications WHERE {duplicates} ORDER BY job_id, resume_id"
+    )).all()
+    if not pairs:
+        return
+    op.execute(f"CREATE TABLE {ARCHIVE_TABLE} AS SELECT * FROM applications WHERE {duplicates}")
+    op.execute(f"DELETE FROM applications WHERE id IN (SELECT id FROM {ARCHIVE_TABLE})")
+    logger.warning(
+        "Moved duplicate applications of %d (job_id, resume_id) pairs to %s: %s",
+        len(pairs), ARCHIVE_TABLE, ", ".join(f"({job_id}, {resume_id})" for job_id, resume_id in pairs)
+    )
+
+def upgrade() -> None:
+    if not _has_unique("applications", ["job_id", "resume_id"]):
+        _archive_duplicate_applications()
+        with op.batch_alter_table("applications") as batch:
+            batch.create_unique_constraint("uq_applications_job_resume", ["job_id", "resume_id"])
+    _create_index("ix_applications_resume_id", "applications", ["resume_id"])
+    _create_index("ix_applications_candidate_id", "applications", ["candidate_id"])
+
+    if not _inspector().get_pk_constraint("job_skills").get("constrained_columns"):
+        _deduplicate_job_skills()
+        with op.batch_alter_table("job_skills") as batch:
+            batch.alter_column("job_id", existing_type=sa.Integer(), nullable=False)
+            batch.alter_column("skill_id", existing_type=sa.Integer(), nullable=False)
+            batch.create_primary_key("job_skills_pkey", ["job_id", "skill_id"])
+    _create_index("ix_job_skills_skill_id", "job_skills", ["skill_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_job_skills_skill_id", table_name="job_skills")
+    with op.batch_alter_table("job_skills") as batch:
+        batch.drop_constraint("job_skills_pkey", type_="primary")
+        batch.alter_column("job_id", existing_type=sa.Integer(), nullable=True)
+        batch.alter_column("skill_id", existing_type=sa.Integer(), nullable=True)
+    op.drop_index("ix_applications_candidate_id", table_name="applications")
+    op.drop_index("ix_applications_resume_id", table_name="applications")
+    with op.batch_alter_table("applications") as batch:
+        batch.drop_constraint("uq_applications_job_resume", type_="unique")
+    if _inspector().has_table(ARCHIVE_TABLE):
+        columns = ", ".join(info["name"] for info in _inspector().get_columns(ARCHIVE_TABLE))
+        op.execute(f"INSERT INTO applications ({columns}) SELECT {columns} FROM {ARCHIVE_TABLE}")
+        op.drop_table(ARCHIVE_TABLE)
@@ -0,0 +1,84 @@
+"""Move resume raw text out of parsed_data into a compressed column
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+resumes.raw_text holds the zlib-compressed UTF-8 text (app.db.types.CompressedText);
+the "raw_text" key is removed from parsed_data. Rows are moved in batches.
+"""
+import json
+import zlib
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+resumes = sa.table(
+    "resumes",
+    sa.column("id", sa.Integer()),
+    sa.column("parsed_data", sa.Text()),
+    sa.column("raw_text", sa.LargeBinary()),
+)
+
+def _batches(bind, condition):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(resumes.c.id, resumes.c.parsed_data, resumes.c.raw_text)
+            .where(resumes.c.id > last_id, condition)
+            .order_by(resumes.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+def upgrade() -> None:
+    if "raw_text" not in {info["name"] for info in sa.inspect(op.get_bind()).get_columns("resumes")}:
+        with op.batch_alter_table("resumes") as batch:
+            batch.add_column(sa.Column("raw_text", sa.LargeBinary()))
+
+    bind = op.get_bind()
+    for rows in _batches(bind, resumes.c.parsed_data.like('%"raw_text"%')):
+        updates = []
+        for row in rows:
+            parsed_data = json.loads(row.parsed_data)
+            if "raw_text" not in parsed_data:
+                continue
+            text = parsed_data.pop("raw_text") or ""
+            updates.append({
+                "row_id": row.id,
+                "parsed_data": json.dumps(parsed_data),
+                "raw_text": zlib.compress(text.encode("utf-8"), 6),
+            })
+        if updates:
+            bind.execute(
+                resumes.update()
+                .where(resumes.c.id == sa.bindparam("row_id"))
+                .values(parsed_data=sa.bindparam("parsed_data"), raw_text=sa.bindparam("raw_text")),
+                updates
+            )
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for rows in _batches(bind, resumes.c.raw_text.isnot(None)):
+        updates = []
+        for row in rows:
+            parsed_data = json.loads(row.parsed_data) if row.parsed_data else {}
+            parsed_data["raw_text"] = zlib.decompress(row.raw_text).decode("utf-8")
+            updates.append({"row_id": row.id, "parsed_data": json.dumps(parsed_data)})
+        bind.execute(
+            resumes.update()
+            .where(resumes.c.id == sa.bindparam("row_id"))
+            .values(parsed_data=sa.bindparam("parsed_data")),
+            updates
+        )
+    with op.batch_alter_table("resumes") as batch:
+        batch.drop_column("raw_text")
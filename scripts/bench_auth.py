@@ -0,0 +1,82 @@
+"""Measure how a burst of logins affects the latency of other routes.
+
+Runs the app in-process over ASGI, fires concurrent logins for an existing
+user and probes a cheap route throughout. With bcrypt on the event loop the
+probe latency tracks the burst; with hashing in its own executor it stays flat.
+
+    PYTHONPATH=. python scripts/bench_auth.py --email admin@cv-ats.com --password admin123
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from app.core.config import settings
+from app.main import app
+
+async def probe(client: httpx.AsyncClient, path: str, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> int:
+    response = await client.post(
+        f"{settings.API_V1_STR}/token",
+        data={"username": email, "password": password}
+    )
+    return response.status_code
+
+def summarize(label: str, latencies: list):
+    latencies = sorted(latencies)
+    if not latencies:
+        print(f"{label}: no samples")
+        return
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(
+        f"{label}: n={len(latencies)} "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p95={p95 * 1000:.1f}ms "
+        f"max={latencies[-1] * 1000:.1f}ms"
+    )
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Baseline probe latency without logins
+        stop = asyncio.Event()
+        baseline = []
+        task = asyncio.create_task(probe(client, args.probe_path, stop, baseline))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        await task
+
+        # Probe latency during a login burst
+        stop = asyncio.Event()
+        during = []
+        task = asyncio.create_task(probe(client, args.probe_path, stop, during))
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(
+            login(client, args.email, args.password) for _ in range(args.logins)
+        ))
+        burst_seconds = time.perf_counter() - start
+        stop.set()
+        await task
+
+    ok = sum(1 for code in statuses if code == 200)
+    print(f"logins: {ok}/{len(statuses)} succeeded in {burst_seconds:.2f}s ({len(statuses) / burst_seconds:.1f}/s)")
+    summarize(f"{args.probe_path} baseline", baseline)
+    summarize(f"{args.probe_path} during burst", during)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=50, help="Concurrent logins in the burst")
+    parser.add_argument("--probe-path", default="/", help="Route probed during the burst")
+    parser.add_argument("--baseline-seconds", type=float, default=1.0)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
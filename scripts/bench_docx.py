@@ -0,0 +1,162 @@
+"""Compare the streaming DOCX extractor with python-docx.
+
+Builds a synthetic CV-like document with marker words in body paragraphs,
+tables, a text box, a header and a footer, then reports per extractor the
+time per document, peak traced memory and which markers were recovered.
+Real documents can be timed as well with --file.
+
+    PYTHONPATH=. python scripts/bench_docx.py --paragraphs 5000
+    PYTHONPATH=. python scripts/bench_docx.py --file cv1.docx --file cv2.docx
+"""
+import argparse
+import io
+import time
+import tracemalloc
+import zipfile
+from xml.sax.saxutils import escape
+from app.services.docx_extractor import extract_docx_text
+
+try:
+    import docx
+except ImportError:
+    docx = None
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:v="urn:schemas-microsoft-com:vml" '
+    'mc:Ignorable="wps"'
+)
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/header1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>
+<Override PartName="/word/footer1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml"/>
+</Types>"""
+
+PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/header" Target="header1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/footer" Target="footer1.xml"/>
+</Relationships>"""
+
+def paragraph(text: str) -> str:
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+def table(rows: int, index: int) -> str:
+    cells = "".join(
+        "<w:tr>" + "".join(
+            f"<w:tc>{paragraph(f'tablemarker{index}x{row}x{column} Kubernetes')}</w:tc>" for column in range(3)
+        ) + "</w:tr>"
+        for row in range(rows)
+    )
+    return f"<w:tbl>{cells}</w:tbl>"
+
+def text_box(text: str) -> str:
+    return (
+        "<w:p><w:r><mc:AlternateContent>"
+        f"<mc:Choice Requires=\"wps\"><w:drawing><wps:txbx><w:txbxContent>{paragraph(text)}</w:txbxContent></wps:txbx></w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict><v:textbox><w:txbxContent>{paragraph(text)}</w:txbxContent></v:textbox></w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+    )
+
+def synthetic_docx(paragraphs: int, tables: int) -> tuple:
+    """Build a DOCX in memory and return (bytes, {region: [markers]})."""
+    markers = {
+        "body": [f"bodymarker{i}" for i in range(paragraphs)],
+        "table": [f"tablemarker{i}x{row}x{column}" for i in range(tables) for row in range(4) for column in range(3)],
+        "text box": ["textboxmarker"],
+        "header": ["headermarker"],
+        "footer": ["footermarker"],
+    }
+    body = [text_box("textboxmarker Skills: Python, SQL")]
+    step = max(paragraphs // tables, 1) if tables else 0
+    table_count = 0
+    for i in range(paragraphs):
+        body.append(paragraph(f"bodymarker{i} Led a team building data pipelines in Python and SQL."))
+        if step and i % step == 0 and table_count < tables:
+            body.append(table(4, table_count))
+            table_count += 1
+    body.append('<w:sectPr><w:headerReference w:type="default" r:id="rId1"/><w:footerReference w:type="default" r:id="rId2"/></w:sectPr>')
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", PACKAGE_RELS)
+        archive.writestr("word/_rels/document.xml.rels", DOCUMENT_RELS)
+        archive.writestr("word/document.xml", f"<w:document {NAMESPACES}><w:body>{''.join(body)}</w:body></w:document>")
+        archive.writestr("word/header1.xml", f"<w:hdr {NAMESPACES}>{paragraph('headermarker Jane Doe')}</w:hdr>")
+        archive.writestr("word/footer1.xml", f"<w:ftr {NAMESPACES}>{paragraph('footermarker jane@example.com')}</w:ftr>")
+    return buffer.getvalue(), markers
+
+def python_docx_text(content: bytes) -> str:
+    document = docx.Document(io.BytesIO(content))
+    return "\n".join(paragraph.text for paragraph in document.paragraphs)
+
+def streaming_text(content: bytes) -> str:
+    return extract_docx_text(content)
+
+def measure(extract, content: bytes, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = extract(content)
+    seconds = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    extract(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return text, seconds, peak
+
+def extractors():
+    yield "streaming", streaming_text
+    if docx is not None:
+        yield "python-docx", python_docx_text
+    else:
+        print("python-docx is not installed; only the streaming extractor is measured")
+
+def run_synthetic(args):
+    content, markers = synthetic_docx(args.paragraphs, args.tables)
+    print(f"synthetic document: {len(content):,} bytes, {args.paragraphs} paragraphs, {args.tables} tables")
+    for label, extract in extractors():
+        text, seconds, peak = measure(extract, content, args.repeat)
+        words = set(text.split())
+        coverage = ", ".join(
+            f"{region} {sum(marker in words for marker in region_markers)}/{len(region_markers)}"
+            for region, region_markers in markers.items()
+        )
+        print(f"{label:<12} {seconds * 1000:>9.2f} ms  peak {peak / 1024:>9.0f} KiB  {coverage}")
+
+def run_files(args):
+    for path in args.file:
+        with open(path, "rb") as file:
+            content = file.read()
+        print(f"{path}: {len(content):,} bytes")
+        for label, extract in extractors():
+            text, seconds, peak = measure(extract, content, args.repeat)
+            print(f"  {label:<12} {seconds * 1000:>9.2f} ms  peak {peak / 1024:>9.0f} KiB  {len(text.split()):>7} words")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--file", action="append", help="Time a real document instead (repeatable)")
+    args = parser.parse_args()
+    if args.file:
+        run_files(args)
+    else:
+        run_synthetic(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare response size and encoding time of the ranking formats.
+
+Builds a synthetic rank_candidates result and encodes it the way FastAPI does
+by default (jsonable_encoder + json.dumps) and with the compact formats.
+
+    PYTHONPATH=. python scripts/bench_ranking_formats.py --rows 10000
+"""
+import argparse
+import json
+import random
+import time
+from fastapi.encoders import jsonable_encoder
+from app.core.serialization import columnar_rankings, dumps_json, dumps_msgpack, msgpack
+
+def synthetic_rankings(rows: int):
+    weights = {"skills": 0.3, "experience": 0.25, "education": 0.2, "semantic": 0.25}
+    components = {"skills": "skill_match", "experience": "experience_match", "education": "education_match", "semantic": "semantic_match"}
+    ranked = []
+    for i in range(rows):
+        breakdown = {component: random.random() for component in components.values()}
+        breakdown["weights"] = weights
+        ranked.append({
+            "candidate_id": i + 1,
+            "resume_id": i + 1,
+            "name": None,
+            "match_score": sum(weight * breakdown[components[key]] for key, weight in weights.items()),
+            "breakdown": breakdown
+        })
+    ranked.sort(key=lambda entry: entry["match_score"], reverse=True)
+    return ranked
+
+def measure(label, encode, repeat, baseline=None):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = encode()
+    seconds = (time.perf_counter() - start) / repeat
+    line = f"{label:<28} {len(body):>10,} bytes {seconds * 1000:>9.2f} ms"
+    if baseline:
+        line += f"   size x{baseline[0] / len(body):.1f}  cpu x{baseline[1] / seconds:.1f}"
+    print(line)
+    return len(body), seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    ranked = synthetic_rankings(args.rows)
+    baseline = measure("json (FastAPI default)", lambda: json.dumps(jsonable_encoder(ranked)).encode(), args.repeat)
+    measure("json (fast encoder)", lambda: dumps_json(ranked), args.repeat, baseline)
+    measure("compact json", lambda: dumps_json(columnar_rankings(ranked)), args.repeat, baseline)
+    if msgpack is not None:
+        measure("compact msgpack", lambda: dumps_msgpack(columnar_rankings(ranked)), args.repeat, baseline)
+
+if __name__ == "__main__":
+    main()
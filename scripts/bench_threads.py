@@ -0,0 +1,110 @@
+"""Compare inference throughput with default and planned CPU thread settings.
+
+Starts --workers processes at once, like uvicorn --workers, each running the
+same CPU-bound workload for --seconds, and reports the combined throughput:
+
+  default  BLAS/OpenMP and torch pick their own thread counts (every core per process)
+  planned  app.core.runtime.configure_threads() splits the cores among the workers
+
+    PYTHONPATH=. python scripts/bench_threads.py --workers 4 --workload bert
+    PYTHONPATH=. python scripts/bench_threads.py --workers 2 --workload numpy --seconds 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+WORKLOADS = ("numpy", "torch", "bert")
+
+def child(workload: str, mode: str, workers: int, start_at: float, seconds: float) -> None:
+    """Run in a worker process: configure threads, warm up, then count operations until the deadline."""
+    if mode == "planned":
+        from app.core.runtime import configure_threads, thread_plan
+        configure_threads(thread_plan(workers=workers))
+
+    if workload == "numpy":
+        import numpy as np
+        a = np.random.rand(512, 512).astype(np.float32)
+        op = lambda: a @ a
+    elif workload == "torch":
+        import torch
+        # Roughly one BERT-base feed-forward layer over a batch of 16 x 128 tokens
+        layer = torch.nn.Sequential(torch.nn.Linear(768, 3072), torch.nn.GELU(), torch.nn.Linear(3072, 768))
+        x = torch.randn(16 * 128, 768)
+        def op():
+            with torch.no_grad():
+                layer(x)
+    else:
+        from app.services.job_matcher import JobMatcher, WARMUP_TEXT
+        matcher = JobMatcher()
+        texts = [WARMUP_TEXT * 4] * 8
+        op = lambda: matcher.get_bert_embeddings(texts)
+
+    op()  # warmup, outside the timed window
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < deadline:
+        op()
+        count += 1
+    print(json.dumps({"ops": count}))
+
+def default_env() -> dict:
+    from app.core.runtime import BLAS_THREAD_VARIABLES
+    env = dict(os.environ)
+    for variable in BLAS_THREAD_VARIABLES:
+        env.pop(variable, None)
+    return env
+
+def run(workload: str, mode: str, workers: int, seconds: float, startup: float) -> float:
+    """Total operations per second of `workers` processes running concurrently."""
+    start_at = time.time() + startup
+    command = [
+        sys.executable, os.path.abspath(__file__), "--child", mode,
+        "--workload", workload, "--workers", str(workers),
+        "--start-at", str(start_at), "--seconds", str(seconds),
+    ]
+    processes = [
+        subprocess.Popen(command, env=default_env(), stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    ops = 0
+    for process in processes:
+        output, _ = process.communicate()
+        if process.returncode != 0:
+            raise SystemExit(f"{mode} worker failed with exit code {process.returncode}")
+        ops += json.loads(output.strip().splitlines()[-1])["ops"]
+    return ops / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent worker processes")
+    parser.add_argument("--workload", choices=WORKLOADS, default="torch")
+    parser.add_argument("--seconds", type=float, default=10.0, help="timed window per run")
+    parser.add_argument("--startup", type=float, default=None,
+                        help="seconds allowed for imports and warmup before the window opens")
+    parser.add_argument("--child", choices=("default", "planned"), help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.workload, args.child, args.workers, args.start_at, args.seconds)
+        return
+
+    from app.core.runtime import available_cores, thread_plan
+    plan = thread_plan(workers=args.workers)
+    startup = args.startup if args.startup is not None else (60.0 if args.workload == "bert" else 10.0)
+    print(f"{available_cores()} cores, {args.workers} workers, workload {args.workload}, {args.seconds:g}s per run")
+    print(f"planned: {plan.intra_op} intra-op / {plan.inter_op} inter-op threads per worker")
+
+    results = {}
+    for mode in ("default", "planned"):
+        results[mode] = run(args.workload, mode, args.workers, args.seconds, startup)
+        print(f"{mode:8} {results[mode]:10.2f} ops/s")
+    if results["default"]:
+        print(f"speedup  {results['planned'] / results['default']:10.2f}x")
+
+if __name__ == "__main__":
+    main()
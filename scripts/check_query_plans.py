@@ -0,0 +1,153 @@
+"""Check that the hot queries are served by indexes.
+
+Runs EXPLAIN on every query in HOT_QUERIES and exits with status 1 if any of
+them reads a table with a full scan. By default the check runs against a
+throwaway SQLite database built by the migrations, so it also catches an index
+that exists in the models but was never migrated. Point it at a local
+PostgreSQL database with --database-url; sequential scans are disabled there
+so that small tables do not hide a missing index.
+
+    PYTHONPATH=. python scripts/check_query_plans.py
+    PYTHONPATH=. python scripts/check_query_plans.py --database-url postgresql://localhost/cv_ats --migrate
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple
+from sqlalchemy import create_engine, select, text, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app.db.migrate import upgrade_database
+from app.models.models import (
+    Application, Job, ResourceVersion, Resume, SearchOutbox, Skill, User, job_skills
+)
+
+class explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(explain, "sqlite")
+def _explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+@compiles(explain, "postgresql")
+def _explain_postgresql(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+class HotQuery(NamedTuple):
+    name: str
+    build: Callable  # () -> statement, the query as the application issues it
+
+_CURSOR = (datetime(2024, 1, 1, tzinfo=timezone.utc), 1000)
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("login by email", lambda: select(User).where(User.email == "admin@cv-ats.com")),
+    HotQuery("skill by name", lambda: select(Skill).where(Skill.name == "Python")),
+    HotQuery("active jobs page", lambda: (
+        select(Job).where(Job.is_active == True, tuple_(Job.created_at, Job.id) < _CURSOR)
+        .order_by(Job.created_at.desc(), Job.id.desc()).limit(21)
+    )),
+    HotQuery("job skills", lambda: select(job_skills).where(job_skills.c.job_id.in_([1, 2, 3]))),
+    HotQuery("jobs with a skill", lambda: select(job_skills.c.job_id).where(job_skills.c.skill_id == 1)),
+    HotQuery("candidate resumes page", lambda: (
+        select(Resume).where(Resume.candidate_id == 1, tuple_(Resume.created_at, Resume.id) < _CURSOR)
+        .order_by(Resume.created_at.desc(), Resume.id.desc()).limit(21)
+    )),
+    HotQuery("resume duplicates", lambda: select(Resume).where(Resume.duplicate_of_id == 1).order_by(Resume.id)),
+    HotQuery("application exists", lambda: (
+        select(Application.id).where(Application.job_id == 1, Application.resume_id == 1)
+    )),
+    HotQuery("job applications", lambda: select(Application).where(Application.job_id == 1)),
+    HotQuery("resume applications", lambda: select(Application.job_id).where(Application.resume_id == 1)),
+    HotQuery("candidate applications", lambda: select(Application).where(Application.candidate_id == 1)),
+    HotQuery("applications page", lambda: (
+        select(Application).where(tuple_(Application.created_at, Application.id) < _CURSOR)
+        .order_by(Application.created_at.desc(), Application.id.desc()).limit(21)
+    )),
+    HotQuery("pending outbox rows", lambda: (
+        select(SearchOutbox).where(
+            SearchOutbox.processed_at.is_(None),
+            SearchOutbox.available_at <= _CURSOR[0],
+            SearchOutbox.attempts < 10
+        ).order_by(SearchOutbox.id).limit(500)
+    )),
+    HotQuery("resource version", lambda: select(ResourceVersion.version).where(ResourceVersion.name == "resumes")),
+]
+
+def _sqlite_full_scans(rows) -> List[str]:
+    # Detail is "SCAN jobs" for a full scan, "SEARCH jobs USING INDEX ..." or
+    # "SCAN jobs USING INDEX ..." (an index walk, e.g. ORDER BY ... LIMIT) otherwise
+    return [
+        row.detail for row in rows
+        if row.detail.startswith("SCAN ") and " USING " not in row.detail
+    ]
+
+def _postgresql_full_scans(rows) -> List[str]:
+    plan = rows[0][0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    scans = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+def _plan_text(dialect: str, rows) -> str:
+    if dialect == "sqlite":
+        return "; ".join(row.detail for row in rows)
+    return json.dumps(rows[0][0])
+
+def check_query_plans(engine, verbose: bool = False) -> List[str]:
+    """Names of the hot queries whose plan contains a full table scan."""
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise SystemExit(f"Unsupported database: {dialect}")
+    full_scans = _sqlite_full_scans if dialect == "sqlite" else _postgresql_full_scans
+
+    failed = []
+    with engine.connect() as connection:
+        for query in HOT_QUERIES:
+            with connection.begin():
+                if dialect == "postgresql":
+                    connection.execute(text("SET LOCAL enable_seqscan = off"))
+                rows = connection.execute(explain(query.build())).all()
+            scans = full_scans(rows)
+            status = "FULL SCAN" if scans else "ok"
+            print(f"{status:9}  {query.name}" + (f"  ({'; '.join(scans)})" if scans else ""))
+            if verbose:
+                print(f"           {_plan_text(dialect, rows)}")
+            if scans:
+                failed.append(query.name)
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a hot query is planned as a full table scan")
+    parser.add_argument("--database-url", help="Database to check (default: a temporary SQLite database)")
+    parser.add_argument("--migrate", action="store_true", help="Upgrade --database-url to the latest migration first")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'plans.db')}"
+        engine = create_engine(url)
+        try:
+            if args.migrate or not args.database_url:
+                upgrade_database(engine)
+            failed = check_query_plans(engine, args.verbose)
+        finally:
+            engine.dispose()
+
+    if failed:
+        print(f"{len(failed)} of {len(HOT_QUERIES)} hot queries use a full scan: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"All {len(HOT_QUERIES)} hot queries use an index")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import argparse
+from app.db.session import SessionLocal
+from app.services.dedup import backfill_signatures
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute MinHash signatures for stored resumes and flag near-duplicates")
+    parser.add_argument("--batch-size", type=int, default=500, help="Resumes per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = backfill_signatures(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Signed {count} resumes")
+
+if __name__ == "__main__":
+    main()
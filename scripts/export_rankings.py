@@ -0,0 +1,276 @@
+"""Export full ranked candidate lists for many jobs, one file per job.
+
+Resumes are streamed from the database with a server-side cursor and scored
+block by block against a group of jobs at once (each resume is embedded once
+per group). Scored rows are spilled to sorted runs on disk and merged into
+the output, so memory stays flat however large the resume pool is. Job groups
+run in parallel worker processes, each with its own share of the CPU cores.
+
+    PYTHONPATH=. python scripts/export_rankings.py --all-active --format parquet --output exports/
+    PYTHONPATH=. python scripts/export_rankings.py --job 12 --job 15 --format csv --processes 2 --min-score 0.4
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Tuple
+
+COLUMNS = (
+    "job_id", "rank", "candidate_id", "resume_id", "name", "match_score",
+    "skill_match", "experience_match", "education_match", "semantic_match",
+)
+FORMATS = {"csv": "csv", "jsonl": "jsonl", "parquet": "parquet"}
+
+# Spilled rows: (match_score, candidate_id, resume_id, name, skill, experience, education, semantic)
+Row = Tuple[float, int, int, str, float, float, float, float]
+
+class CsvWriter:
+    def __init__(self, path: str):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+
+    def write(self, record: Tuple) -> None:
+        self.writer.writerow(record)
+
+    def close(self) -> None:
+        self.file.close()
+
+class JsonLinesWriter:
+    def __init__(self, path: str):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, record: Tuple) -> None:
+        self.file.write(json.dumps(dict(zip(COLUMNS, record))) + "\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+class ParquetWriter:
+    """Buffers rows into record batches of `batch_rows` (one row group each)."""
+
+    def __init__(self, path: str, batch_rows: int = 65536):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet export needs pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("job_id", pa.int64()), ("rank", pa.int64()), ("candidate_id", pa.int64()),
+            ("resume_id", pa.int64()), ("name", pa.string()), ("match_score", pa.float64()),
+            ("skill_match", pa.float64()), ("experience_match", pa.float64()),
+            ("education_match", pa.float64()), ("semantic_match", pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch_rows = batch_rows
+        self.rows: List[Tuple] = []
+
+    def write(self, record: Tuple) -> None:
+        self.rows.append(record)
+        if len(self.rows) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.rows:
+            columns = list(zip(*self.rows))
+            self.writer.write_batch(self.pa.record_batch(
+                [self.pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+                schema=self.schema
+            ))
+            self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonLinesWriter, "parquet": ParquetWriter}
+
+class SortedRuns:
+    """External merge sort of one job's rows by descending score.
+
+    Rows are buffered and written out as sorted runs when `spill` is called;
+    `merged` streams them back in order with a k-way merge.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.buffer: List[Row] = []
+        self.runs: List[str] = []
+
+    def add(self, row: Row) -> None:
+        self.buffer.append(row)
+
+    def spill(self) -> None:
+        if not self.buffer:
+            return
+        self.buffer.sort(key=lambda row: (-row[0], row[2]))
+        fd, path = tempfile.mkstemp(suffix=".run", dir=self.directory)
+        with os.fdopen(fd, "wb") as file:
+            pickler = pickle.Pickler(file, protocol=pickle.HIGHEST_PROTOCOL)
+            for row in self.buffer:
+                pickler.dump(row)
+        self.runs.append(path)
+        self.buffer = []
+
+    @staticmethod
+    def _read(path: str) -> Iterator[Row]:
+        with open(path, "rb") as file:
+            unpickler = pickle.Unpickler(file)
+            while True:
+                try:
+                    yield unpickler.load()
+                except EOFError:
+                    return
+
+    def merged(self) -> Iterator[Row]:
+        self.spill()
+        try:
+            yield from heapq.merge(*(self._read(path) for path in self.runs), key=lambda row: (-row[0], row[2]))
+        finally:
+            for path in self.runs:
+                os.remove(path)
+
+def export_group(
+    job_ids: List[int],
+    output: str,
+    fmt: str,
+    block_size: int,
+    run_rows: int,
+    min_score: float,
+    processes: int
+) -> Dict[int, int]:
+    """Rank the whole resume pool against `job_ids` and write one file per job. Runs in a worker process."""
+    # Thread counts must be set before torch is imported by the matcher
+    from app.core.runtime import configure_threads, thread_plan
+    configure_threads(thread_plan(workers=processes))
+
+    from sqlalchemy.orm import selectinload, undefer
+    from app.db.session import SessionLocal
+    from app.models.models import Candidate, Job, Resume
+    from app.services.job_matcher import JobMatcher
+    from app.services.match_data import job_match_data, resume_match_data
+
+    matcher = JobMatcher()
+    db = SessionLocal()
+    try:
+        jobs = db.query(Job).options(selectinload(Job.skills)).filter(Job.id.in_(job_ids)).all()
+        jobs_data = [job_match_data(job) for job in sorted(jobs, key=lambda job: job.id)]
+        if not jobs_data:
+            return {}
+        matcher.skill_index.sync(db)
+
+        rows = (
+            db.query(Resume, Candidate.name)
+            .outerjoin(Candidate, Resume.candidate_id == Candidate.id)
+            .options(undefer(Resume.raw_text))
+            .order_by(Resume.id)
+            .yield_per(block_size)
+        )
+        candidates = (dict(resume_match_data(resume), name=name) for resume, name in rows)
+
+        with tempfile.TemporaryDirectory(prefix="rankings-", dir=output) as spill_directory:
+            runs = [SortedRuns(spill_directory) for _ in jobs_data]
+            buffered = 0
+            for block, totals, components in matcher.iter_score_blocks(jobs_data, candidates, block_size):
+                for row, job_runs in enumerate(runs):
+                    for column, candidate in enumerate(block):
+                        score = float(totals[row, column])
+                        if score < min_score:
+                            continue
+                        job_runs.add((
+                            score, candidate["id"], candidate["resume_id"], candidate.get("name"),
+                            *(float(value) for value in components[:, row, column])
+                        ))
+                        buffered += 1
+                if buffered >= run_rows:
+                    for job_runs in runs:
+                        job_runs.spill()
+                    buffered = 0
+
+            written = {}
+            for job, job_runs in zip(jobs_data, runs):
+                path = os.path.join(output, f"job_{job['id']}.{FORMATS[fmt]}")
+                partial = path + ".partial"
+                writer = WRITERS[fmt](partial)
+                count = 0
+                try:
+                    for count, (score, candidate_id, resume_id, name, *components) in enumerate(job_runs.merged(), start=1):
+                        writer.write((job["id"], count, candidate_id, resume_id, name, score, *components))
+                finally:
+                    writer.close()
+                os.replace(partial, path)
+                written[job["id"]] = count
+            return written
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--job", type=int, action="append", dest="job_ids", help="job id (repeatable)")
+    selection.add_argument("--all-active", action="store_true", help="every active job")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--output", default="exports", help="directory for job_<id> files")
+    parser.add_argument("--processes", type=int, default=1, help="parallel worker processes")
+    parser.add_argument("--jobs-per-group", type=int, default=32,
+                        help="jobs scored together in one pass over the resumes")
+    parser.add_argument("--block-size", type=int, default=None, help="resumes fetched and scored per block")
+    parser.add_argument("--run-rows", type=int, default=200000,
+                        help="scored rows buffered per worker before spilling a sorted run")
+    parser.add_argument("--min-score", type=float, default=float("-inf"), help="drop candidates below this score")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    block_size = args.block_size or settings.MATCH_BLOCK_SIZE
+    job_ids = args.job_ids
+    if args.all_active:
+        from app.db.session import SessionLocal
+        from app.models.models import Job
+        db = SessionLocal()
+        try:
+            job_ids = [job_id for job_id, in db.query(Job.id).filter(Job.is_active.is_(True)).order_by(Job.id)]
+        finally:
+            db.close()
+    job_ids = list(dict.fromkeys(job_ids))
+    if not job_ids:
+        print("No jobs to export")
+        return
+
+    os.makedirs(args.output, exist_ok=True)
+    groups = [job_ids[start:start + args.jobs_per_group] for start in range(0, len(job_ids), args.jobs_per_group)]
+    processes = max(1, min(args.processes, len(groups)))
+    print(f"Exporting {len(job_ids)} jobs in {len(groups)} groups with {processes} processes")
+
+    started = time.perf_counter()
+    exported = {}
+    # Spawned workers do not inherit the parent's database connections
+    with ProcessPoolExecutor(max_workers=processes, mp_context=get_context("spawn")) as pool:
+        futures = [
+            pool.submit(
+                export_group, group, args.output, args.format, block_size,
+                max(1, args.run_rows // processes), args.min_score, processes
+            )
+            for group in groups
+        ]
+        for future in as_completed(futures):
+            for job_id, count in future.result().items():
+                exported[job_id] = count
+                print(f"job {job_id}: {count} candidates")
+
+    missing = [job_id for job_id in job_ids if job_id not in exported]
+    if missing:
+        print(f"Jobs not found: {missing}", file=sys.stderr)
+    print(f"Wrote {sum(exported.values())} rows in {time.perf_counter() - started:.1f}s")
+    if missing:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,16 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
-from app.models.models import Base, User, Skill
+from app.models.models import User, Skill
 from app.db.session import get_password_hash
+from app.db.migrate import upgrade_database
 
 def init_db():
     # Create database engine
     engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Create or migrate the schema
+    upgrade_database(engine)
     
     # Create session
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
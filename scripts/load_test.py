@@ -0,0 +1,325 @@
+"""Drive the API with a weighted mix of scenarios and report latency per route.
+
+Virtual users loop over scenarios picked at random by weight for the given
+duration, against the app in-process over ASGI, against a running server, or
+against uvicorn started here with several workers. Each run prints
+throughput, error rate and p50/p95/p99 latency per route and can write a JSON
+report; pass a previous report with --compare to see the change.
+
+All virtual users share one login, so per-user rate limits (RATE_LIMITS)
+would cap the whole run at one user's budget and mostly measure 429s.
+Limiting is therefore switched off in-process and for the uvicorn started
+here; pass --rate-limits to keep it. Start a server loaded with --base-url
+with RATE_LIMIT_ENABLED=false.
+
+    PYTHONPATH=. python scripts/load_test.py --email admin@cv-ats.com --password admin123
+    PYTHONPATH=. python scripts/load_test.py --uvicorn-workers 4 --mix rank=3,list=5,analysis=2 \\
+        --email admin@cv-ats.com --password admin123 --report after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import httpx
+from app.core.config import settings
+
+API = settings.API_V1_STR
+SCENARIOS = ("login", "upload", "rank", "analysis", "list")
+DEFAULT_MIX = "login=1,upload=1,rank=2,analysis=2,list=4"
+
+class Recorder:
+    """Latencies, status codes and failures per route."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Counter = Counter()
+
+    def record(self, route: str, seconds: float, status: Optional[int]) -> None:
+        self.latencies[route].append(seconds)
+        self.statuses[route][str(status) if status else "exception"] += 1
+        if status is None or status >= 400:
+            self.errors[route] += 1
+
+class State:
+    """What the scenarios need: a token and ids discovered during setup and uploads."""
+
+    def __init__(self, args):
+        self.args = args
+        self.token: Optional[str] = None
+        self.job_ids: List[int] = []
+        self.resume_ids: List[int] = []
+        self.resume_file = self._resume_file(args.resume_file)
+
+    @staticmethod
+    def _resume_file(path: Optional[str]):
+        if path:
+            with open(path, "rb") as file:
+                return os.path.basename(path), file.read()
+        from bench_docx import synthetic_docx
+        return "load-test.docx", synthetic_docx(40, 2)[0]
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return 0.0
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+async def login(client: httpx.AsyncClient, state: State) -> httpx.Response:
+    return await client.post(f"{API}/token", data={"username": state.args.email, "password": state.args.password})
+
+async def upload(client: httpx.AsyncClient, state: State) -> httpx.Response:
+    name, content = state.resume_file
+    # Unique names so concurrent uploads do not overwrite each other's files
+    filename = f"{random.getrandbits(48):012x}-{name}"
+    params = {"candidate_id": state.args.candidate_id} if state.args.candidate_id else None
+    response = await client.post(f"{API}/upload", files={"file": (filename, content)}, params=params, headers=state.headers)
+    if response.status_code == 200:
+        state.resume_ids.append(response.json()["resume_id"])
+    return response
+
+async def rank(client: httpx.AsyncClient, state: State) -> Optional[httpx.Response]:
+    if not state.job_ids:
+        return None
+    return await client.get(f"{API}/{random.choice(state.job_ids)}/candidates", headers=state.headers)
+
+async def analysis(client: httpx.AsyncClient, state: State) -> Optional[httpx.Response]:
+    if not state.resume_ids:
+        return None
+    return await client.get(f"{API}/{random.choice(state.resume_ids)}/analysis", headers=state.headers)
+
+async def list_jobs(client: httpx.AsyncClient, state: State) -> httpx.Response:
+    return await client.get(f"{API}/", params={"limit": 20}, headers=state.headers)
+
+SCENARIO_FUNCTIONS = {"login": login, "upload": upload, "rank": rank, "analysis": analysis, "list": list_jobs}
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIO_FUNCTIONS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+async def setup(client: httpx.AsyncClient, state: State) -> None:
+    """Log in once and collect job and resume ids for the read scenarios."""
+    response = await login(client, state)
+    if response.status_code != 200:
+        raise SystemExit(f"Login failed with {response.status_code}: {response.text[:200]}")
+    state.token = response.json()["access_token"]
+
+    response = await client.get(f"{API}/", params={"limit": state.args.max_ids}, headers=state.headers)
+    if response.status_code == 200:
+        state.job_ids = [job["id"] for job in response.json() if "id" in job]
+    response = await client.get(f"{API}/resumes/search", params={"q": state.args.resume_query, "limit": state.args.max_ids}, headers=state.headers)
+    if response.status_code == 200:
+        state.resume_ids = [hit["resume_id"] for hit in response.json()]
+    print(f"setup: {len(state.job_ids)} jobs, {len(state.resume_ids)} resumes")
+
+def usable_mix(weights: Dict[str, float], state: State) -> Dict[str, float]:
+    """Drop scenarios that can never run against this database."""
+    usable = dict(weights)
+    if not state.job_ids and usable.pop("rank", None):
+        print("no jobs found: skipping the rank scenario")
+    if not state.resume_ids and "upload" not in usable and usable.pop("analysis", None):
+        print("no resumes found and no uploads in the mix: skipping the analysis scenario")
+    if not usable:
+        raise SystemExit("No scenario in the mix can run")
+    return usable
+
+async def virtual_user(client: httpx.AsyncClient, state: State, weights: Dict[str, float], deadline: float, recorder: Recorder):
+    names, scenario_weights = list(weights), list(weights.values())
+    while time.monotonic() < deadline:
+        name = random.choices(names, scenario_weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await SCENARIO_FUNCTIONS[name](client, state)
+        except httpx.HTTPError:
+            recorder.record(name, time.perf_counter() - start, None)
+            continue
+        if response is None:
+            # Nothing to request yet (no resume uploaded); let other users run
+            await asyncio.sleep(0.01)
+            continue
+        recorder.record(name, time.perf_counter() - start, response.status_code)
+        if state.args.think_time:
+            await asyncio.sleep(random.expovariate(1 / state.args.think_time))
+
+def build_report(args, weights: Dict[str, float], recorder: Recorder, started_at: datetime, seconds: float) -> Dict:
+    routes = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[route],
+            "error_rate": recorder.errors[route] / len(latencies),
+            "throughput": len(latencies) / seconds,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "status_codes": dict(recorder.statuses[route]),
+        }
+    total = sum(route["requests"] for route in routes.values())
+    errors = sum(route["errors"] for route in routes.values())
+    return {
+        "started_at": started_at.isoformat(),
+        "target": args.base_url or (f"uvicorn x{args.uvicorn_workers}" if args.uvicorn_workers else "asgi"),
+        "config": {
+            "mix": weights,
+            "users": args.users,
+            "duration_seconds": args.duration,
+            "think_time_seconds": args.think_time,
+            "rate_limits": args.rate_limits if not args.base_url else "server",
+        },
+        "environment": {"python": platform.python_version(), "cpus": os.cpu_count()},
+        "elapsed_seconds": seconds,
+        "total": {
+            "requests": total,
+            "errors": errors,
+            "error_rate": errors / total if total else 0.0,
+            "throughput": total / seconds,
+        },
+        "routes": routes,
+    }
+
+def print_report(report: Dict, previous: Optional[Dict] = None) -> None:
+    print(f"{'route':<10} {'req':>7} {'req/s':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, stats in report["routes"].items():
+        line = (
+            f"{route:<10} {stats['requests']:>7} {stats['throughput']:>8.1f} {stats['error_rate'] * 100:>6.1f} "
+            f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+        )
+        before = (previous or {}).get("routes", {}).get(route)
+        if before:
+            line += (
+                f"   req/s {_change(before['throughput'], stats['throughput'])}"
+                f"  p95 {_change(before['p95_ms'], stats['p95_ms'])}"
+            )
+        print(line)
+    total = report["total"]
+    print(f"{'total':<10} {total['requests']:>7} {total['throughput']:>8.1f} {total['error_rate'] * 100:>6.1f}")
+
+def _change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_uvicorn(app: str, workers: int, rate_limits: bool) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(os.environ, RATE_LIMIT_ENABLED="true" if rate_limits else "false")
+    process = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", app,
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"
+    ], env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("uvicorn did not become ready within 120s")
+
+async def run(args, base_url: Optional[str]) -> Dict:
+    weights = parse_mix(args.mix)
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=httpx.Limits(max_connections=args.users))
+    else:
+        settings.RATE_LIMIT_ENABLED = args.rate_limits
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=args.timeout)
+
+    recorder = Recorder()
+    async with client:
+        state = State(args)
+        await setup(client, state)
+        weights = usable_mix(weights, state)
+        started_at = datetime.now(timezone.utc)
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            virtual_user(client, state, weights, deadline, recorder) for _ in range(args.users)
+        ))
+        seconds = time.monotonic() - start
+    return build_report(args, weights, recorder, started_at, seconds)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", help="Load an already running server instead of the app in-process")
+    target.add_argument("--uvicorn-workers", type=int, help="Start uvicorn with this many workers and load it")
+    parser.add_argument("--app", default="app.main:app", help="Application started with --uvicorn-workers")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout")
+    parser.add_argument("--resume-file", help="Document to upload (default: a generated DOCX)")
+    parser.add_argument("--candidate-id", type=int, help="Candidate the uploads are attached to")
+    parser.add_argument("--resume-query", default="experience", help="Search used to find resumes for analysis")
+    parser.add_argument("--max-ids", type=int, default=100, help="Jobs and resumes collected during setup")
+    parser.add_argument(
+        "--rate-limits",
+        action="store_true",
+        help="Keep per-user rate limiting on in-process and with --uvicorn-workers"
+    )
+    parser.add_argument("--report", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    process = None
+    base_url = args.base_url
+    if args.uvicorn_workers:
+        process, base_url = start_uvicorn(args.app, args.uvicorn_workers, args.rate_limits)
+    try:
+        report = asyncio.run(run(args, base_url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+    print_report(report, previous)
+    limited = sum(route["status_codes"].get("429", 0) for route in report["routes"].values())
+    if limited:
+        print(
+            f"{limited} requests were rate limited (429): all virtual users share one login. "
+            "Run the server with RATE_LIMIT_ENABLED=false to measure capacity."
+        )
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"report written to {args.report}")
+
+if __name__ == "__main__":
+    main()
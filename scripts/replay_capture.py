@@ -0,0 +1,369 @@
+"""Replay a capture archive (app.core.capture) and compare timings between code versions.
+
+`run` replays every captured request and writes a report with its time, its
+outcome and a digest of its result:
+
+  offline (default)  uploads go through ResumeParser, rankings through JobMatcher
+                     against the resume pool of the configured database
+  --base-url/--asgi  the requests are sent to a running server or to the app
+                     in-process; uploads are stored, so point it at a scratch
+                     database and disable rate limiting there
+
+--speed 1 keeps the captured pacing, 2 replays twice as fast, 0 (default) runs
+the requests back to back. `compare` matches two reports request by request,
+so run the same archive on both code versions against the same data:
+
+    PYTHONPATH=. python scripts/replay_capture.py run data/capture --report before.json
+    git checkout feature && PYTHONPATH=. python scripts/replay_capture.py run data/capture --report after.json
+    PYTHONPATH=. python scripts/replay_capture.py compare before.json after.json
+    PYTHONPATH=. python scripts/replay_capture.py run data/capture --base-url http://localhost:8000 \\
+        --email admin@cv-ats.com --password admin123 --speed 1 --report server.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
+from app.core.capture import CaptureArchive
+from app.core.config import settings
+from load_test import percentile
+
+API = settings.API_V1_STR
+ROUTES = ("upload", "rank", "rank_batch")
+
+def digest(result: Any) -> str:
+    """Stable fingerprint of a result; floats are rounded so numeric noise does not count as a change."""
+    def normalize(value):
+        if isinstance(value, float):
+            return round(value, 6)
+        if isinstance(value, dict):
+            return {str(key): normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+    if isinstance(result, bytes):
+        return hashlib.sha256(result).hexdigest()[:16]
+    encoded = json.dumps(normalize(result), sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+class OfflineTarget:
+    """Runs captured requests directly through ResumeParser and JobMatcher."""
+
+    def __init__(self):
+        self._parser = None
+        self._matcher = None
+        self._pool: Optional[List[Dict]] = None
+
+    def prepare(self, routes: set) -> None:
+        """Load models and the resume pool up front so they are not part of the timings."""
+        if "upload" in routes:
+            from app.services.resume_parser import ResumeParser
+            self._parser = ResumeParser()
+        if routes & {"rank", "rank_batch"}:
+            from sqlalchemy.orm import undefer
+            from app.db.session import SessionLocal
+            from app.models.models import Resume
+            from app.services.job_matcher import JobMatcher
+            from app.services.match_data import resume_match_data
+            self._matcher = JobMatcher()
+            db = SessionLocal()
+            try:
+                self._matcher.skill_index.sync(db)
+                resumes = db.query(Resume).options(undefer(Resume.raw_text)).order_by(Resume.id)
+                self._pool = [resume_match_data(resume) for resume in resumes]
+            finally:
+                db.close()
+            print(f"offline: ranking against {len(self._pool)} resumes")
+
+    def execute(self, entry: Dict, body: Optional[bytes]) -> Tuple[str, Any]:
+        params = entry["params"]
+        if entry["route"] == "upload":
+            suffix = os.path.splitext(entry.get("filename") or "")[1].lower() or ".pdf"
+            with tempfile.NamedTemporaryFile(suffix=suffix) as file:
+                file.write(body or b"")
+                file.flush()
+                return "ok", self._parser.parse_resume(file.name)
+        if entry["route"] == "rank":
+            return "ok", self._matcher.rank_candidates(
+                self._pool, params["job"], collapse_duplicates=params.get("collapse_duplicates", False)
+            )
+        if entry["route"] == "rank_batch":
+            return "ok", self._matcher.batch_rank(params["jobs"], self._pool, top_k=params["top_k"])
+        raise ValueError(f"Unknown route {entry['route']!r}")
+
+class HTTPTarget:
+    """Sends captured requests to the API."""
+
+    def __init__(self, client: httpx.AsyncClient, headers: Dict[str, str]):
+        self.client = client
+        self.headers = headers
+
+    async def execute(self, entry: Dict, body: Optional[bytes]) -> Tuple[str, Any]:
+        params = entry["params"]
+        if entry["route"] == "upload":
+            query = {"candidate_id": params["candidate_id"]} if params.get("candidate_id") else None
+            response = await self.client.post(
+                f"{API}/upload", files={"file": (entry.get("filename") or "resume.pdf", body or b"")},
+                params=query, headers=self.headers
+            )
+        elif entry["route"] == "rank":
+            query = {"format": params.get("format") or "json", "collapse_duplicates": params.get("collapse_duplicates", False)}
+            response = await self.client.get(f"{API}/{params['job']['id']}/candidates", params=query, headers=self.headers)
+        elif entry["route"] == "rank_batch":
+            response = await self.client.post(
+                f"{API}/candidates/batch",
+                json={"job_ids": [job["id"] for job in params["jobs"]], "top_k": params["top_k"]},
+                headers=self.headers
+            )
+        else:
+            raise ValueError(f"Unknown route {entry['route']!r}")
+        # Uploads return new ids on every run; only their status is comparable
+        result = response.status_code if entry["route"] == "upload" else response.content
+        return str(response.status_code), result
+
+def select_entries(archive: CaptureArchive, routes: Optional[List[str]], limit: Optional[int]) -> List[Dict]:
+    entries = [entry for entry in archive.entries() if not routes or entry["route"] in routes]
+    return entries[:limit] if limit else entries
+
+def schedule(entries: List[Dict], speed: float) -> List[float]:
+    """Offset in seconds from the start of the replay at which each entry is sent."""
+    if not entries or speed <= 0:
+        return [0.0] * len(entries)
+    first = entries[0]["timestamp"]
+    return [(entry["timestamp"] - first) / speed for entry in entries]
+
+def timed(execute: Callable, entry: Dict, body: Optional[bytes], repeat: int) -> Dict:
+    """Run one entry `repeat` times and keep the fastest run (the least disturbed by noise)."""
+    times = []
+    status, result = "error", None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            status, result = execute(entry, body)
+        except Exception as exc:
+            status, result = "error", f"{type(exc).__name__}: {exc}"
+        times.append(time.perf_counter() - start)
+    return _result(entry, times, status, result)
+
+def _result(entry: Dict, times: List[float], status: str, result: Any) -> Dict:
+    outcome = {"route": entry["route"], "seconds": min(times), "status": status, "digest": digest(result)}
+    if status == "error":
+        outcome["error"] = result
+    return outcome
+
+def run_offline(archive: CaptureArchive, entries: List[Dict], speed: float, repeat: int) -> Dict[str, Dict]:
+    target = OfflineTarget()
+    target.prepare({entry["route"] for entry in entries})
+    offsets = schedule(entries, speed)
+    results = {}
+    start = time.monotonic()
+    for entry, offset in zip(entries, offsets):
+        time.sleep(max(0.0, offset - (time.monotonic() - start)))
+        results[entry["id"]] = timed(target.execute, entry, archive.body(entry), repeat)
+    return results
+
+async def run_http(args, archive: CaptureArchive, entries: List[Dict]) -> Dict[str, Dict]:
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=args.timeout)
+
+    async with client:
+        headers = {}
+        if args.email:
+            response = await client.post(f"{API}/token", data={"username": args.email, "password": args.password})
+            if response.status_code != 200:
+                raise SystemExit(f"Login failed with {response.status_code}: {response.text[:200]}")
+            headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        target = HTTPTarget(client, headers)
+
+        async def send(entry: Dict) -> Dict:
+            body = archive.body(entry)
+            times = []
+            status, result = "error", None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                try:
+                    status, result = await target.execute(entry, body)
+                except httpx.HTTPError as exc:
+                    status, result = "error", f"{type(exc).__name__}: {exc}"
+                times.append(time.perf_counter() - started)
+            return _result(entry, times, status, result)
+
+        results = {}
+        if args.speed <= 0:
+            # Back to back, one request at a time
+            for entry in entries:
+                results[entry["id"]] = await send(entry)
+            return results
+
+        # Open loop: requests go out on the captured schedule whether or not earlier ones finished
+        start = time.monotonic()
+        async def send_at(entry: Dict, offset: float) -> None:
+            await asyncio.sleep(max(0.0, offset - (time.monotonic() - start)))
+            results[entry["id"]] = await send(entry)
+        await asyncio.gather(*(send_at(entry, offset) for entry, offset in zip(entries, schedule(entries, args.speed))))
+        return results
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def summarize(requests: Dict[str, Dict]) -> Dict[str, Dict]:
+    by_route: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    for result in requests.values():
+        by_route[result["route"]].append(result["seconds"])
+        if result["status"] not in ("ok", "200"):
+            errors[result["route"]] += 1
+    routes = {}
+    for route, times in sorted(by_route.items()):
+        times.sort()
+        routes[route] = {
+            "requests": len(times),
+            "errors": errors[route],
+            "total_s": sum(times),
+            "p50_ms": percentile(times, 0.50) * 1000,
+            "p95_ms": percentile(times, 0.95) * 1000,
+            "max_ms": times[-1] * 1000,
+        }
+    return routes
+
+def print_summary(routes: Dict[str, Dict]) -> None:
+    print(f"{'route':<11} {'req':>6} {'err':>5} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    for route, stats in routes.items():
+        print(
+            f"{route:<11} {stats['requests']:>6} {stats['errors']:>5} "
+            f"{stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['max_ms']:>10.1f}"
+        )
+
+def _change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+
+def compare(before: Dict, after: Dict, top: int) -> None:
+    """Per-route and per-request timing differences of two reports of the same archive."""
+    print(f"before: {before.get('revision') or '?'} ({before['target']})   after: {after.get('revision') or '?'} ({after['target']})")
+    print(f"{'route':<11} {'req':>6} {'p50 before':>11} {'p50 after':>11} {'change':>7} {'p95 before':>11} {'p95 after':>11} {'change':>7}")
+    for route, stats in after["routes"].items():
+        old = before["routes"].get(route)
+        if not old:
+            continue
+        print(
+            f"{route:<11} {stats['requests']:>6} {old['p50_ms']:>11.1f} {stats['p50_ms']:>11.1f} "
+            f"{_change(old['p50_ms'], stats['p50_ms']):>7} {old['p95_ms']:>11.1f} {stats['p95_ms']:>11.1f} "
+            f"{_change(old['p95_ms'], stats['p95_ms']):>7}"
+        )
+
+    common = [request_id for request_id in after["requests"] if request_id in before["requests"]]
+    missing = len(before["requests"]) - len(common)
+    if missing:
+        print(f"{missing} requests of the first report are missing from the second")
+    changed_output = [
+        request_id for request_id in common
+        if before["requests"][request_id]["digest"] != after["requests"][request_id]["digest"]
+    ]
+    print(f"{len(changed_output)} of {len(common)} requests returned a different result")
+
+    deltas = sorted(
+        common,
+        key=lambda request_id: after["requests"][request_id]["seconds"] - before["requests"][request_id]["seconds"],
+        reverse=True
+    )
+    if deltas and top:
+        print("\nlargest slowdowns:")
+        print(f"{'request':<34} {'route':<11} {'before ms':>10} {'after ms':>10} {'change':>7}")
+        for request_id in deltas[:top]:
+            old, new = before["requests"][request_id], after["requests"][request_id]
+            print(
+                f"{request_id:<34} {new['route']:<11} {old['seconds'] * 1000:>10.1f} "
+                f"{new['seconds'] * 1000:>10.1f} {_change(old['seconds'], new['seconds']):>7}"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Replay an archive and write a report")
+    run_parser.add_argument("archive", nargs="?", default=settings.CAPTURE_PATH)
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", help="Replay against a running server")
+    target.add_argument("--asgi", action="store_true", help="Replay against the app in-process")
+    run_parser.add_argument("--email", help="Log in as this user (needed for uploads over HTTP)")
+    run_parser.add_argument("--password")
+    run_parser.add_argument("--route", action="append", choices=ROUTES, help="Only replay these routes")
+    run_parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    run_parser.add_argument("--speed", type=float, default=0.0, help="Multiple of the captured pace; 0 = back to back")
+    run_parser.add_argument("--repeat", type=int, default=1, help="Runs per request; the fastest is reported")
+    run_parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout over HTTP")
+    run_parser.add_argument("--report", help="Write the JSON report here")
+    run_parser.add_argument("--compare", help="Previous report to compare against")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two reports of the same archive")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--top", type=int, default=10, help="Slowest-changing requests to list")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.before) as file:
+            before = json.load(file)
+        with open(args.after) as file:
+            after = json.load(file)
+        compare(before, after, args.top)
+        return
+
+    if os.environ.get("PYTHONHASHSEED") is None:
+        # Set iteration order (skills, vocabularies) depends on string hashing; fix it
+        # so the same code gives the same result digests from one run to the next
+        os.execve(sys.executable, [sys.executable] + sys.argv, {**os.environ, "PYTHONHASHSEED": "0"})
+
+    archive = CaptureArchive(args.archive)
+    entries = select_entries(archive, args.route, args.limit)
+    if not entries:
+        raise SystemExit(f"No captured requests in {args.archive}")
+    print(f"replaying {len(entries)} requests from {args.archive}")
+
+    started_at = datetime.now(timezone.utc)
+    if args.base_url or args.asgi:
+        requests = asyncio.run(run_http(args, archive, entries))
+        target_name = args.base_url or "asgi"
+    else:
+        requests = run_offline(archive, entries, args.speed, args.repeat)
+        target_name = "offline"
+
+    report = {
+        "started_at": started_at.isoformat(),
+        "archive": os.path.abspath(args.archive),
+        "target": target_name,
+        "revision": git_revision(),
+        "config": {"speed": args.speed, "repeat": args.repeat, "routes": args.route, "limit": args.limit},
+        "environment": {"python": platform.python_version(), "cpus": os.cpu_count()},
+        "routes": summarize(requests),
+        "requests": requests,
+    }
+    print_summary(report["routes"])
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"report written to {args.report}")
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), report, 10)
+
+if __name__ == "__main__":
+    main()
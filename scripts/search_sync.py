@@ -0,0 +1,44 @@
+import argparse
+import logging
+import signal
+from app.db.session import SessionLocal
+from app.services.search_sync import ENTITY_MODELS, ElasticsearchBackend, OutboxWorker
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync resumes, jobs and applications to Elasticsearch")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    worker_parser = subparsers.add_parser("worker", help="Push outbox changes continuously")
+    worker_parser.add_argument("--once", action="store_true", help="Process one batch and exit")
+
+    reindex_parser = subparsers.add_parser("reindex", help="Rebuild indexes from the database")
+    # No choices=: argparse checks the empty default of nargs="*" against them
+    reindex_parser.add_argument(
+        "entities",
+        nargs="*",
+        help=f"Entity types to reindex: {', '.join(sorted(ENTITY_MODELS))} (default: all)"
+    )
+
+    args = parser.parse_args()
+    if args.command == "reindex":
+        unknown = [entity for entity in args.entities if entity not in ENTITY_MODELS]
+        if unknown:
+            reindex_parser.error(f"unknown entity types: {', '.join(unknown)}")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    worker = OutboxWorker(ElasticsearchBackend(), SessionLocal)
+
+    if args.command == "worker":
+        if args.once:
+            print(f"Processed {worker.run_once()} outbox rows")
+            return
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        signal.signal(signal.SIGINT, lambda *_: worker.stop())
+        worker.run_forever()
+    else:
+        for entity_type in args.entities or sorted(ENTITY_MODELS):
+            count = worker.reindex(entity_type)
+            print(f"Reindexed {count} {entity_type} documents")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+# Settings and engines are created at import time: point them at a scratch
+# SQLite database before any app module is imported
+_data_dir = tempfile.mkdtemp(prefix="cv-ats-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_data_dir, 'primary.db')}"
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ["SEARCH_INDEX_PATH"] = os.path.join(_data_dir, "resume_index.npz")
+os.environ["CAPTURE_ENABLED"] = "false"
+os.environ["ELASTICSEARCH_SYNC_ENABLED"] = "false"
+
+import pytest
+from app.db.base_class import Base
+from app.db.session import SessionLocal, engine
+import app.models.models  # noqa: F401  (registers the tables)
+
+@pytest.fixture
+def db():
+    """Session on a freshly created schema, dropped after the test."""
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.models.models import Application, Job, Resume, SearchOutbox, User
+
+# The router scores with the jobs router's matcher, which needs the ML stack
+for module in ("sklearn", "torch", "transformers"):
+    pytest.importorskip(module)
+from app.api.endpoints import applications, auth  # noqa: E402
+
+URL = f"{settings.API_V1_STR}/applications/bulk"
+
+@pytest.fixture
+def synced(monkeypatch):
+    """Skill index syncs; scores are job_id + resume_id / 100 so rows are easy to check."""
+    syncs = []
+    matcher = applications.job_matcher
+    monkeypatch.setattr(matcher.skill_index, "sync", lambda db: syncs.append(db))
+    monkeypatch.setattr(matcher, "score_matrix", lambda jobs, candidates: np.array([
+        [job["id"] + candidate["resume_id"] / 100 for candidate in candidates] for job in jobs
+    ]))
+    return syncs
+
+@pytest.fixture
+def client(db, synced):
+    app = FastAPI()
+    app.include_router(applications.router, prefix=f"{settings.API_V1_STR}/applications")
+    app.dependency_overrides[auth.get_current_user] = lambda: User(id=1, email="recruiter@example.com")
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def seeded(db):
+    db.add_all([Job(id=1, title="Backend"), Job(id=2, title="Data")])
+    db.add_all([Resume(id=1, candidate_id=None), Resume(id=2, candidate_id=None)])
+    db.commit()
+
+def _pairs(*pairs):
+    return {"applications": [{"job_id": job_id, "resume_id": resume_id} for job_id, resume_id in pairs]}
+
+def test_creates_each_pair_once(client, db, seeded, synced):
+    response = client.post(URL, json=_pairs((1, 1), (1, 2), (1, 1), (2, 1)))
+    assert response.status_code == 200
+    body = response.json()
+    assert [(row["job_id"], row["resume_id"], row["match_score"]) for row in body["created"]] == [
+        (1, 1, 1.01), (1, 2, 1.02), (2, 1, 2.01)
+    ]
+    assert body["skipped"] == []
+    assert synced  # scored with the skills the ranking endpoints use
+    assert db.query(Application).count() == 3
+    assert db.query(SearchOutbox).filter(SearchOutbox.entity_type == "application").count() == 3
+
+def test_existing_pairs_are_skipped(client, db, seeded):
+    db.add(Application(job_id=1, resume_id=1, status="shortlisted", match_score=0.5))
+    db.commit()
+
+    body = client.post(URL, json=_pairs((1, 1), (2, 2))).json()
+    assert [(row["job_id"], row["resume_id"]) for row in body["created"]] == [(2, 2)]
+    assert body["skipped"] == [{"job_id": 1, "resume_id": 1}]
+    existing = db.query(Application).filter(Application.job_id == 1).one()
+    assert (existing.status, existing.match_score) == ("shortlisted", 0.5)
+
+def test_unknown_ids_fail_the_whole_request(client, db, seeded):
+    response = client.post(URL, json=_pairs((1, 1), (7, 1), (1, 9)))
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Jobs not found: [7]; Resumes not found: [9]"
+    assert db.query(Application).count() == 0
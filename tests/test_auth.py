@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app.api.endpoints import auth
+from app.core.config import settings
+from app.models.models import User
+
+@pytest.fixture
+def client(db):
+    auth.user_cache.clear()
+    app = FastAPI()
+    app.include_router(auth.router, prefix=settings.API_V1_STR)
+    with TestClient(app) as client:
+        yield client
+    auth.user_cache.clear()
+
+def _register(client, email="user@example.com", password="first-password"):
+    response = client.post(f"{settings.API_V1_STR}/register", params={"email": email, "password": password})
+    assert response.status_code == 200
+    response = client.post(f"{settings.API_V1_STR}/token", data={"username": email, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+def test_hashing_and_principal_lookups_run_off_the_event_loop(client, monkeypatch):
+    calls = []
+    hash_password, cached_user = auth.get_password_hash, auth._cached_user
+
+    def recording_hash(password):
+        calls.append(("hash", _on_event_loop()))
+        return hash_password(password)
+
+    def recording_lookup(db, email):
+        calls.append(("lookup", _on_event_loop()))
+        return cached_user(db, email)
+
+    monkeypatch.setattr(auth, "get_password_hash", recording_hash)
+    monkeypatch.setattr(auth, "_cached_user", recording_lookup)
+    headers = _register(client)
+    auth.user_cache.clear()
+    assert client.get(f"{settings.API_V1_STR}/me", headers=headers).status_code == 200
+    assert ("hash", False) in calls and ("lookup", False) in calls
+    assert all(not on_loop for _, on_loop in calls)
+
+def test_cached_principal_has_no_password_hash(client):
+    headers = _register(client)
+    assert client.get(f"{settings.API_V1_STR}/me", headers=headers).status_code == 200
+    snapshot = auth.user_cache.get("user@example.com")
+    assert snapshot["email"] == "user@example.com"
+    assert "hashed_password" not in snapshot
+
+def test_change_password_checks_the_stored_hash(client, db):
+    headers = _register(client)
+    # Cache the principal, then change the password the way another worker would
+    client.get(f"{settings.API_V1_STR}/me", headers=headers)
+    db.execute(update(User).values(hashed_password=auth.get_password_hash("changed-elsewhere")))
+    db.commit()
+
+    url = f"{settings.API_V1_STR}/me/password"
+    response = client.put(url, params={"current_password": "first-password", "new_password": "x"}, headers=headers)
+    assert response.status_code == 400
+    response = client.put(url, params={"current_password": "changed-elsewhere", "new_password": "third"}, headers=headers)
+    assert response.status_code == 200
+    response = client.post(f"{settings.API_V1_STR}/token", data={"username": "user@example.com", "password": "third"})
+    assert response.status_code == 200
@@ -0,0 +1,48 @@
+import io
+import zipfile
+import pytest
+from app.core import capture
+from app.core.config import settings
+
+def _docx(text):
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as document:
+        document.writestr("word/document.xml", f"<w:document><w:t>{text}</w:t></w:document>")
+    return output.getvalue()
+
+def _text(body):
+    return zipfile.ZipFile(io.BytesIO(body)).read("word/document.xml").decode("utf-8")
+
+@pytest.fixture
+def scrubbing(monkeypatch):
+    monkeypatch.setattr(settings, "CAPTURE_SCRUB", True)
+
+@pytest.mark.parametrize("filename, expected", [
+    ("Jane Doe - CV 2024.pdf", "resume.pdf"),
+    ("jane.doe.DOCX", "resume.DOCX"),
+    ("no extension", "resume"),
+    (None, None),
+])
+def test_filename_is_reduced_to_its_extension(scrubbing, filename, expected):
+    record = capture.scrub(capture.CaptureRecord("upload", {}, b"%PDF", filename))
+    assert record.filename == expected
+
+def test_docx_is_still_scrubbed(scrubbing):
+    body = _docx("Jane Doe, jane@example.com")
+    record = capture.scrub(capture.CaptureRecord("upload", {}, body, "Jane Doe.docx"))
+    assert record.filename == "resume.docx"
+    assert "jane@example.com" not in _text(record.body) and "[email]" in _text(record.body)
+
+def test_archive_does_not_keep_the_original_name(scrubbing, tmp_path):
+    archive = capture.CaptureArchive(str(tmp_path))
+    writer = capture.CaptureWriter(archive, max_bytes=1024 * 1024)
+    writer.submit(capture.CaptureRecord("upload", {"candidate_id": 1}, b"%PDF", "Jane Doe.pdf"))
+    writer.flush()
+    (entry, body), = list(archive)
+    assert entry["filename"] == "resume.pdf" and body == b"%PDF"
+    assert "Jane" not in "".join(path.read_text() for path in tmp_path.glob("index-*.jsonl"))
+
+def test_unscrubbed_keeps_the_name(monkeypatch):
+    monkeypatch.setattr(settings, "CAPTURE_SCRUB", False)
+    record = capture.scrub(capture.CaptureRecord("upload", {}, b"%PDF", "Jane Doe.pdf"))
+    assert record.filename == "Jane Doe.pdf"
@@ -0,0 +1,64 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+from app.db import session as db_session
+from app.db.base_class import Base
+from app.db.session import _engine_options, create_engines, get_db, get_read_db
+from app.models.models import ResourceVersion
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    primary, replica = create_engines(f"sqlite:///{tmp_path / 'primary.db'}", f"sqlite:///{tmp_path / 'replica.db'}")
+    # Each file is marked so a request can tell which one it read
+    for engine, marker in ((primary, 1), (replica, 2)):
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(ResourceVersion(name="marker", version=marker))
+            db.commit()
+    monkeypatch.setattr(db_session, "SessionLocal", sessionmaker(autoflush=False, bind=primary))
+    monkeypatch.setattr(db_session, "ReadSessionLocal", sessionmaker(autoflush=False, bind=replica))
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+@pytest.fixture
+def client(engines):
+    app = FastAPI()
+
+    def marker(db: Session):
+        return {"database": "primary" if db.get(ResourceVersion, "marker").version == 1 else "replica"}
+
+    @app.get("/item")
+    def read(db: Session = Depends(get_db)):
+        return marker(db)
+
+    @app.api_route("/item", methods=["POST", "PUT", "DELETE"])
+    def write(db: Session = Depends(get_db)):
+        return marker(db)
+
+    @app.post("/batch")
+    def read_only_post(db: Session = Depends(get_read_db)):
+        return marker(db)
+
+    return TestClient(app)
+
+def test_get_reads_from_the_replica(client):
+    assert client.get("/item").json() == {"database": "replica"}
+
+@pytest.mark.parametrize("method", ["POST", "PUT", "DELETE"])
+def test_writes_use_the_primary(client, method):
+    assert client.request(method, "/item").json() == {"database": "primary"}
+
+def test_read_only_posts_use_the_replica(client):
+    assert client.post("/batch").json() == {"database": "replica"}
+
+def test_without_replica_reads_use_the_primary(tmp_path):
+    primary, read = create_engines(f"sqlite:///{tmp_path / 'only.db'}")
+    assert read is primary
+
+def test_pool_settings_apply_to_server_databases():
+    options = _engine_options("postgresql://user:secret@db/app")
+    assert options["pool_pre_ping"] is True
+    assert {"pool_size", "max_overflow", "pool_recycle", "pool_timeout"} <= set(options)
+    assert "pool_size" not in _engine_options("sqlite:///local.db")
@@ -0,0 +1,88 @@
+import pytest
+from app.core.config import settings
+from app.models.models import Resume
+from app.services import dedup
+from app.services.dedup import (
+    DuplicateIndex, MinHashLSH, backfill_signatures, estimated_similarity, flag_duplicate, minhash_signature,
+    signature_to_bytes
+)
+
+CV = (
+    "Jane Doe, senior backend engineer with eight years of experience building payment "
+    "platforms in Python and Go. Led the migration of a monolith to services on Kubernetes, "
+    "designed the ledger schema in PostgreSQL and mentored a team of five engineers. "
+)
+OTHER_CV = (
+    "John Smith, frontend developer focused on accessible React interfaces and design systems. "
+    "Built a component library used by twelve product teams and cut bundle size by forty percent "
+    "through code splitting, image pipelines and careful dependency audits over three years. "
+)
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    index = DuplicateIndex()
+    monkeypatch.setattr(dedup, "duplicate_index", index)
+    return index
+
+def test_similar_texts_have_similar_signatures():
+    edited = CV.replace("five engineers", "six engineers")
+    assert estimated_similarity(minhash_signature(CV), minhash_signature(edited)) > settings.DEDUP_THRESHOLD
+    assert estimated_similarity(minhash_signature(CV), minhash_signature(OTHER_CV)) < 0.2
+
+@pytest.mark.parametrize("text", ["", "   ", "Curriculum vitae", "Page 1 of 2 " * 3])
+def test_texts_without_enough_words_are_not_signed(text):
+    assert minhash_signature(text) is None
+
+def test_lsh_finds_only_close_signatures():
+    lsh = MinHashLSH()
+    lsh.insert(1, minhash_signature(CV))
+    lsh.insert(2, minhash_signature(OTHER_CV))
+    matches = lsh.query(minhash_signature(CV + " Available immediately."), settings.DEDUP_THRESHOLD)
+    assert [match.resume_id for match in matches] == [1]
+    lsh.remove(1)
+    assert lsh.query(minhash_signature(CV), settings.DEDUP_THRESHOLD) == []
+
+def test_duplicate_is_linked_to_the_original_and_its_candidate(db):
+    original = Resume(candidate_id=7, raw_text=CV, minhash=signature_to_bytes(minhash_signature(CV)))
+    db.add(original)
+    db.commit()
+
+    copy = Resume(raw_text=CV)
+    assert flag_duplicate(db, copy, minhash_signature(CV)).id == original.id
+    assert (copy.duplicate_of_id, copy.candidate_id) == (original.id, 7)
+
+    # An explicitly named candidate is kept
+    agency_copy = Resume(candidate_id=9, raw_text=CV)
+    flag_duplicate(db, agency_copy, minhash_signature(CV))
+    assert (agency_copy.duplicate_of_id, agency_copy.candidate_id) == (original.id, 9)
+
+def test_backfill_skips_resumes_without_text(db):
+    db.add_all([
+        Resume(id=1, candidate_id=1, raw_text=""),
+        Resume(id=2, candidate_id=2, raw_text=""),
+        Resume(id=3, candidate_id=3, raw_text=CV),
+        Resume(id=4, candidate_id=4, raw_text=CV),
+        Resume(id=5, candidate_id=5, raw_text=OTHER_CV),
+    ])
+    db.commit()
+
+    assert backfill_signatures(db, batch_size=2) == 3
+    resumes = {resume.id: resume for resume in db.query(Resume)}
+    assert resumes[1].minhash is None and resumes[2].minhash is None
+    assert resumes[2].duplicate_of_id is None and resumes[2].candidate_id == 2
+    assert resumes[4].duplicate_of_id == 3
+    assert resumes[5].duplicate_of_id is None
+
+def test_index_reconciles_rows_committed_out_of_order(db, fresh_index, monkeypatch):
+    signature = signature_to_bytes(minhash_signature(CV))
+    db.add(Resume(id=2, minhash=signature))
+    db.commit()
+    fresh_index.sync(db)
+    db.add(Resume(id=1, minhash=signature))
+    db.commit()
+    fresh_index.sync(db)
+    assert 1 not in fresh_index.signatures
+
+    monkeypatch.setattr(settings, "INDEX_RECONCILE_SECONDS", 0)
+    fresh_index.sync(db)
+    assert set(fresh_index.signatures) == {1, 2}
@@ -0,0 +1,84 @@
+from datetime import date
+import pytest
+from app.services.experience_parser import DateRange, claimed_years, find_date_ranges, merge_ranges, total_experience_years
+from app.services.section_segmenter import segment_resume
+
+TODAY = date(2024, 6, 15)
+
+@pytest.mark.parametrize("text, years", [
+    # Year-only ranges count whole years from January
+    ("2015-2018", 3.0),
+    ("2015 – 2018", 3.0),
+    # Month ranges include the end month
+    ("Jan 2019 - Dec 2019", 1.0),
+    ("May 2012 - June 2014", 2.2),
+    ("03/2016 to 11/2017", 1.8),
+    ("September 2020 until March 2021", 0.6),
+    ("Jan. 2019 through Feb. 2019", 0.2),
+    # A year-only end after a month start runs through December
+    ("Dec 2018 – 2019", 1.1),
+    ("2019 – Dec 2019", 1.0),
+    ("Jun 2019 - 2019", 0.6),
+    # A year-only start counts from January
+    ("2018 - Mar 2019", 1.2),
+    # Open-ended ranges run through the current month
+    ("Jan 2023 - Present", 1.5),
+    ("2022 to current", 2.5),
+    ("June 2023 – now", 1.1),
+    ("since March 2020", 4.3),
+    # Future ends are capped at today
+    ("Jan 2024 - Dec 2030", 0.5),
+])
+def test_date_ranges(text, years):
+    assert total_experience_years(text, today=TODAY) == years
+
+@pytest.mark.parametrize("text", [
+    "ref 12/2015/2018",      # not a range
+    "Graduated 2018",        # a single date
+    "2025 - 2026",           # entirely in the future
+])
+def test_non_ranges_are_ignored(text):
+    assert find_date_ranges(text, TODAY) == []
+
+@pytest.mark.parametrize("text, years", [
+    ("3+ yrs of Python", 3.0),
+    ("5 years of experience, 2 years as lead", 5.0),
+    ("over 7.5 years", 7.5),
+    ("150 yrs", None),  # implausible claims are ignored
+    ("no numbers here", None),
+])
+def test_claimed_years(text, years):
+    assert claimed_years(text) == years
+
+def test_claimed_duration_is_only_a_fallback():
+    assert total_experience_years("10 years of experience", today=TODAY) == 10.0
+    assert total_experience_years("10 years of experience. 2020 - 2022", today=TODAY) == 2.0
+
+@pytest.mark.parametrize("ranges, merged", [
+    ([DateRange(0, 12), DateRange(6, 18)], [DateRange(0, 18)]),   # overlapping
+    ([DateRange(0, 12), DateRange(12, 24)], [DateRange(0, 24)]),  # touching
+    ([DateRange(24, 36), DateRange(0, 12)], [DateRange(0, 12), DateRange(24, 36)]),
+    ([DateRange(0, 36), DateRange(6, 12)], [DateRange(0, 36)]),   # contained
+])
+def test_merge_ranges(ranges, merged):
+    assert merge_ranges(ranges) == merged
+
+def test_concurrent_jobs_are_counted_once():
+    text = "Acme: Jan 2018 - Dec 2020\nSide project: Jun 2019 - Jun 2021\nFreelance: 2023 - 2024"
+    assert total_experience_years(text, today=TODAY) == 4.5
+
+def test_experience_section_excludes_study_periods():
+    text = (
+        "Jane Doe\njane@example.com\n"
+        "Education\nBSc Computer Science, 2010 - 2014\n"
+        "Work Experience\nDeveloper at Acme, Jan 2015 - Dec 2016\n"
+        "Skills\nPython\n"
+    )
+    sections = segment_resume(text)
+    assert total_experience_years(text, sections, today=TODAY) == 2.0
+    # Without sections every range counts
+    assert total_experience_years(text, today=TODAY) == 6.0
+
+def test_whole_text_is_used_without_an_experience_section():
+    text = "Summary\nDeveloper, 2016 - 2020\nSkills\nPython\n"
+    assert total_experience_years(text, segment_resume(text), today=TODAY) == 4.0
@@ -0,0 +1,53 @@
+import json
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import undefer
+from app.db.session import engine
+from app.models.models import Resume
+from app.services.match_data import resume_match_data
+
+# Stored before experience_years was part of parsed_data
+LEGACY_PARSED = json.dumps({"skills": ["python"], "education": []})
+TEXT = "Developer at Acme, Jan 2015 - Dec 2016"
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def legacy_resume(db):
+    db.add(Resume(id=1, parsed_data=LEGACY_PARSED, raw_text=TEXT))
+    db.commit()
+    db.expunge_all()
+    return db
+
+def test_deferred_text_is_not_loaded_without_include_text(legacy_resume, statements):
+    resume = legacy_resume.query(Resume).first()
+    statements.clear()
+    data = resume_match_data(resume, include_text=False)
+    assert statements == []
+    assert "raw_text" in inspect(resume).unloaded
+    assert (data["raw_text"], data["experience_years"]) == ("", 0.0)
+
+def test_undeferred_text_is_used_for_experience(legacy_resume, statements):
+    resume = legacy_resume.query(Resume).options(undefer(Resume.raw_text)).first()
+    statements.clear()
+    data = resume_match_data(resume, include_text=False)
+    assert statements == []
+    assert (data["raw_text"], data["experience_years"]) == ("", 2.0)
+
+def test_include_text_loads_the_text(legacy_resume):
+    resume = legacy_resume.query(Resume).first()
+    data = resume_match_data(resume)
+    assert (data["raw_text"], data["experience_years"]) == (TEXT, 2.0)
+
+def test_stored_experience_years_win(db):
+    resume = Resume(parsed_data=json.dumps({"experience_years": 7}), raw_text=TEXT)
+    assert resume_match_data(resume, include_text=False)["experience_years"] == 7
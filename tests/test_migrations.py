@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from app.db.migrate import upgrade_database
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+from check_query_plans import HOT_QUERIES, check_query_plans  # noqa: E402
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+def test_hot_queries_use_an_index(engine):
+    upgrade_database(engine)
+    assert HOT_QUERIES
+    assert check_query_plans(engine) == []
+
+def _applications(connection):
+    return connection.execute(text("SELECT id, job_id, resume_id, status FROM applications ORDER BY id")).all()
+
+def test_duplicate_applications_are_archived_and_restored(engine):
+    from alembic import command
+    from app.db.migrate import alembic_config
+
+    upgrade_database(engine, "0002")
+    rows = [
+        (1, 1, 1, "pending"),
+        (2, 1, 1, "shortlisted"),  # same job and resume as 1, different status
+        (3, 1, 2, "pending"),
+        (4, 2, 1, "rejected"),
+        (5, 1, 1, "rejected"),
+    ]
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO applications (id, job_id, resume_id, status) VALUES (:id, :job_id, :resume_id, :status)"),
+            [dict(zip(("id", "job_id", "resume_id", "status"), row)) for row in rows]
+        )
+
+    upgrade_database(engine)
+    with engine.connect() as connection:
+        assert [row.id for row in _applications(connection)] == [1, 3, 4]
+        archived = connection.execute(text("SELECT id, status FROM applications_duplicates_0003 ORDER BY id")).all()
+        assert [tuple(row) for row in archived] == [(2, "shortlisted"), (5, "rejected")]
+
+    with engine.begin() as connection:
+        command.downgrade(alembic_config(connection), "0002")
+    with engine.connect() as connection:
+        assert [tuple(row) for row in _applications(connection)] == rows
+    assert "applications_duplicates_0003" not in inspect(engine).get_table_names()
+
+def test_upgrade_without_duplicates_creates_no_archive(engine):
+    upgrade_database(engine)
+    assert "applications_duplicates_0003" not in inspect(engine).get_table_names()
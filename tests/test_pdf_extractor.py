@@ -0,0 +1,31 @@
+from typing import List
+import pytest
+from app.core.config import settings
+from app.services import pdf_extractor
+from app.services.pdf_extractor import PDFBackend, extract_pdf_text, register_backend
+
+class FormFeedBackend(PDFBackend):
+    """Plugin backend defined outside pdf_extractor: pages are separated by form feeds."""
+    name = "form-feed"
+
+    def page_count(self, source) -> int:
+        return len(source.split(b"\f"))
+
+    def extract_pages(self, source, start: int, stop: int) -> List[str]:
+        return [page.decode("utf-8") for page in source.split(b"\f")[start:stop]]
+
+@pytest.fixture
+def plugin_backend(monkeypatch):
+    monkeypatch.setattr(pdf_extractor, "BACKENDS", dict(pdf_extractor.BACKENDS))
+    register_backend(FormFeedBackend)
+
+def test_registered_backend_runs_in_the_workers(plugin_backend, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_MIN_PAGES_PER_WORKER", 2)
+    monkeypatch.setattr(settings, "PDF_WORKERS", 2)
+    pages = [f"page {number}\n" for number in range(7)]
+    text = extract_pdf_text("\f".join(pages).encode("utf-8"), backend="form-feed", timeout=60)
+    assert text == "".join(pages)
+
+def test_unknown_backend():
+    with pytest.raises(pdf_extractor.PDFExtractionError):
+        extract_pdf_text(b"", backend="missing")
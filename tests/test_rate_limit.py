@@ -0,0 +1,112 @@
+import threading
+import time
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.http_cache import cached_response, response_cache
+from app.core.metrics import metrics
+from app.core.rate_limit import deferred_rate_limit
+
+COALESCED = "singleflight_coalesced{flight=cached_response}"
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Two ranking requests per caller, then one every ~17 minutes."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMITS", {**settings.RATE_LIMITS, "ranking": (0.001, 2)})
+    monkeypatch.setattr(rate_limit, "_limiters", {})
+    response_cache.invalidate("test")
+
+@pytest.fixture
+def builds():
+    return []
+
+@pytest.fixture
+def client(limits, builds):
+    app = FastAPI()
+
+    @app.get("/ranking/{version}")
+    def ranking(version: int, request: Request, admit=Depends(deferred_rate_limit("ranking"))):
+        def build():
+            builds.append(version)
+            return {"version": version}, {}
+        return cached_response(request, (version,), build, tags=["test"], admit=admit)
+
+    return TestClient(app)
+
+def test_only_builds_are_charged(client, builds):
+    first = client.get("/ranking/1")
+    assert first.status_code == 200
+    # Cache hits and revalidations are free
+    for _ in range(3):
+        assert client.get("/ranking/1").status_code == 200
+        assert client.get("/ranking/1", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    assert client.get("/ranking/2").status_code == 200
+    refused = client.get("/ranking/3")
+    assert refused.status_code == 429
+    assert refused.headers["Retry-After"]
+    assert builds == [1, 2]
+
+def test_forwarded_clients_have_their_own_buckets(client, monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 1)
+    for version in (1, 2):
+        assert client.get(f"/ranking/{version}", headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 200
+    assert client.get("/ranking/3", headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 429
+    # A spoofed leftmost entry does not give the same client a new bucket
+    assert client.get("/ranking/3", headers={"X-Forwarded-For": "1.2.3.4, 10.0.0.1"}).status_code == 429
+    assert client.get("/ranking/3", headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 200
+
+def test_client_key(monkeypatch):
+    def request(headers, host="192.0.2.1"):
+        return Request({
+            "type": "http", "client": (host, 1234),
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        })
+
+    forwarded = {"X-Forwarded-For": "203.0.113.9, 198.51.100.7, 10.0.0.5"}
+    assert rate_limit.client_key(request(forwarded)) == "ip:192.0.2.1"
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 2)
+    assert rate_limit.client_key(request(forwarded)) == "ip:198.51.100.7"
+    assert rate_limit.client_key(request({})) == "ip:192.0.2.1"
+
+    token = rate_limit.jwt.encode({"sub": "recruiter@example.com"}, settings.SECRET_KEY, algorithm="HS256")
+    authorized = {**forwarded, "Authorization": f"Bearer {token}"}
+    assert rate_limit.client_key(request(authorized)) == "user:recruiter@example.com"
+
+def test_waiters_are_not_charged_for_a_refused_build(limits):
+    """A request waiting on another caller's build builds itself when that caller is refused."""
+    started, release = threading.Event(), threading.Event()
+    results = {}
+
+    def refused():
+        started.set()
+        release.wait(5)
+        raise rate_limit.RateLimitExceeded(1)
+
+    def request():
+        return Request({"type": "http", "method": "GET", "path": "/ranking", "query_string": b"", "headers": []})
+
+    def call(name, admit):
+        try:
+            results[name] = cached_response(request(), ("shared",), lambda: ({"by": name}, {}), tags=["test"],
+                                            admit=admit).body
+        except rate_limit.RateLimitExceeded:
+            results[name] = 429
+
+    leader = threading.Thread(target=call, args=("leader", refused))
+    leader.start()
+    started.wait(5)
+    coalesced = metrics.snapshot()["counters"].get(COALESCED, 0)
+    waiter = threading.Thread(target=call, args=("waiter", lambda: None))
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while metrics.snapshot()["counters"].get(COALESCED, 0) == coalesced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert results == {"leader": 429, "waiter": b'{"by":"waiter"}'}
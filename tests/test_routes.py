@@ -0,0 +1,83 @@
+import ast
+from pathlib import Path
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.endpoints import stats
+from app.core.config import settings
+from app.core.http_cache import response_cache
+from app.models.models import Application, Candidate, Job, Resume
+
+def _seed(db):
+    python, draft = Job(title="Python developer"), Job(title="Draft", is_active=False)
+    candidate = Candidate(name="A. Candidate")
+    first, second = Resume(candidate=candidate), Resume(candidate=candidate)
+    db.add_all([python, draft, candidate, first, second])
+    db.flush()
+    db.add_all([
+        Application(job_id=python.id, candidate_id=candidate.id, resume_id=first.id,
+                    status="pending", match_score=0.25),
+        Application(job_id=python.id, candidate_id=candidate.id, resume_id=second.id,
+                    status="shortlisted", match_score=1.0),
+    ])
+    db.commit()
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    # Version counters restart with every test database, so cached bodies would be reused
+    yield
+    response_cache.invalidate("stats")
+
+def _main_router_order():
+    """Endpoint modules app.main includes routers from, in order.
+
+    Read from the source: importing app.main needs every optional dependency.
+    """
+    tree = ast.parse(Path(__file__).resolve().parents[1].joinpath("app", "main.py").read_text())
+    return [
+        node.value.args[0].value.id for node in tree.body
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+        and getattr(node.value.func, "attr", None) == "include_router"
+    ]
+
+def test_stats_router_is_included_before_jobs():
+    order = _main_router_order()
+    assert order.index("stats") < order.index("jobs")
+
+@pytest.fixture
+def routed_client(db):
+    """The stats, jobs and resumes routers, included in app.main's order."""
+    for module in ("sklearn", "torch", "transformers"):
+        pytest.importorskip(module)
+    from app.api.endpoints import jobs, resumes
+    routers = {"stats": stats, "jobs": jobs, "resumes": resumes}
+    app = FastAPI()
+    for name in _main_router_order():
+        if name in routers:
+            app.include_router(routers[name].router, prefix=settings.API_V1_STR)
+    with TestClient(app) as client:
+        yield client
+
+@pytest.mark.parametrize("path, body_type", [("/stats", dict), ("/resumes/search?q=python", list)])
+def test_app_routes_are_not_shadowed_by_job_ids(routed_client, path, body_type):
+    # Every router shares API_V1_STR, so jobs' /{job_id} answers 422 for any
+    # single-segment GET registered after it
+    response = routed_client.get(f"{settings.API_V1_STR}{path}")
+    assert response.status_code == 200, response.text
+    assert isinstance(response.json(), body_type)
+
+def test_stats(db):
+    _seed(db)
+    app = FastAPI()
+    app.include_router(stats.router, prefix=settings.API_V1_STR)
+    with TestClient(app) as client:
+        body = client.get(f"{settings.API_V1_STR}/stats").json()
+
+    assert body["totals"] == {"jobs": 2, "active_jobs": 1, "candidates": 1, "resumes": 2, "applications": 2}
+    assert body["applications_by_status"] == {"pending": 1, "shortlisted": 1}
+    assert body["applicants_per_job"] == [
+        {"job_id": 1, "title": "Python developer", "applicants": 2, "average_score": 0.625}
+    ]
+    counts = [bucket["count"] for bucket in body["score_distribution"]]
+    assert counts == [0, 0, 1, 0, 0, 0, 0, 0, 0, 1]
+    assert body["recent_activity"]["applications"] == 2
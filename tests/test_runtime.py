@@ -0,0 +1,17 @@
+import logging
+from app.core import runtime
+from app.core.runtime import Readiness
+
+def test_failed_warmup_is_logged_not_reported(monkeypatch, caplog):
+    def broken():
+        raise RuntimeError("could not open /srv/models/secret-path")
+
+    monkeypatch.setattr(runtime, "_warmups", {"model": broken, "index": lambda: None})
+    readiness = Readiness()
+    with caplog.at_level(logging.ERROR, logger="app.core.runtime"):
+        readiness.run_warmups()
+
+    status = readiness.status()
+    assert status["ready"]
+    assert status["warmup"] == {"model": "error", "index": "ok"}
+    assert "secret-path" in caplog.text
@@ -0,0 +1,73 @@
+import os
+from app.core.config import settings
+from app.models.models import Resume
+from app.services.search_index import ResumeSearchIndex
+
+def _resume(db, resume_id, text):
+    db.add(Resume(id=resume_id, raw_text=text))
+    db.commit()
+
+def test_search_ranks_and_filters(tmp_path, db):
+    index = ResumeSearchIndex(str(tmp_path / "index.npz"))
+    _resume(db, 1, "Senior Python developer, Django and PostgreSQL")
+    _resume(db, 2, "Java developer with Spring and some Python")
+    _resume(db, 3, "Machine learning engineer: Python, PyTorch")
+    index.sync(db)
+
+    assert {hit.doc_id for hit in index.search("python")} == {1, 2, 3}
+    assert [hit.doc_id for hit in index.search("python +django")] == [1]
+    assert {hit.doc_id for hit in index.search("python -java")} == {1, 3}
+    assert [hit.doc_id for hit in index.search('"machine learning"')] == [3]
+
+def test_reconcile_picks_up_rows_committed_out_of_order(tmp_path, db, monkeypatch):
+    index = ResumeSearchIndex(str(tmp_path / "index.npz"))
+    _resume(db, 2, "python developer")
+    index.sync(db)
+    # id 1 commits after id 2 was indexed: the incremental sync cannot see it
+    _resume(db, 1, "python engineer")
+    index.sync(db)
+    assert 1 not in index
+
+    monkeypatch.setattr(settings, "INDEX_RECONCILE_SECONDS", 0)
+    db.delete(db.get(Resume, 2))
+    db.commit()
+    index.sync(db)
+    assert 1 in index
+    assert 2 not in index
+
+def test_save_and_load_round_trip(tmp_path, db):
+    path = str(tmp_path / "index.npz")
+    index = ResumeSearchIndex(path)
+    _resume(db, 1, "python django")
+    _resume(db, 2, "java spring")
+    index.sync(db)
+    index.remove_resume(2)
+    index.save(path)
+
+    loaded = ResumeSearchIndex(path)
+    loaded.load(path)
+    assert 2 not in loaded
+    assert loaded.search("python") == index.search("python")
+
+def test_changes_are_saved_by_the_writer_only(tmp_path, db):
+    path = str(tmp_path / "index.npz")
+    writer, other = ResumeSearchIndex(path), ResumeSearchIndex(path)
+    _resume(db, 1, "python django")
+    writer.sync(db)
+    other.sync(db)
+    writer.add_resume(2, "java spring")
+    assert not os.path.exists(path)  # uploads do not write the file
+
+    assert writer.acquire_writer_lock()
+    assert not other.acquire_writer_lock()
+    assert writer.save_pending()
+    assert not writer.save_pending()  # nothing changed since
+
+    loaded = ResumeSearchIndex(path)
+    loaded.load(path)
+    assert 2 in loaded
+
+def test_unloaded_index_is_not_saved(tmp_path):
+    index = ResumeSearchIndex(str(tmp_path / "index.npz"))
+    index.add_resume(1, "python")
+    assert not index.save_pending()
@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.session import engine
+from app.models.models import Job, Resume, SearchOutbox, Skill
+from app.services.search_sync import InMemoryBackend, OutboxWorker, index_name, register_outbox_listener
+
+class RecordingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.actions = []
+
+    def bulk(self, actions):
+        self.actions.extend(actions)
+        return super().bulk(actions)
+
+# One factory for the module: SQLAlchemy keys listeners by object id, so a
+# new sessionmaker reusing a collected one's address looks registered
+# without being so
+_session_factory = sessionmaker(bind=engine, autoflush=False)
+register_outbox_listener(_session_factory)
+
+@pytest.fixture
+def session_factory(db):
+    return _session_factory
+
+@pytest.fixture
+def backend():
+    return RecordingBackend()
+
+def _add(session_factory, *entities):
+    session = session_factory()
+    session.add_all(entities)
+    session.commit()
+    ids = [entity.id for entity in entities]
+    session.close()
+    return ids
+
+def _outbox(db):
+    db.expire_all()
+    return db.query(SearchOutbox).order_by(SearchOutbox.id).all()
+
+def test_run_once_claims_and_pushes_pending_rows(db, session_factory, backend):
+    job_id, resume_id = _add(
+        session_factory,
+        Job(title="Python developer", skills=[Skill(name="Python")]),
+        Resume(parsed_data='{"skills": ["python"], "experience_years": 3}', raw_text="python")
+    )
+    worker = OutboxWorker(backend, session_factory)
+
+    assert worker.run_once() == 2
+    assert backend.documents("job")[str(job_id)]["required_skills"] == ["Python"]
+    assert backend.documents("resume")[str(resume_id)]["experience_years"] == 3
+    assert all(row.processed_at is not None for row in _outbox(db))
+    assert worker.run_once() == 0
+
+def test_rows_of_one_entity_are_pushed_once(db, session_factory, backend):
+    job_id, = _add(session_factory, Job(title="Draft"))
+    session = session_factory()
+    job = session.get(Job, job_id)
+    job.title = "Backend engineer"
+    session.commit()
+    job.is_active = False
+    session.commit()
+    session.close()
+
+    assert len(_outbox(db)) == 3
+    assert OutboxWorker(backend, session_factory).run_once() == 3
+    assert [action["_id"] for action in backend.actions] == [str(job_id)]
+    assert backend.documents("job")[str(job_id)]["is_active"] is False
+
+def test_deleted_entities_are_removed(db, session_factory, backend):
+    job_id, = _add(session_factory, Job(title="Temporary"))
+    worker = OutboxWorker(backend, session_factory)
+    worker.run_once()
+
+    session = session_factory()
+    session.delete(session.get(Job, job_id))
+    session.commit()
+    session.close()
+    worker.run_once()
+    assert str(job_id) not in backend.documents("job")
+
+def test_failures_back_off_and_give_up(db, session_factory, backend, monkeypatch):
+    job_id, = _add(session_factory, Job(title="Flaky"))
+    backend.fail_ids.add(str(job_id))
+    worker = OutboxWorker(backend, session_factory, max_attempts=3)
+
+    before = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert worker.run_once() == 1
+    row, = _outbox(db)
+    assert (row.attempts, row.processed_at, row.last_error) == (1, None, "simulated failure")
+    assert (row.available_at - before).total_seconds() >= settings.SEARCH_SYNC_BACKOFF_SECONDS
+    # Not due again until the backoff has passed
+    assert worker.run_once() == 0
+
+    monkeypatch.setattr(settings, "SEARCH_SYNC_BACKOFF_SECONDS", 0)
+    row.available_at = before
+    db.commit()
+    assert worker.run_once() == 1
+    assert worker.run_once() == 1
+    assert _outbox(db)[0].attempts == 3
+    # Exhausted rows are no longer claimed, even once the backend recovers
+    backend.fail_ids.clear()
+    assert worker.run_once() == 0
+
+def test_backoff_doubles_up_to_the_cap(backend, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_SYNC_BACKOFF_SECONDS", 2.0)
+    monkeypatch.setattr(settings, "SEARCH_SYNC_MAX_BACKOFF_SECONDS", 10.0)
+    worker = OutboxWorker(backend, session_factory)
+    assert [worker._backoff(attempts).total_seconds() for attempts in (1, 2, 3, 4)] == [2.0, 4.0, 8.0, 10.0]
+
+def test_reindex_swaps_the_alias_and_drops_the_old_index(db, session_factory, backend):
+    first, second = _add(session_factory, Job(title="One"), Job(title="Two"))
+    worker = OutboxWorker(backend, session_factory)
+    assert worker.reindex("job") == 2
+    old_index = backend.aliases[index_name("job")]
+
+    # A stale document only present in the live index disappears with it
+    backend.indexes[old_index]["999"] = {"title": "Stale"}
+    session = session_factory()
+    session.delete(session.get(Job, first))
+    session.commit()
+    session.close()
+
+    assert worker.reindex("job") == 1
+    new_index = backend.aliases[index_name("job")]
+    assert new_index != old_index
+    assert old_index not in backend.indexes
+    assert set(backend.documents("job")) == {str(second)}
+
+def test_failed_replay_after_reindex_is_left_pending(db, session_factory, backend, monkeypatch):
+    job_id, = _add(session_factory, Job(title="One"))
+    worker = OutboxWorker(backend, session_factory)
+    worker.run_once()
+
+    def create_index(name):
+        # A change committed while the reindex runs
+        session = session_factory()
+        session.get(Job, job_id).title = "Renamed"
+        session.commit()
+        session.close()
+        InMemoryBackend.create_index(backend, name)
+
+    def point_alias(alias, index):
+        # The replay that follows the swap fails
+        InMemoryBackend.point_alias(backend, alias, index)
+        backend.fail_ids.add(str(job_id))
+
+    monkeypatch.setattr(backend, "create_index", create_index)
+    monkeypatch.setattr(backend, "point_alias", point_alias)
+    assert worker.reindex("job") == 1
+
+    rows = _outbox(db)
+    assert rows[0].processed_at is not None
+    assert (rows[-1].processed_at, rows[-1].attempts, rows[-1].last_error) == (None, 1, "simulated failure")
+
+    backend.fail_ids.clear()
+    rows[-1].available_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.commit()
+    assert worker.run_once() == 1
+    assert _outbox(db)[-1].processed_at is not None
@@ -0,0 +1,81 @@
+import threading
+import numpy as np
+from app.services.skill_index import SkillIndex
+
+VECTORS = {
+    "postgres": [1.0, 0.0, 0.0],
+    "postgresql": [0.95, 0.31, 0.0],
+    "postgis": [0.99, 0.14, 0.0],
+    "mysql": [0.95, 0.0, 0.3],
+    "python": [0.0, 1.0, 0.0],
+    "cobol": [0.0, 0.0, 1.0],
+}
+
+class Encoder:
+    """Fixed skill vectors; records every batch and whether the index lock was free."""
+
+    def __init__(self):
+        self.index = None
+        self.calls = []
+        self.lock_free = []
+
+    def __call__(self, terms):
+        self.calls.append(list(terms))
+        if self.index is not None:
+            # Taken from another thread: fails if the caller holds the lock
+            thread = threading.Thread(target=self._try_lock)
+            thread.start()
+            thread.join()
+        return np.array([VECTORS[term] for term in terms])
+
+    def _try_lock(self):
+        acquired = self.index._lock.acquire(timeout=0.5)
+        if acquired:
+            self.index._lock.release()
+        self.lock_free.append(acquired)
+
+def _index(**kwargs):
+    encoder = Encoder()
+    index = SkillIndex(encoder, threshold=0.9, **kwargs)
+    encoder.index = index
+    return index, encoder
+
+def test_resume_skills_map_onto_the_jobs_skills_only():
+    index, _ = _index()
+    # Known from another job and closer to "postgres" than the job's own skill
+    index.add(["PostGIS"])
+
+    assert index.canonicalize(["Postgres", "Python"], ["PostgreSQL", "Python"]) == {"postgresql", "python"}
+    assert index.canonicalize(["Postgres"], ["PostGIS", "PostgreSQL"]) == {"postgis"}
+    assert index.canonicalize(["Postgres", "COBOL"], ["MySQL"]) == {"mysql", "cobol"}
+    # Below the threshold the skill is kept as written
+    assert index.canonicalize(["Postgres"], ["Python"]) == {"postgres"}
+    assert index.canonicalize(["PostgreSQL"], ["Postgres", "PostgreSQL"]) == {"postgresql"}
+
+def test_canonical_sets_are_cached_per_resume_and_job_skills():
+    index, encoder = _index()
+    index.add(["postgresql", "mysql"])
+    encoder.calls.clear()
+
+    first = index.canonicalize_many([["Postgres"], ["postgres"], ["COBOL"]], ["PostgreSQL"])
+    assert first == [{"postgresql"}, {"postgresql"}, {"cobol"}]
+    assert encoder.calls == [["postgres", "cobol"]]  # one batch for all misses
+    assert index.canonicalize(["postgres"], ["postgresql"]) == {"postgresql"}
+    assert len(encoder.calls) == 1
+    # Another job's skills are a different entry
+    assert index.canonicalize(["postgres"], ["MySQL"]) == {"mysql"}
+    assert index.stats()["cached_sets"] == 3
+
+def test_cache_is_bounded():
+    index, _ = _index(cache_size=2)
+    for skill in ("postgres", "python", "cobol"):
+        index.canonicalize([skill], ["mysql"])
+    assert index.stats()["cached_sets"] == 2
+
+def test_encoder_runs_outside_the_lock():
+    index, encoder = _index()
+    index.add(["PostgreSQL"])
+    index.canonicalize(["postgres", "cobol"], ["postgresql", "python"])
+
+    assert len(encoder.calls) == 3
+    assert encoder.lock_free == [True, True, True]